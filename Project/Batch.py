@@ -0,0 +1,266 @@
+"""
+Runs the Benders decomposition on many instances at once, each job in its own
+process.
+
+The cores are split between the jobs running at the same time, each job's share
+going to its BSP workers (see --workers) and the rest to the master problem
+through Gurobi's Threads parameter. The largest instances (by their number of Y
+variables) are started first so no long job is left to start last. Each job has
+the time and memory limits of its master problem. Gurobi's memory limit is soft
+and doesn't cover the solver's own sets, so each job's address space is also
+capped at ADDRESS_SPACE_SLACK GB past it. A job still running KILL_GRACE seconds
+past its time limit is killed. The output of each job goes to its log file in
+Project/OurSolutions/batch.
+
+The manifest records the status, objective, bound, gap, runtime, wall time and
+peak memory of each instance, and is rewritten as each job finishes. With
+--resume the instances it already has a final result for are skipped, and the
+others resume from their checkpoints (see Checkpoint.py).
+
+Run this file to solve every instance in Project/data, four at a time:
+    python3 Project/Batch.py --jobs 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import traceback
+from multiprocessing.connection import wait
+from typing import Dict, List
+
+import Constants as const
+from BendersImplementationAllTricks import add_solve_arguments, solve, solve_options
+from Instance import DATA_PATH, load_compiled_instance
+
+BATCH_PATH = os.path.join(".", "Project", "OurSolutions", "batch")
+MANIFEST_PATH = os.path.join(BATCH_PATH, "manifest.json")
+
+# Cores given to each job when the number of jobs isn't given
+JOB_THREADS = 4
+
+# Seconds a job may run past its time limit, building its model and saving
+# its solution, before it is killed
+KILL_GRACE = 600
+
+# GB of address space a job may use past its memory limit, for the solver's
+# own sets and the libraries and thread stacks mapped into it
+ADDRESS_SPACE_SLACK = 8
+
+# Statuses which aren't solved again with --resume
+FINAL_STATUSES = ("optimal", "time limit", "infeasible")
+
+
+def _run_job(
+    instance_filename: str, options: Dict[str, object], log_path: str, sender
+) -> None:
+    """
+    Solves an instance in a job process and sends its result to sender
+    """
+
+    # Send all the output of the job, Gurobi's included, to its log
+    log = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    sys.stdout.flush()
+    os.dup2(log, sys.stdout.fileno())
+    os.dup2(log, sys.stderr.fileno())
+
+    # A hard limit, so a job running out of memory outside Gurobi fails with a
+    # MemoryError rather than taking the machine's memory
+    limit = int((options["memory_limit"] + ADDRESS_SPACE_SLACK) * 1024**3)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        result = solve(instance_filename, **options)
+    except Exception as e:
+        traceback.print_exc()
+        result = {"status": "error", "error": repr(e)}
+    sys.stdout.flush()
+
+    # ru_maxrss is in KB on Linux
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    sender.send(result)
+
+
+def _save_manifest(manifest: Dict[str, dict], path: str) -> None:
+    """
+    Writes the manifest to path
+    """
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file first so an interrupted batch can't leave a
+    # truncated manifest behind
+    with open(path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def run_batch(
+    instances: List[str],
+    options: Dict[str, object],
+    jobs: int,
+    manifest_path: str = MANIFEST_PATH,
+) -> Dict[str, dict]:
+    """
+    Solves the instances, jobs at a time, and returns the manifest of their
+    results keyed by instance filename. With options["resume"] the instances
+    the manifest in manifest_path already has a final result for are skipped
+    """
+
+    manifest: Dict[str, dict] = {}
+    if options["resume"] and os.path.isfile(manifest_path):
+        with open(manifest_path, "r") as file:
+            manifest = json.load(file)
+
+    pending = [
+        filename
+        for filename in instances
+        if manifest.get(filename, {}).get("status") not in FINAL_STATUSES
+    ]
+    for filename in sorted(set(instances) - set(pending)):
+        print("Skipping", filename, "(" + manifest[filename]["status"] + ")")
+
+    # Largest first. Loading compiles and caches each instance, so the jobs
+    # don't all compile at once. Only the compiled instances are loaded, one at
+    # a time, so the batch doesn't keep a model of every instance
+    sizes = {
+        filename: int(
+            load_compiled_instance(filename, use_dzn=options["use_dzn"]).PA.sum()
+        )
+        for filename in pending
+    }
+    pending.sort(key=lambda filename: sizes[filename], reverse=True)
+
+    # The cores of each job are shared between its BSP workers, if it has a
+    # pool of them, and its master problem
+    jobs = max(1, min(jobs, len(pending)))
+    workers = options["workers"] if options["workers"] > 1 else 0
+    threads = options["threads"] or max(1, (os.cpu_count() or 1) // jobs - workers)
+    options = dict(options, threads=threads)
+    print(
+        "Solving",
+        len(pending),
+        "instances,",
+        jobs,
+        "at a time with",
+        threads,
+        "threads each",
+        f"and {workers} BSP workers" if workers else "",
+    )
+
+    # Gurobi can't be used in a forked copy of a process which has used it, so
+    # each job is started fresh
+    context = multiprocessing.get_context("spawn")
+    os.makedirs(BATCH_PATH, exist_ok=True)
+
+    running: Dict[int, tuple] = {}
+    batch_start = time.time()
+    while pending or running:
+        while pending and len(running) < jobs:
+            filename = pending.pop(0)
+            log_path = os.path.join(BATCH_PATH, os.path.splitext(filename)[0] + ".log")
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_job, args=(filename, options, log_path, sender)
+            )
+            process.start()
+            sender.close()
+            running[process.sentinel] = (
+                filename,
+                process,
+                receiver,
+                log_path,
+                time.time(),
+            )
+            print("Started", filename, f"({sizes[filename]} Y variables)")
+
+        wait(list(running), timeout=1)
+
+        for sentinel, (filename, process, receiver, log_path, start) in list(
+            running.items()
+        ):
+            wall_time = time.time() - start
+            if process.is_alive():
+                if wall_time <= options["time_limit"] + KILL_GRACE:
+                    continue
+                process.kill()
+                process.join()
+                result = {"status": "killed"}
+            elif receiver.poll():
+                result = receiver.recv()
+                process.join()
+            else:
+                # Died without a result, e.g. killed for running out of memory
+                process.join()
+                result = {"status": "crashed", "exit_code": process.exitcode}
+
+            receiver.close()
+            del running[sentinel]
+
+            manifest[filename] = {
+                "status": result["status"],
+                "objective": result.get("objective"),
+                "bound": result.get("bound"),
+                "gap": result.get("gap"),
+                "runtime": result.get("runtime"),
+                "wall_time": wall_time,
+                "peak_rss_mb": result.get("peak_rss_mb"),
+                "threads": threads,
+                "log": log_path,
+            }
+            for key in ("error", "exit_code"):
+                if key in result:
+                    manifest[filename][key] = result[key]
+            _save_manifest(manifest, manifest_path)
+
+            print(
+                "Finished",
+                filename,
+                "in",
+                round(wall_time, 1),
+                const.SECONDS + ":",
+                result["status"],
+                "objective",
+                result.get("objective"),
+                "gap",
+                result.get("gap"),
+            )
+
+    print("Batch finished in", time.time() - batch_start, const.SECONDS)
+    print("Manifest saved to", manifest_path)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Solve many instances with the Benders decomposition at once"
+    )
+    parser.add_argument(
+        "instances",
+        nargs="*",
+        help="instances to solve, every instance in Project/data if none",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=max(1, (os.cpu_count() or 1) // JOB_THREADS),
+        help="number of instances solved at the same time",
+    )
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    add_solve_arguments(parser)
+    args = parser.parse_args()
+
+    instances = args.instances or sorted(
+        filename
+        for filename in os.listdir(DATA_PATH)
+        if os.path.isfile(os.path.join(DATA_PATH, filename))
+    )
+
+    run_batch(instances, solve_options(args), args.jobs, args.manifest)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,683 +5,148 @@ Hugo Burton, Anna Henderson, Mitchell Holt
 27/08/2023
 """
 
+import argparse
 import time
-from gurobipy import Model, quicksum, GRB
-import json  # For importing the data as JSON format
+from collections import OrderedDict
+import numpy as np
+from gurobipy import Model, quicksum, GRB, Var
 import os
-import sys
-from typing import Dict, List, Set, Tuple, Union
+from typing import Dict, List, Set, Tuple
 from Examination import Examination
 
 # Custom Imports
 import Utils as utils
 from Room import RoomManager, Room
-from Constraint import (
-    ConstraintManager,
-    EventPeriodConstraint,
-    RoomPeriodConstraint,
-)
-from Course import CourseManager, Course
+from Course import Course
 from Event import Event
-from Curriculum import CurriculaManager, Curriculum
 from Period import Period
 import Constants as const
 from SolutionExport import Solution
+from Instance import InstanceModel, load_instance
+from MasterBuilder import (
+    build_assignment,
+    build_assignment_matrix,
+    capacity_levels,
+    independence_levels,
+    set_assignment_start,
+)
+from RoomSubproblem import BSPResult, PeriodSubproblems
+from Construction import construct_timetable
+from WarmStart import read_solution
+import CutPool as cutpool
+from Checkpoint import Checkpoint, checkpoint_path
+
+# Names of the Gurobi statuses a solve can end with
+STATUS_NAMES: Dict[int, str] = {
+    GRB.OPTIMAL: "optimal",
+    GRB.INFEASIBLE: "infeasible",
+    GRB.TIME_LIMIT: "time limit",
+    GRB.MEM_LIMIT: "memory limit",
+    GRB.INTERRUPTED: "interrupted",
+    GRB.SUBOPTIMAL: "suboptimal",
+}
+
+# Added to the solution filenames of DZN runs
+DZN_SUFFIX = "_dzn"
+
+
+def solve(
+    instance_filename: str,
+    use_dzn: bool = False,
+    use_matrix_api: bool = False,
+    workers: int = const.BSP_WORKERS,
+    minimal_cuts: bool = False,
+    warm_up: bool = False,
+    greedy_start: bool = const.GREEDY_START,
+    warm_start: str = None,
+    load_cuts: str = None,
+    resume: bool = False,
+    checkpoint_interval: float = const.CHECKPOINT_INTERVAL,
+    threads: int = 0,
+    time_limit: float = const.TIME_LIMIT,
+    memory_limit: float = const.MEMORY_LIMIT,
+) -> Dict[str, object]:
+    """
+    Solves the instance and saves its solution. Returns the status, objective,
+    bound, gap and runtime of the solve. threads is Gurobi's Threads parameter,
+    where 0 uses every core
+    """
 
-
-def solve(instance_filename: str) -> None:
     print("---------------- Instance: ", instance_filename, "----------------")
     previous_time = time.time()
-    data_file = os.path.join(".", "Project", "data", instance_filename)
-
-    with open(data_file, "r") as json_file:
-        json_data = json_file.read()
 
-    # ------ Parse data with JSON ------
-
-    parsed_data = json.loads(json_data)
+    # ------ Import data ------
+    # The compiled instance is cached on disk, so repeat runs skip parsing and
+    # set construction entirely
+    instance: InstanceModel = load_instance(instance_filename, use_dzn=use_dzn)
 
     # Timeslots per day
-    slots_per_day = parsed_data[const.SLOTS_PER_DAY]
+    slots_per_day = instance.slots_per_day
 
     # Primary Primary Distance
-    primary_primary_distance = parsed_data[const.PRIMARY_PRIMARY_DISTANCE]
-
-    # Exam schedule constraints
-    constrManager = ConstraintManager(slots_per_day)
-    for constraint in parsed_data[const.CONSTRAINTS]:
-        constrManager.add_constraint(constraint)
-
-    # Courses
-    courseManager = CourseManager()
-    for course in parsed_data[const.COURSES]:
-        courseManager.add_course(course)
-
-    # Curricula
-    curriculaManager = CurriculaManager()
-    for curriculum in parsed_data[const.CURRICULA]:
-        curriculaManager.add_curriculum(curriculum)
+    primary_primary_distance = instance.primary_primary_distance
 
-    # Rooms
-    examRooms = parsed_data[const.ROOMS]
-    Rooms = RoomManager()
-    for examRoom in examRooms:
-        Rooms.add_room(examRoom)
-
-    # Cannot add any more rooms after this
-    Rooms.construct_composite_map()
-
-    dummy_room = Rooms.get_dummy_room()
-
-    # Forbidden period constraints (any event any room)
-    # Convert periods into day and timeslot tuples
-    forbidden_period_constraints: List[Period] = [
-        period_constraint.get_period()
-        for period_constraint in constrManager.get_forbidden_period_constraints()
-    ]
+    Rooms: RoomManager = instance.Rooms
 
     print("Data import:", time.time() - previous_time, const.SECONDS)
     previous_time = time.time()
 
     # ------ Sets ------
-    # Some sets are already defined above
+    # See Instance.py for how each set is constructed
+
     # -- Events --
     # (one course can have multiple examinations)
     # an exmamination can have multiple events
-
-    # Get courses
-    Courses: List[Course] = courseManager.get_courses()
-
-    # Lookup dictionary of examinations for a given course
-    CourseExaminations: Dict[Course, List[Examination]] = {
-        course: [examination for examination in course.get_examinations()]
-        for course in Courses
-    }
-
-    # Extract examinations from CourseList and store in one frozenset
-    Examinations: Set[Examination] = set()
-    for course in Courses:
-        examinations = course.get_examinations()
-        for examination in examinations:
-            Examinations.add(examination)
-
-    # Extract Events from the set of Examinations
-    Events: Set[Event] = {
-        event for examination in Examinations for event in examination.get_events()
-    }
-
-    # Lookup dictionary of events for a given course
-    CourseEvents: Dict[Course, List[Event]] = {
-        course: [
-            event
-            for examination in Examinations
-            if examination.get_course() == course
-            for event in examination.get_events()
-        ]
-        for course in Courses
-    }
-
-    # ------- Constraints -------
-
-    # Forbidden event period constraints. Dictionary of [CourseEvent: Period]
-    forbidden_event_period_constraints: Dict[Event, List[Period]] = {}
-
-    # Initialise dictionary with an empty list for each event
-    for event in Events:
-        forbidden_event_period_constraints[event] = []
-
-    # Iterate through forbidden_event_period_constraints and add to the right list as required
-    for (
-        event_period_constraint
-    ) in constrManager.get_forbidden_event_period_constraints():
-        # Period that the EventPeriodConstraint correspondds to
-        period = event_period_constraint.get_period()
-
-        # Corresponding Course
-        course_name = event_period_constraint.get_course_name()
-        course = courseManager.get_course_by_name(course_name)
-        course_exams = course.get_examinations()
-
-        # Loop over the exams in the course
-        for exam in course_exams:
-            # Check the exam number matches the constraint
-            if exam.get_index() != event_period_constraint.get_exam_ordinal():
-                continue
-
-            if event_period_constraint.get_part() == const.WRITTEN:
-                event = exam.get_written_event()
-            elif event_period_constraint.get_part() == const.ORAL:
-                event = exam.get_oral_event()
-
-            forbidden_event_period_constraints[event].append(period)
+    Events: List[Event] = instance.events
 
     # ----- Periods -----
     # Redefine set of periods into days and timeslots
     # Calculate number of days in exam period
-    NumDays = parsed_data[const.PERIODS] // slots_per_day
+    NumDays = len(instance.periods) // slots_per_day
 
     # Set of days
     Days = list(range(NumDays))
 
-    # Set of Timeslots in each day
-    Timeslots = list(range(slots_per_day))
-
     # Set of periods each day
-    Periods = [
-        Period(day, timeslot, slots_per_day) for day in Days for timeslot in Timeslots
-    ]
-
-    # Set of composite rooms (R^C) in paper)
-    CompositeRooms = Rooms.get_composite_rooms()
+    Periods: List[Period] = instance.periods
 
     # -- Period Availabilities (P_e in paper) --
     # Set of periods available for event e
-    PA: Dict[Event, Set[Period]] = {
-        event: {
-            p
-            for p in Periods
-            if p not in forbidden_period_constraints
-            and p not in forbidden_event_period_constraints[event]
-        }
-        for event in Events
-    }
-
-    # -- Room availabilities --
-    # Dictionary mapping events to a set of rooms in which it can be held
-    # R_e in paper
-    RA: Dict[Event, Set[Room]] = {}
-
-    available_types: Dict[str, Dict[str, List[str]]] = {
-        const.DUMMY: [const.DUMMY],
-        const.SMALL: [const.SMALL, const.MEDIUM, const.LARGE],
-        const.MEDIUM: [const.MEDIUM, const.LARGE],
-        const.LARGE: [const.LARGE],
-        const.COMPOSITE: [const.COMPOSITE],
-    }
-
-    for event in Events:
-        if event.get_num_rooms() == 0:
-            # No room required. Set of dummy room
-            RA[event] = {dummy_room}
-        elif event.get_num_rooms() == 1:
-            # Only a single room required
-            # Get the set of rooms which are single and are of the right type
-
-            room_set = set()
-            for r in Rooms.get_single_rooms():
-                if r.get_type() in available_types.get(event.get_room_type()):
-                    room_set.add(r)
-
-            RA[event] = room_set
-        else:
-            # Composite Room required for this event
-            # Get the set of rooms which are single and are of the right type
-
-            room_set = set()
-            for r in Rooms.get_composite_rooms():
-                adjacent_rooms: List[Room] = Rooms.composite_map[r]
-
-                if (
-                    len(r.get_members()) == event.get_num_rooms()
-                    and adjacent_rooms[0].get_type() == event.get_room_type()
-                ):
-                    room_set.add(r)
-
-            RA[event] = room_set
-
-    # dictionary mapping events e to the set of events in H3 hard conflict with e
-    # HC_e in paper
-    HC: Dict[Event, List[Event]] = {}
-
-    # Initialise empty list for every event
-    for e in Events:
-        HC[e] = []
-
-    for curriculum in curriculaManager.get_curricula():
-        curriculum: Curriculum
-
-        curriculum_events_by_teacher: Dict[str, List[Event]] = {}
-
-        # Get all the primary events that are part of this curriculum and taught by the same teacher
-        for course_name in curriculum.get_primary_course_names():
-            course: Course = courseManager.get_course_by_name(course_name)
-
-            course_teacher = course.get_teacher()
-
-            # Get the set of events for this course
-            course_events: List[Event] = CourseEvents.get(course)
-
-            if course_teacher not in curriculum_events_by_teacher.keys():
-                curriculum_events_by_teacher[course_teacher] = []
-
-            curriculum_events_by_teacher[course_teacher].extend(course_events)
-
-        for course_name in curriculum.get_primary_course_names():
-            course: Course = courseManager.get_course_by_name(course_name)
-
-            course_teacher = course.get_teacher()
-
-            # Get the set of events for this course
-            course_events: List[Event] = CourseEvents.get(course)
-
-            for event in course_events:
-                for curriculum_event in curriculum_events_by_teacher[course_teacher]:
-                    if event == curriculum_event:
-                        continue
-                    HC[event].append(curriculum_event)
-
-    # F = the set of examination pairs with precendence constraints.
-    # But actually we use the event instead
-    # This occurs if they are written and oral parts of the same examination
-    # and they are part of two consecutive examinations of the same course
-    F: Set[Tuple[Event, Event]] = set()
-
-    # The set of event pairs with a directed soft distance constraint. Occurs when
-    # 1. Written and Oral events of the same examination
-    #   minimum and maximum distance
-    # 2. Same course with multiple examinations. One exam is consecutive which removes symmetry
-    # in the problem. Placed between the first event of each examination if it is a multi-part exam
-    DPDirected: Set[Tuple[Event, Event]] = set()
-
-    # DP^{E} in paper
-    # Examination Event Pairs of the same course.
-    # This only applies to the first examination event if there are multiple
-    # Setting this here as the loop is present and is convenient.
-    DPSameCourse: Set[Tuple[Event, Event]] = set()
-
-    # DP^{WO}
-    # WO Event Parts of the same examination
-    # Setting this here as the loop is present and is convenient.
-    # Should contain events only from WRITTEN_AND_ORAL courses
-    DPWrittenOral: Set[Tuple[Event, Event]] = set()
-
-    # Written and Oral Events of the same examination
-    for examination in Examinations:
-        examination: Examination
-        corresponding_course: Course = examination.get_course()
-
-        if corresponding_course.is_written_and_oral():
-            # Safety check with written oral exam specs
-            assert corresponding_course.get_written_oral_specs is not None
-
-            # Find the actual written and oral events
-            writtenEvent = examination.get_written_event()
-            oralEvent = examination.get_oral_event()
-
-            F.add((writtenEvent, oralEvent))
-            DPDirected.add((writtenEvent, oralEvent))
-
-            # Adding to DP^{WO} here as it is convenient
-            DPWrittenOral.add((writtenEvent, oralEvent))
-
-    # Events belong to the same course
-    for course in Courses:
-        course_examinations = CourseExaminations.get(course)
-
-        # Consider first (written) event in each exam if it's a multi-parter
-        for examination_a in course_examinations:
-            for examination_b in course_examinations:
-                examination_a: Examination
-                examination_b: Examination
-                if examination_a.__eq__(examination_b):
-                    continue
-
-                # Don't add directed distance constraints if examination_a is to come after
-                # examination_b
-                if examination_a.get_index() > examination_b.get_index():
-                    continue
-
-                event_a = examination_a.get_first_event()
-                event_b = examination_b.get_first_event()
+    PA: Dict[Event, Set[Period]] = instance.PA
 
-                F.add((event_a, event_b))
-                DPDirected.add((event_a, event_b))
+    # Room availabilities (R_e in paper) are used by the BSPs. See
+    # RoomSubproblem.py
 
-                #  DP^{E}
-                DPSameCourse.add((event_a, event_b))
+    # The set of event pairs with a directed soft distance constraint
+    DPDirected: Set[Tuple[Event, Event]] = instance.DPDirected
 
-    # DPUndirected - The set of event pairs with an undirected soft distance
-    # constraint. If (e1, e2) in DPUndirected, then (e2, e1) is also. Occurs when:
-    # 1. Same curriculum: if two courses belong to the same curriculum, there should be a
-    # minimum separation between the examinations. For two-event examinations, consider the
-    # first event only
-    DPUndirected: Set[Tuple[Event, Event]] = set()
+    # DP^{E} in paper. First events of examination pairs of the same course
+    DPSameCourse: Set[Tuple[Event, Event]] = instance.DPSameCourse
 
-    # Loop over curriculums
-    for curricula in curriculaManager.get_curricula():
-        curriucla_course_names = curricula.get_course_names()
-        curricula_courses: List[Course] = []
-        for course_name in curriucla_course_names:
-            curricula_courses.append(courseManager.get_course_by_name(course_name))
+    # DP^{WO}. Written and oral events of the same examination
+    DPWrittenOral: Set[Tuple[Event, Event]] = instance.DPWrittenOral
 
-        for course_a in curricula_courses:
-            for course_b in curricula_courses:
-                course_a: Course
-                course_b: Course
+    # The set of event pairs with an undirected soft distance constraint.
+    # If (e1, e2) in DPUndirected, then (e2, e1) is also
+    DPUndirected: Set[Tuple[Event, Event]] = instance.DPUndirected
 
-                if course_a.__eq__(course_b):
-                    continue
-
-                course_a_examinations = CourseExaminations.get(course_a)
-                course_b_examinations = CourseExaminations.get(course_b)
-
-                # Consider first (written) event in each exam if it's a multi-parter
-                # Add every combination of events for the two courses into the set.
-                # No need to check if the examinations are equal as they won't be!
-                # They will be from different courses
-                for examination_a in course_a_examinations:
-                    for examination_b in course_b_examinations:
-                        examination_a: Examination
-                        examination_b: Examination
-
-                        # Don't add directed distance constraints if examination_a is to come after
-                        # examination_b
-
-                        # Course a
-
-                        if course_a.is_written() or course_a.is_written_and_oral():
-                            event_a = examination_a.get_written_event()
-                        elif course_a.is_oral():
-                            event_a = examination_a.get_oral_event()
-
-                        # Course b
-
-                        if course_b.is_written() or course_b.is_written_and_oral():
-                            event_b = examination_b.get_written_event()
-                        elif course_b.is_oral():
-                            event_b = examination_b.get_oral_event()
-
-                        DPUndirected.add((event_a, event_b))
-
-    # SCPS
-    # Dictionary mapping each primary event to the set of secondary
-    # courses in the same curriculum
-    SCPS = {}  # type is dict[Event, set(Event)]
-    for event in Events:
-        event_course_name = event.get_course_name()
-
-        overlapping_secondary_curriculum_courses = []
-
-        for curriculum in curriculaManager.get_curricula():
-            primary_course_names = curriculum.get_primary_course_names()
-            secondary_course_names = curriculum.get_secondary_course_names()
-
-            # If the course isn't primary, we shouldn't add any of the secondary courses
-            if event_course_name not in primary_course_names:
-                continue
-
-            # This curricula containing the course in the primary section
-            # Add all the courses from the secondary part of the course into the overlapping_secondary_curriculum
-            for secondary_course_name in secondary_course_names:
-                secondary_course = courseManager.get_course_by_name(
-                    secondary_course_name
-                )
-                if secondary_course not in overlapping_secondary_curriculum_courses:
-                    overlapping_secondary_curriculum_courses.append(secondary_course)
-
-        # Now convert all these courses into events using the CourseEvent dictionary
-        secondary_curricula_events = []
-        for course in overlapping_secondary_curriculum_courses:
-            secondary_curricula_events.extend(CourseEvents.get(course))
-
-        SCPS[event] = set(secondary_curricula_events)
-
-    # SCSS
-    # Dictionary mapping each secondary event to the set of other
-    # secondary courses in the same curriculum
-    SCSS = {}  # tySe is dict[Event, set(Event)]
-    for event in Events:
-        event_course: Course = event.get_course()
-        event_course_name: str = event_course.get_course_name()
-
-        overlapping_secondary_curriculum_courses: List[Course] = []
-
-        for curriculum in curriculaManager.get_curricula():
-            secondary_course_names = curriculum.get_secondary_course_names()
-
-            # If the course isn't secondary, we shouldn't add any of the secondary courses
-            if event_course_name not in secondary_course_names:
-                continue
-
-            # This curricula containing the course in the secondary section
-            # Add all the courses from the secondary part of the course into the overlapping_secondary_curriculum
-            # Exclude the event_course_name
-            for secondary_course_name in secondary_course_names:
-                secondary_course: Course = courseManager.get_course_by_name(
-                    secondary_course_name
-                )
-                if (
-                    secondary_course not in overlapping_secondary_curriculum_courses
-                    and secondary_course != event_course
-                ):
-                    overlapping_secondary_curriculum_courses.append(secondary_course)
-
-        # Now convert all these courses into events using the CourseEvent dictionary
-        secondary_curricula_events: List[Event] = []
-        for course in overlapping_secondary_curriculum_courses:
-            secondary_curricula_events.extend(CourseEvents.get(course))
-
-        SCSS[event] = set(secondary_curricula_events)
-
-    # The sets containing pairs to be considered for the S3 soft constraint
-    # constraints and objective contribution
-
-    # DPPrimaryPrimary is the set of event tuples from examinations of which their courses
-    # are found in the same primary curriculum
-    # This only applies to the first examination event if there are multiple
-    DPPrimaryPrimary: Set[Tuple[Event, Event]] = set()
-
-    # DPPrimaryPrimary is the set of event tuples from examinations of which
-    # the first corresponding course is primary and the second corresponding
-    # course is seconday
-    DPPrimarySecondary: Set[Tuple[Event, Event]] = set()
-
-    # Construct DPPrimaryPrimary and DPPrimarySecondary
-    for c in curriculaManager.get_curricula():
-        primary_courses = [
-            courseManager.get_course_by_name(name)
-            for name in c.get_primary_course_names()
-        ]
-
-        secondary_courses = [
-            courseManager.get_course_by_name(name)
-            for name in c.get_secondary_course_names()
-        ]
-
-        for p1 in primary_courses:
-            p1_examinations = p1.get_examinations()
-
-            for p2 in primary_courses:
-                if p1.__eq__(p2):
-                    continue
-
-                p2_examinations = p2.get_examinations()
-
-                for p1_exam in p1_examinations:
-                    for p2_exam in p2_examinations:
-                        e1 = p1_exam.get_first_event()
-                        e2 = p2_exam.get_first_event()
-
-                        if (e1, e2) not in DPPrimaryPrimary:
-                            DPPrimaryPrimary.add((e1, e2))
+    # SCPS: primary event -> events of secondary courses in the same curriculum
+    # SCSS: secondary event -> events of other secondary courses in the same curriculum
+    SCPS: Dict[Event, Set[Event]] = instance.SCPS
+    SCSS: Dict[Event, Set[Event]] = instance.SCSS
 
-            for s in secondary_courses:
-                s_examinations = s.get_examinations()
+    # First events of courses in the same primary curriculum, and of a primary
+    # and a secondary course in the same curriculum, as n x 2 arrays of event ids
+    DPPrimaryPrimaryPairs: np.ndarray = instance.DPPrimaryPrimaryPairs
+    DPPrimarySecondaryPairs: np.ndarray = instance.DPPrimarySecondaryPairs
 
-                for p1_exam in p1_examinations:
-                    for s_exam in s_examinations:
-                        e1 = p1_exam.get_first_event()
-                        e2 = s_exam.get_first_event()
+    # Period preferences
+    undesired_event_periods: Dict[Event, Set[Period]] = instance.undesired_event_periods
+    preferred_periods: Dict[Event, Set[Period]] = instance.preferred_periods
+    global_undesired_periods: Set[Period] = instance.global_undesired_periods
 
-                        if (e1, e2) not in DPPrimarySecondary:
-                            DPPrimarySecondary.add((e1, e2))
-
-    # Soft constraint undesired period violation cost for event e to be assigned to
-    # period p
-    UndesiredPeriodCost = {}
-    undesired_event_periods: Dict[Event, Set[Period]] = {}
-    preferred_periods: Dict[Event, Set[Period]] = {}
-
-    for e in Events:
-        if event not in preferred_periods.keys():
-            preferred_periods[e] = set()
-
-    for (
-        preferred_event_period_constraint
-    ) in constrManager.get_preferred_event_period_constraints():
-        preferred_event_period_constraint: EventPeriodConstraint
-
-        exam_number: int = preferred_event_period_constraint.get_exam_ordinal()
-
-        course_name: str = preferred_event_period_constraint.get_course_name()
-        course: Course = courseManager.get_course_by_name(course_name)
-
-        period: Period = preferred_event_period_constraint.get_period()
-
-        examination: Examination = course.get_examination_by_index(exam_number)
-        exam_part: str = preferred_event_period_constraint.get_part()
-
-        if exam_part is None:
-            # exam only has one part
-            event: event = examination.get_first_event()
-        else:
-            event: Event = examination.get_event_by_part(exam_part)
-
-        preferred_periods[event].add(period)
-
-    global_undesired_periods = set(
-        p.get_period() for p in constrManager.get_undesired_period_constraints()
-    )
-    for e in Events:
-        undesired_event_periods[e] = set()
-        for c in constrManager.get_undesired_event_period_constraints():
-            if c.get_course_name() == e.get_course_name():
-                undesired_event_periods[e].add(c.get_period())
-
-    for e in Events:
-        for p in PA[e]:
-            if p in global_undesired_periods or p in undesired_event_periods[e]:
-                UndesiredPeriodCost[e, p] = const.P_UNDESIRED_PERIOD
-            elif p not in preferred_periods[e]:
-                UndesiredPeriodCost[e, p] = const.P_NOT_PREFERED_PERIOD
-            else:
-                UndesiredPeriodCost[e, p] = 0
-
-    # Soft constraint undesired room violation cost for event e to be assigned to
-    # period p. \alpha in the paper
-    UndesiredRoomCost = {}
-    undesired_event_rooms: Dict[Event, Set[Room]] = {}
-    for e in Events:
-        undesired_event_rooms[e] = set()
-        exam: Examination = e.get_examination()
-        exam_index: int = exam.get_index()
-
-        for (
-            event_room_constraint
-        ) in constrManager.get_undesired_event_room_constraints():
-            room_name: str = event_room_constraint.get_room_name()
-            room: Room = Rooms.get_room_by_name(room_name)
-
-            if (
-                event_room_constraint.get_course_name() == e.get_course_name()
-                and event_room_constraint.get_exam_ordinal() == exam_index
-            ):
-                undesired_event_rooms[e].add(room)
-
-    for e in Events:
-        for r in RA[e]:
-            if r in undesired_event_rooms[e]:
-                UndesiredRoomCost[e, r] = const.P_UNDESIRED_ROOM
-            else:
-                UndesiredRoomCost[e, r] = 0
-
-    # Dictionary mapping teachers to the set of events corresponding to courses
-    # taught by that teacher.
-    teacherEvents = {}
-    for course in courseManager.get_courses():
-        course_teacher = course.get_teacher()
-        if course_teacher in teacherEvents:
-            teacherEvents[course_teacher] |= {
-                ev for e in course.get_examinations() for ev in e.get_events()
-            }
-        else:
-            teacherEvents[course_teacher] = {
-                ev for e in course.get_examinations() for ev in e.get_events()
-            }
-
-    # Dictionary mapping curricula to events corresponding to their primary
-    # courses.
-    primary_events = {
-        curr: {
-            e
-            for name in curr.get_primary_course_names()
-            for exam in courseManager.get_course_by_name(name).get_examinations()
-            for e in exam.get_events()
-        }
-        for curr in curriculaManager.get_curricula()
-    }
-
-    # Set of all unorded pairs of events (stored as a frozenset) which are in
-    # S1 soft conflict
-    P1: Set[Event] = set()
-    # Soft conflict cost for each pair
-    SOFT_CONFLICT = {}
-    # Add primary-secondary conflicts first
-    for c in curriculaManager.get_curricula():
-        for name1 in c.get_primary_course_names():
-            for name2 in c.get_secondary_course_names():
-                new_events = {
-                    frozenset((ev1, ev2))
-                    for ex1 in courseManager.get_course_by_name(
-                        name1
-                    ).get_examinations()
-                    for ex2 in courseManager.get_course_by_name(
-                        name2
-                    ).get_examinations()
-                    for ev1 in ex1.get_events()
-                    for ev2 in ex2.get_events()
-                }
-                for e in new_events:
-                    P1.add(e)
-                    SOFT_CONFLICT[e] = const.SC_PRIMARY_SECONDARY
-    # Add secondary-secondary conflicts -- BE CAREFUL NOT TO OVERWRITE PRIMARY-PRIMARY COSTS
-    for c in curriculaManager.get_curricula():
-        for name1 in c.get_secondary_course_names():
-            for name2 in c.get_secondary_course_names():
-                new_events = {
-                    frozenset((ev1, ev2))
-                    for ex1 in courseManager.get_course_by_name(
-                        name1
-                    ).get_examinations()
-                    for ex2 in courseManager.get_course_by_name(
-                        name2
-                    ).get_examinations()
-                    for ev1 in ex1.get_events()
-                    for ev2 in ex2.get_events()
-                }
-                for e in new_events:
-                    if e not in P1:
-                        P1.add(e)
-                        SOFT_CONFLICT[e] = const.SC_SECONDARY_SECONDARY
-
-    # Rooms available per period
-    # Dict mapping (Period, room_type, room_size) to number of rooms available
-    rooms_available: Dict[Tuple[Period, str, int], int] = {}
-
-    # Rooms available by size per period
-    forbidden_rooms_by_period_and_type: Dict[
-        Tuple[Period, Union[const.SMALL, const.MEDIUM, const.LARGE]], List[Room]
-    ] = {}
-    undesired_rooms_by_period_and_type: Dict[
-        Tuple[Period, Union[const.SMALL, const.MEDIUM, const.LARGE]], List[Room]
-    ] = {}
-
-    # Dictionary mapping periods to the set of rooms available (i.e. not forbidden)
-    # in that period. Used in BSP
-    RoomsAvailable = {
-        p: {r for r in Rooms if not constrManager.is_forbidden(r.get_room_name(), p)}
-        for p in Periods
-    }
+    # Undesired rooms of each event
+    undesired_event_rooms: Dict[Event, Set[Room]] = instance.undesired_event_rooms
 
     print("Calculating Sets:", time.time() - previous_time, const.SECONDS)
     previous_time = time.time()
@@ -695,16 +160,30 @@ def solve(instance_filename: str) -> None:
 
     # ------ Variables ------
     # Y = 1 if event e is assigned to day d and timeslot t, 0 else (auxiliary variable)
-    Y = {(e, p): BMP.addVar(vtype=GRB.BINARY) for e in Events for p in PA[e]}
-
-    # The ordinal (order) value of the period assigned to event e
-    H = {e: BMP.addVar(vtype=GRB.INTEGER) for e in Events}
+    # H = The ordinal (order) value of the period assigned to event e
+    # Built along with the room pre-cuts and constraints 3, 4, 5 and 7. See
+    # MasterBuilder.py
+    if use_matrix_api:
+        Y, H = build_assignment_matrix(BMP, instance)
+    else:
+        Y, H = build_assignment(BMP, instance)
 
     # Soft constraint counting variables. The paper claims that all of these may be
     # relaxed to be continuous.
-    # S1
-    SPS = {(e, p): BMP.addVar(vtype=GRB.CONTINUOUS) for e in Events for p in Periods}
-    SSS = {(e, p): BMP.addVar(vtype=GRB.CONTINUOUS) for e in Events for p in Periods}
+    # S1. Only over the periods each event can be held in, and only for events
+    # which have a soft conflict with another event
+    SPS = {
+        (e, p): BMP.addVar(vtype=GRB.CONTINUOUS)
+        for e in Events
+        if len(SCPS[e]) > 0
+        for p in PA[e]
+    }
+    SSS = {
+        (e, p): BMP.addVar(vtype=GRB.CONTINUOUS)
+        for e in Events
+        if len(SCSS[e]) > 0
+        for p in PA[e]
+    }
 
     # estimate of the number of events allocated to undesired rooms in each period
     # Can definitely be relaxed to continuous
@@ -715,32 +194,42 @@ def solve(instance_filename: str) -> None:
     PMinWO = {(e1, e2): BMP.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPWrittenOral}
     PMaxWO = {(e1, e2): BMP.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPWrittenOral}
     PMinPP = {
-        (e1, e2): BMP.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPPrimaryPrimary
+        (Events[e1], Events[e2]): BMP.addVar(vtype=GRB.CONTINUOUS)
+        for e1, e2 in DPPrimaryPrimaryPairs.tolist()
     }
     PMinPS = {
-        (e1, e2): BMP.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPPrimarySecondary
+        (Events[e1], Events[e2]): BMP.addVar(vtype=GRB.CONTINUOUS)
+        for e1, e2 in DPPrimarySecondaryPairs.tolist()
     }
 
-    # Variables for S3 soft constraints
+    # Variables for S3 soft constraints. These only exist for pairs of events
+    # with a distance constraint, so the number of them grows with the number
+    # of constrained pairs rather than with |E|^2. Created in event id order so
+    # the model is the same from run to run
+    def by_id(pairs: Set[Tuple[Event, Event]]) -> List[Tuple[Event, Event]]:
+        return sorted(pairs, key=lambda pair: (pair[0].get_id(), pair[1].get_id()))
+
+    DistancePairs = by_id(DPDirected | DPUndirected)
+    UndirectedPairs = by_id(DPUndirected)
+
     # Abs distances between assignment of e1 and e2
-    D_abs = {(e1, e2): BMP.addVar(vtype=GRB.INTEGER) for e1 in Events for e2 in Events}
+    D_abs = {(e1, e2): BMP.addVar(vtype=GRB.INTEGER) for (e1, e2) in DistancePairs}
 
     # Actual distances between assignments of e1 and e2
     D_actual = {
         (e1, e2): BMP.addVar(vtype=GRB.INTEGER, lb=-GRB.INFINITY)
-        for e1 in Events
-        for e2 in Events
+        for (e1, e2) in UndirectedPairs
     }
     # 1 if D_actual[e1, e2] is positive
-    G = {(e1, e2): BMP.addVar(vtype=GRB.BINARY) for e1 in Events for e2 in Events}
+    G = {(e1, e2): BMP.addVar(vtype=GRB.BINARY) for (e1, e2) in UndirectedPairs}
 
     # Abs Val of D_actual[e1, e2] or Zero
     D_actual_abs_1 = {
-        (e1, e2): BMP.addVar(vtype=GRB.INTEGER) for e1 in Events for e2 in Events
+        (e1, e2): BMP.addVar(vtype=GRB.INTEGER) for (e1, e2) in UndirectedPairs
     }
     # Abs value of D_actual[e1, e2] or Zero
     D_actual_abs_2 = {
-        (e1, e2): BMP.addVar(vtype=GRB.INTEGER) for e1 in Events for e2 in Events
+        (e1, e2): BMP.addVar(vtype=GRB.INTEGER) for (e1, e2) in UndirectedPairs
     }
 
     print("Variables Defined:", time.time() - previous_time, const.SECONDS)
@@ -748,170 +237,6 @@ def solve(instance_filename: str) -> None:
 
     # ------ Constraints ------
 
-    for p in Periods:
-        for room_type in const.ROOM_TYPES:
-            for room_size in range(
-                1, Rooms.get_max_members_by_room_type(room_type) + 1
-            ):
-                # Set to the number of rooms of this type and size
-                rooms_available[
-                    p, room_type, room_size
-                ]: int = Rooms.get_num_compatible_rooms(room_type, room_size)
-
-                # Subtract any forbidden rooms. Only considering forbidden room period constraints here.
-                for (
-                    forbidden_room_period_constraint
-                ) in constrManager.get_forbidden_room_period_constraints():
-                    frpc_period = forbidden_room_period_constraint.get_period()
-                    frpc_room: Room = Rooms.get_room_by_name(
-                        forbidden_room_period_constraint.get_room_name()
-                    )
-                    frpc_room_type: str = frpc_room.get_type()
-                    frpc_room_size: int = frpc_room.get_num_members()
-
-                    if (
-                        frpc_period == p
-                        and frpc_room_type == room_type
-                        and frpc_room_size
-                        in Rooms.get_compatible_room_types(room_type, room_size)
-                    ):
-                        rooms_available[p, room_type, room_size] -= 1
-
-                # A pre-cut for the BSP
-                BMP.addConstr(
-                    quicksum(
-                        Y[e, p]
-                        for e in Events
-                        if p in PA[e]
-                        if e.get_room_type() != const.DUMMY
-                        and e.get_num_rooms() == room_size
-                        and e.get_room_type() == room_type
-                    )
-                    <= Rooms.get_num_compatible_rooms(room_type, room_size)
-                )
-        # Number of rooms available by size per period
-        # This will be handy for callback
-
-        for room_type in const.ROOM_TYPES:
-            # Initialise empty list for every period and room type
-            forbidden_rooms_by_period_and_type[(p, room_type)] = []
-            undesired_rooms_by_period_and_type[(p, room_type)] = []
-
-            for (
-                forbidden_room_period_constraint
-            ) in constrManager.get_forbidden_room_period_constraints():
-                forbidden_room_period_constraint: RoomPeriodConstraint
-
-                room_period_constraint_period: Period = (
-                    forbidden_room_period_constraint.get_period()
-                )
-                level: str = forbidden_room_period_constraint.get_level()
-                room_name: str = forbidden_room_period_constraint.get_room_name()
-                room: Room = Rooms.get_room_by_name(room_name)
-
-                if level != const.FORBIDDEN:
-                    continue
-
-                if room_period_constraint_period != p:
-                    continue
-
-                if room.get_type() != room_type:
-                    continue
-
-                forbidden_rooms_by_period_and_type[(p, room_type)].append(room)
-
-                # Check if room is part of any composite rooms
-                # If so, add the composite room to the forbidden list as well
-                for composite_room in CompositeRooms:
-                    composite_room_members = composite_room.get_members()
-                    if room_name in composite_room_members:
-                        forbidden_rooms_by_period_and_type[(p, room_type)].append(
-                            composite_room
-                        )
-
-            for (
-                undesired_room_period_constraint
-            ) in constrManager.get_undesired_room_period_constraints():
-                undesired_room_period_constraint: RoomPeriodConstraint
-
-                room_period_constraint_period: Period = (
-                    undesired_room_period_constraint.get_period()
-                )
-                level: str = undesired_room_period_constraint.get_level()
-                room_name: str = undesired_room_period_constraint.get_room_name()
-                room: Room = Rooms.get_room_by_name(room_name)
-
-                if level != const.UNDESIRED:
-                    continue
-
-                if room_period_constraint_period != p:
-                    continue
-
-                if room.get_type() != room_type:
-                    continue
-
-                undesired_rooms_by_period_and_type[(p, room_type)].append(room_name)
-
-    # Number of available rooms by period, type of room, and number of joining members
-    # Excludes forbidden room_period constraints
-    # Number of joining members = 1 => single room
-    # Number of joining members > 1 => composite room
-    available_rooms_by_period_type_and_size: Dict[
-        Tuple[Period, str, int], List[Room]
-    ] = {}
-
-    # Begin by assigning all periods to have the same number of available rooms
-    for period in Periods:
-        for room_type in const.ROOM_TYPES:
-            if Rooms.get_max_members_by_room_type(room_type) == 0:
-                continue
-
-            for num_members in range(
-                1, Rooms.get_max_members_by_room_type(room_type) + 1
-            ):
-                available_rooms_by_period_type_and_size[
-                    (period, room_type, num_members)
-                ] = [
-                    room
-                    for room in Rooms.get_rooms_by_size_and_num_rooms(
-                        room_type, num_members
-                    )
-                    if room
-                    not in forbidden_rooms_by_period_and_type[(period, room_type)]
-                ]
-
-    # Each event is scheduled to exactly one time period
-    ScheduledOnce = {
-        e: BMP.addConstr(quicksum(Y[e, p] for p in PA[e]) == 1) for e in Events
-    }
-
-    # Constraint 4: Some events must precede other events
-    Precendences = {(e1, e2): BMP.addConstr(H[e1] - H[e2] <= -1) for (e1, e2) in F}
-
-    # Constraint 5: H3 hard conflicts
-    HardConflictsPrimary = {
-        (c, p): BMP.addConstr(
-            quicksum(Y[e, p] for e in primary_events[c] if p in PA[e]) <= 1
-        )
-        for c in curriculaManager.get_curricula()
-        for p in Periods
-    }
-    HardConflictsTeacher = {
-        (t, p): BMP.addConstr(
-            quicksum(Y[e, p] for e in teacherEvents[t] if p in PA[e]) <= 1
-        )
-        for t in teacherEvents  # loops over keys
-        for p in Periods
-    }
-
-    # Constraint 7: Set values of H_e
-    setH = {
-        e: BMP.addConstr(
-            quicksum(p.get_ordinal_value() * Y[e, p] for p in PA[e]) == H[e]
-        )
-        for e in Events
-    }
-
     # Constraint 8 (S1): Soft Conflicts
     SoftConflicts = {
         (e, p): BMP.addConstr(
@@ -921,8 +246,7 @@ def solve(instance_filename: str) -> None:
             <= SPS[e, p]
             + len([e2 for e2 in SCPS[e] if (e, e2) in DPDirected and p in PA[e2]])
         )
-        for e in Events
-        for p in PA[e]
+        for (e, p) in SPS
     }
 
     # Constraint 9 (S2): Preferences
@@ -934,8 +258,7 @@ def solve(instance_filename: str) -> None:
             <= SSS[e, p]
             + len({e2 for e2 in SCSS[e] if (e, e2) in DPDirected and p in PA[e2]})
         )
-        for e in Events
-        for p in PA[e]
+        for (e, p) in SSS
     }
 
     # Sharp lower bound on the of S1 estimation variables.
@@ -1046,7 +369,7 @@ def solve(instance_filename: str) -> None:
         )
 
     Constraint23 = {}
-    for e1, e2 in DPPrimaryPrimary:
+    for e1, e2 in PMinPP:
         e1_course: Course = e1.get_course()
         e2_course: Course = e2.get_course()
 
@@ -1055,7 +378,7 @@ def solve(instance_filename: str) -> None:
         )
 
     # Constraint24 = {}
-    # for e1, e2 in DPPrimarySecondary:
+    # for e1, e2 in PMinPS:
     #     e1_course: Course = e1.get_course()
     #     e2_course: Course = e2.get_course()
 
@@ -1067,9 +390,8 @@ def solve(instance_filename: str) -> None:
 
     BMP.setObjective(
         # Cost S1
-        const.SC_PRIMARY_SECONDARY * quicksum(SPS[e, p] for e in Events for p in PA[e])
-        + const.SC_SECONDARY_SECONDARY
-        * quicksum(SSS[e, p] for e in Events for p in PA[e])
+        const.SC_PRIMARY_SECONDARY * quicksum(SPS.values())
+        + const.SC_SECONDARY_SECONDARY * quicksum(SSS.values())
         # Cost S2
         + const.P_UNDESIRED_PERIOD
         * (
@@ -1090,10 +412,8 @@ def solve(instance_filename: str) -> None:
         + const.DD_SAME_COURSE * quicksum(PMinE[e1, e2] for (e1, e2) in DPSameCourse)
         + const.DD_SAME_EXAMINATION
         * quicksum(PMinWO[e1, e2] + PMaxWO[e1, e2] for (e1, e2) in DPWrittenOral)
-        + const.UD_PRIMARY_PRIMARY
-        * quicksum(PMinPP[e1, e2] for (e1, e2) in DPPrimaryPrimary)
-        + const.UD_PRIMARY_SECONDARY
-        * quicksum(PMinPS[e1, e2] for (e1, e2) in DPPrimarySecondary),
+        + const.UD_PRIMARY_PRIMARY * quicksum(PMinPP.values())
+        + const.UD_PRIMARY_SECONDARY * quicksum(PMinPS.values()),
         GRB.MINIMIZE,
     )
 
@@ -1102,149 +422,199 @@ def solve(instance_filename: str) -> None:
     previous_time = time.time()
     print("Defined Gurobi Model:", time.time() - previous_time, const.SECONDS)
 
-    # Keeps track of set of events we've seen. If we've seen this set before in period p and the BSP was
-    # infeasible then add a no good cut.
-    seem_event_sets: Dict[Period, Set[frozenset[Event]]] = {p: set() for p in Periods}
-
     X_global: Dict[Tuple[Event, Period], Room] = {}
 
+    # One BSP per period, built the first time the period is checked and then
+    # updated with the events of each incumbent rather than rebuilt. The BSPs
+    # of an incumbent are solved on worker threads when workers > 1. With
+    # minimal_cuts an infeasible BSP also finds a minimal set of conflicting
+    # events, and only a no good cut over them is added
+    subproblems = PeriodSubproblems(instance, workers, explain=minimal_cuts)
+
+    # Results of solved BSPs as (feasible, objective, room of each event), keyed
+    # by period and the events assigned to it. Once full the least recently
+    # used result is dropped
+    _SolveBSP: OrderedDict[Tuple[Period, frozenset], BSPResult] = OrderedDict()
+    BSPCacheCounts = {"hits": 0, "misses": 0}
+
+    def SolveBSPs(EventsByPeriod: Dict[Period, Set[Event]]) -> Dict[Period, BSPResult]:
+        results: Dict[Period, BSPResult] = {}
+        unsolved: Dict[Period, Set[Event]] = {}
+        for p, EventsP in EventsByPeriod.items():
+            key = (p, frozenset(EventsP))
+            if key in _SolveBSP:
+                BSPCacheCounts["hits"] += 1
+                _SolveBSP.move_to_end(key)
+                results[p] = _SolveBSP[key]
+            else:
+                BSPCacheCounts["misses"] += 1
+                unsolved[p] = EventsP
+
+        for p, result in subproblems.solve_all(unsolved).items():
+            results[p] = result
+            _SolveBSP[p, frozenset(unsolved[p])] = result
+            if len(_SolveBSP) > const.BSP_CACHE_SIZE:
+                _SolveBSP.popitem(last=False)
+
+        # Keep the order of EventsByPeriod so cuts are added in period order
+        return {p: results[p] for p in EventsByPeriod}
+
+    # The incumbent the callback last evaluated: the period of each event, the
+    # events in each period and the BSP result of each period
+    LastPeriodOf: Dict[Event, Period] = {}
+    EventsByPeriod: Dict[Period, Set[Event]] = {}
+    BSPResults: Dict[Period, BSPResult] = {}
+
+    # Bound at the end of the root node and time the first incumbent with
+    # every BSP feasible was found
+    Progress = {"root bound": None, "first feasible": None}
+
+    # Benders cuts are built from their period, events, kind and right hand
+    # side, so cuts from the pool of an earlier run can be added again
+    def BendersCut(p: Period, EventsP: List[Event], kind: str, rhs: float):
+        if kind == cutpool.NO_GOOD:
+            return quicksum((1 - Y[e, p]) for e in EventsP) >= rhs
+
+        if kind == cutpool.OPTIMALITY:
+            return S2[p] >= rhs * (1 - quicksum((1 - Y[e, p]) for e in EventsP))
+
+        # For now just constrain number of events to number of rooms available in the period
+        # regardless of type
+        room_type, room_size = cutpool.parse_capacity_kind(kind)
+        return quicksum(
+            Y[e, p]
+            for e in EventsP
+            if e.get_num_rooms() == room_size and e.get_room_type() == room_type
+        ) <= rhs - quicksum(
+            Y[e, p]
+            * e.get_num_rooms()
+            * Rooms.get_independence_number(e.get_room_type(), e.get_num_rooms())
+            for e in EventsP
+            if e.get_num_rooms() > room_size and e.get_room_type() == room_type
+        ) - quicksum(
+            Y[e, p]
+            for e in EventsP
+            if room_size == 1
+            and e.get_num_rooms() == room_size
+            and e.get_room_type()
+            in Rooms.get_compatible_room_types(room_type, room_size)[1:]
+            # Where the room type is effectively "larger" hence [1:].
+        )
+
+    # Every cut added is kept in the cut pool
+    Pool = cutpool.CutPool.load(cutpool.cut_pool_path(instance))
+
+    def AddCut(model, p: Period, EventsP, kind: str, rhs: float) -> None:
+        EventsP = sorted(EventsP, key=Event.get_id)
+        Pool.add(p.get_id(), [e.get_id() for e in EventsP], kind, rhs)
+        model.cbLazy(BendersCut(p, EventsP, kind, rhs))
+
+    # The best timetable found, with its rooms, is checkpointed along with the
+    # cut pool every checkpoint_interval seconds. With resume the solve starts
+    # from the checkpoint of an earlier run. See Checkpoint.py
+    if resume:
+        Saved = Checkpoint.load(
+            checkpoint_path(instance), instance, checkpoint_interval
+        )
+    else:
+        Saved = Checkpoint(checkpoint_path(instance), checkpoint_interval)
+
+    def SaveCheckpoint(runtime: float) -> None:
+        Saved.save(runtime)
+        Pool.save()
+
     def Callback(model, where):
+        if where == GRB.Callback.MIP:
+            Saved.update_bound(model.cbGet(GRB.Callback.MIP_OBJBND))
+            if Saved.due(model.cbGet(GRB.Callback.RUNTIME)):
+                SaveCheckpoint(model.cbGet(GRB.Callback.RUNTIME))
+            return
+
+        if where == GRB.Callback.MIPNODE:
+            if model.cbGet(GRB.Callback.MIPNODE_NODCNT) == 0:
+                Progress["root bound"] = model.cbGet(GRB.Callback.MIPNODE_OBJBND)
+            return
+
         if where != GRB.Callback.MIPSOL:
             return
 
-        print("Callback")
         YV = model.cbGetSolution(Y)
+        S2V = model.cbGetSolution(S2)
 
         numCuts = 0
 
-        for p in Periods:
-            # Sets
-
-            # Set of events that are assigned to period p (from the master problem)
-            EventsP = {
-                e for e in Events if p in PA[e] and YV[e, p] > const.BINARY_ONE_BOUND
-            }
-
-            # Set of events assigned to period p requiring room with type room_type and # members num_rooms
-            events_p_by_type_and_size: Dict[Tuple[str, int], List[Event]] = {}
-            for room_type in const.ROOM_TYPES:
-                for room_size in range(
-                    1, Rooms.get_max_members_by_room_type(room_type) + 1
-                ):
-                    events_p_by_type_and_size[(room_type, room_size)] = [
-                        e
-                        for e in EventsP
-                        if e.get_room_type() == room_type
-                        and e.get_num_rooms() == room_size
-                    ]
-
-            # Set of single member rooms and other composite rooms with members in common as rc
-            OverlappingP = {
-                rc: Rooms.get_overlapping_rooms(rc) & (RoomsAvailable[p] - {rc})
-                for rc in CompositeRooms
-            }
-
-            # Define Sub Problem
-            BSP = Model("BSP for Period " + str(p))
-
-            # Set output flag off/on
-            BSP.setParam("OutputFlag", 0)
-
-            # Variables in Subproblem
-
-            # X = 1 if event e is assigned to period p and room r, 0 else
-            X = {
-                (e, r): BSP.addVar(vtype=GRB.BINARY)
-                for e in EventsP
-                for r in RA[e]
-                if r in RoomsAvailable[p]
-            }
-
-            # Subproblem objective function
-
-            BSP.setObjective(
-                quicksum(
-                    X[e, r]
-                    for e in EventsP
-                    for r in undesired_event_rooms[e]
-                    if r in RA[e] and r in RoomsAvailable[p]
-                ),
-                GRB.MINIMIZE,
-            )
+        # Period each event is assigned to (from the master problem)
+        PeriodOf: Dict[Event, Period] = {
+            e: p for (e, p), value in YV.items() if value > const.BINARY_ONE_BOUND
+        }
 
-            # Subproblem Constraints
+        # Only the periods an event has moved into or out of since the last
+        # incumbent need their BSP solved again
+        if not LastPeriodOf:
+            ChangedPeriods = set(Periods)
+        else:
+            ChangedPeriods = set()
+            for e, p in PeriodOf.items():
+                if LastPeriodOf[e] is not p:
+                    ChangedPeriods.update((LastPeriodOf[e], p))
+        LastPeriodOf.update(PeriodOf)
+
+        for p in ChangedPeriods:
+            EventsByPeriod[p] = set()
+        for e, p in PeriodOf.items():
+            if p in ChangedPeriods:
+                EventsByPeriod[p].add(e)
+
+        print(
+            "Callback:",
+            len(ChangedPeriods),
+            "periods changed,",
+            len(Periods) - len(ChangedPeriods),
+            "skipped",
+        )
 
-            # Each event assigned to an available period and exactly 1 room.
-            AssignedRooms = {
-                e: BSP.addConstr(
-                    quicksum(X[e, r] for r in RA[e] if r in RoomsAvailable[p]) == 1
-                )
-                for e in EventsP
-            }
-
-            # At most one event can use a room at once.
-            RoomClashes = {
-                r: BSP.addConstr(quicksum(X[e, r] for e in EventsP if r in RA[e]) <= 1)
-                for r in RoomsAvailable[p]
-                if r is not dummy_room
-            }
-
-            # Composite room overlap
-            CompositeOverlap = {
-                rc: BSP.addConstr(
-                    len(OverlappingP[rc])
-                    * quicksum(X[e, rc] for e in EventsP if rc in RA[e])
-                    + quicksum(
-                        X[e, r0]
-                        for r0 in OverlappingP[rc]
-                        for e in EventsP
-                        if r0 in RA[e]
-                    )
-                    <= len(OverlappingP[rc])
-                )
-                for rc in CompositeRooms & RoomsAvailable[p]
-            }
+        # Assign the events to each changed period's BSP and solve them, unless
+        # a set of events has been seen in its period before. All BSPs are
+        # solved before any cut is added. Unchanged periods keep their last
+        # result, and their cuts are added again
+        BSPResults.update(
+            SolveBSPs({p: EventsByPeriod[p] for p in Periods if p in ChangedPeriods})
+        )
 
-            BSP.optimize()
+        for p in Periods:
+            EventsP = EventsByPeriod[p]
+            feasible, BSPObj, BSPRooms, Conflict = BSPResults[p]
 
             # Check if BSP is infeasible. If it is, I need to add a feasability cut to prevent as many events
             # being allocated to this period
 
-            if BSP.status == GRB.INFEASIBLE:
+            if not feasible and minimal_cuts:
+                # No good cut over a minimal set of events which can't all be
+                # given rooms in the period
+                print(
+                    "Adding minimal no good cut for period",
+                    p,
+                    f"({len(Conflict)} of {len(EventsP)} events)",
+                )
+                AddCut(model, p, Conflict, cutpool.NO_GOOD, 1)
+
+            elif not feasible:
                 print("##############   Infeasible subproblem")
                 # Subproblem was infeasible. Add feasability cut
 
-                # Find number of events allocated to period p that request small rooms
-                room_allocations: Dict[str, int] = {}
-                for room_type in const.ROOM_TYPES:
-                    # Initialise allocations to 0 if not set already
-                    if room_allocations.get(room_type) is None:
-                        room_allocations[room_type] = 0
-
-                    # Loop over events and add to allocations if event is allocated to room
-                    # ensuring to add the number of rooms for composite events.
-                    for e in EventsP:
-                        # If the event was scheduled in this period
-                        if (
-                            YV[e, p] > const.BINARY_ONE_BOUND
-                            and e.get_room_type() == room_type
-                        ):
-                            # Add the number of rooms required by the event.
-                            room_allocations[room_type] += e.get_num_rooms()
-
                 # Just remember that a room request of small can use larger rooms
                 # but this doesn't apply to composite rooms
 
-                # Add a no good cut to say this exact combination isn't feasible
-
-                # Uncomment to add no good cut
-                if frozenset(EventsP) in seem_event_sets[p]:
-                    print("Adding no Good cut", p)
-                    model.cbLazy(quicksum((1 - Y[e, p]) for e in EventsP) >= 1)
+                # Add a no good cut to say this exact combination isn't feasible.
+                # The capacity cuts below don't always cut off the incumbent,
+                # which Gurobi would then accept
+                print("Adding no Good cut", p)
+                AddCut(model, p, EventsP, cutpool.NO_GOOD, 1)
 
                 # Idea of other constraint I had
                 # Feasibility cut is different for each room type.
                 print("Adding feasibility cut for period", p)
+                RoomedEvents = [e for e in EventsP if e.room_required()]
                 for room_type in const.ROOM_TYPES:
                     # SMALL, MEDIUM and LARGE, excluding composite.
                     if Rooms.get_max_members_by_room_type(room_type) == 0:
@@ -1255,73 +625,53 @@ def solve(instance_filename: str) -> None:
                     ):
                         # Limit the number of events allocated to period p of type room_type
                         # with num_members members
-
-                        # For now just constrain number of events to number of rooms available in the period
-                        # regardless of type
-                        model.cbLazy(
-                            quicksum(
-                                Y[e, p]
-                                for e in EventsP
-                                if e.get_room_type() != const.DUMMY
-                                and e.get_num_rooms() == room_size
-                                and e.get_room_type() == room_type
-                            )
-                            <= Rooms.get_num_compatible_rooms(room_type, room_size)
-                            - quicksum(
-                                Y[e, p]
-                                * e.get_num_rooms()
-                                * Rooms.get_independence_number(
-                                    e.get_room_type(), e.get_num_rooms()
-                                )
-                                for e in EventsP
-                                if e.get_num_rooms() > room_size
-                                and e.get_room_type() == room_type
-                            )
-                            - quicksum(
-                                Y[e, p]
-                                for e in EventsP
-                                if room_size == 1
-                                and e.get_num_rooms() == room_size
-                                and e.get_room_type()
-                                in Rooms.get_compatible_room_types(
-                                    room_type, room_size
-                                )[1:]
-                                # Where the room type is effectively "larger" hence [1:].
-                            )
+                        AddCut(
+                            model,
+                            p,
+                            RoomedEvents,
+                            cutpool.capacity_kind(room_type, room_size),
+                            Rooms.get_num_compatible_rooms(room_type, room_size),
                         )
 
                 # Now go solve the master problem again
             else:
                 # BSP is feasible.
                 # Set X_global so we can access this later during printing
-                for e in EventsP:
-                    for r in RA[e]:
-                        if (
-                            r in RoomsAvailable[p]
-                            and X[e, r].x > const.BINARY_ONE_BOUND
-                        ):
-                            X_global[e, p] = r
-
-                # Update the objective function of the master problem
-                # print("Adding optimality cut for period", p, S2V[p], BSP.objVal)
-                model.cbLazy(
-                    S2[p]
-                    >= BSP.objVal
-                    * (
-                        1
-                        - quicksum(
-                            (1 - Y[e, p])
-                            for e in EventsP
-                            if len(undesired_event_rooms[e]) > 0
-                        )
+                for e, r in BSPRooms.items():
+                    X_global[e, p] = r
+
+                # Update the objective function of the master problem, if the
+                # estimate is too low. Gurobi rejects a MIP start whenever a
+                # cut is added for it, even one it satisfies
+                if S2V[p] < BSPObj - const.EPS:
+                    # print("Adding optimality cut for period", p, S2V[p], BSPObj)
+                    AddCut(
+                        model,
+                        p,
+                        [e for e in EventsP if len(undesired_event_rooms[e]) > 0],
+                        cutpool.OPTIMALITY,
+                        BSPObj,
                     )
-                )
 
-            # Add to seem_event_sets
+            numCuts += 1
 
-            seem_event_sets[p].add(frozenset(EventsP))
+        if all(BSPResults[p][0] for p in Periods):
+            if Progress["first feasible"] is None:
+                Progress["first feasible"] = model.cbGet(GRB.Callback.RUNTIME)
+
+            # The timetable is feasible even if an optimality cut rejects it, and
+            # costs its S2 estimates replaced by the BSP objectives
+            Saved.update(
+                PeriodOf,
+                {e: r for p in Periods for e, r in BSPResults[p][2].items()},
+                model.cbGet(GRB.Callback.MIPSOL_OBJ)
+                + const.P_UNDESIRED_ROOM
+                * sum(BSPResults[p][1] - S2V[p] for p in Periods),
+            )
 
-            numCuts += 1
+        Saved.update_bound(model.cbGet(GRB.Callback.MIPSOL_OBJBND))
+        if Saved.due(model.cbGet(GRB.Callback.RUNTIME)):
+            SaveCheckpoint(model.cbGet(GRB.Callback.RUNTIME))
 
     # Bender's Master Problem Config
 
@@ -1341,21 +691,220 @@ def solve(instance_filename: str) -> None:
     BMP.setParam("MIPFocus", 2)
 
     # Memory limit
-    BMP.setParam("SoftMemLimit", 60)
+    BMP.setParam("SoftMemLimit", memory_limit)
+
+    # Time Limit, less the time earlier runs of a resumed solve took. The
+    # warm-up's time is taken off it too
+    TimeLeft = max(time_limit - Saved.get_runtime(0), 0)
+    BMP.setParam("TimeLimit", TimeLeft)
+
+    # Threads of the master problem
+    BMP.setParam("Threads", threads)
+
+    # Optionally solve the LP relaxation first, separating the nested room
+    # capacity cuts and the per period independence number cuts of the
+    # composite rooms on the fractional Y until none are violated. The cuts
+    # are kept when integrality is restored
+    if warm_up:
+        warm_up_start = time.time()
+        BMP.update()
+        IntegerVars = [(v, v.VType) for v in BMP.getVars() if v.VType != GRB.CONTINUOUS]
+        for v, _ in IntegerVars:
+            v.VType = GRB.CONTINUOUS
+
+        YKeys = list(Y)
+        YVars = list(Y.values())
+        YEvents = np.array([e.get_id() for e, _ in YKeys])
+        YPeriods = np.array([p.get_id() for _, p in YKeys])
+        Levels = capacity_levels(instance) + independence_levels(instance)
+
+        # The Y of each level's cut in each period, with their weights, so a
+        # violated cut is built from its own terms only
+        LevelTerms: List[List[List[Tuple[float, Var]]]] = []
+        for weights, _ in Levels:
+            Terms = [[] for _ in Periods]
+            for i in np.flatnonzero(weights[YEvents] > 0).tolist():
+                Terms[YPeriods[i]].append((weights[YEvents[i]], YVars[i]))
+            LevelTerms.append(Terms)
+
+        BMP.setParam("OutputFlag", 0)
+        rounds = totalCuts = 0
+        LPBound = None
+        while True:
+            BMP.setParam("TimeLimit", max(TimeLeft - (time.time() - warm_up_start), 0))
+            BMP.optimize()
+            rounds += 1
+
+            # Stop warming up if the LP wasn't solved, e.g. it hit the time
+            # limit. The cuts added so far are kept
+            if BMP.Status != GRB.OPTIMAL:
+                print(
+                    "Warm up stopped:",
+                    STATUS_NAMES.get(BMP.Status, BMP.Status),
+                    "solving the LP",
+                )
+                break
 
-    # Time Limit
-    BMP.setParam("TimeLimit", 60 * 30)
+            LPBound = BMP.ObjVal
+            YValues = np.array(BMP.getAttr("X", YVars))
+
+            CutsAdded = 0
+            for (weights, capacities), Terms in zip(Levels, LevelTerms):
+                load = np.bincount(
+                    YPeriods,
+                    weights=weights[YEvents] * YValues,
+                    minlength=len(Periods),
+                )
+                for p in np.flatnonzero(load > capacities + const.EPS).tolist():
+                    BMP.addConstr(quicksum(w * y for w, y in Terms[p]) <= capacities[p])
+                    CutsAdded += 1
+
+            if CutsAdded == 0:
+                break
+            totalCuts += CutsAdded
+            print("Added", CutsAdded, "room cuts, LP bound", LPBound)
+
+        for v, vtype in IntegerVars:
+            v.VType = vtype
+        BMP.setParam("OutputFlag", 1)
+        TimeLeft = max(TimeLeft - (time.time() - warm_up_start), 0)
+
+        print(
+            "Warm up:",
+            totalCuts,
+            "cuts in",
+            rounds,
+            "rounds, LP bound",
+            LPBound,
+            "in",
+            time.time() - warm_up_start,
+            const.SECONDS,
+        )
+
+    # Start from the checkpoint being resumed, the timetable of a solution file
+    # or, failing those, one built by the greedy heuristic. See Checkpoint.py,
+    # WarmStart.py and Construction.py
+    StartPeriods: Dict[Event, Period] = None
+    if Saved.periods is not None:
+        StartPeriods = Saved.periods
+        for e, r in Saved.rooms.items():
+            X_global[e, StartPeriods[e]] = r
+        print(
+            "Resuming from",
+            Saved.path,
+            "after",
+            Saved.get_runtime(0),
+            const.SECONDS,
+            "with objective",
+            Saved.objective,
+            "and bound",
+            Saved.bound,
+        )
+    elif warm_start is not None:
+        StartPeriods, _, Unmapped = read_solution(warm_start, instance)
+        print(
+            "Warm start: mapped",
+            len(StartPeriods),
+            "of",
+            len(Events),
+            "events from",
+            warm_start,
+        )
+        for message in Unmapped:
+            print("    Not mapped:", message)
+    elif greedy_start:
+        greedy_time = time.time()
+        StartPeriods, _ = construct_timetable(instance, subproblems)
+        print(
+            "Greedy start: placed",
+            len(StartPeriods),
+            "of",
+            len(Events),
+            "events in",
+            time.time() - greedy_time,
+            const.SECONDS,
+        )
+
+    if StartPeriods is not None:
+        set_assignment_start(Y, H, StartPeriods)
+
+        # Rooms are left to the BSPs. S2 starts at the cost of the best rooms
+        # for each period, so the optimality cuts don't cut the start off
+        StartEvents: Dict[Period, Set[Event]] = {p: set() for p in Periods}
+        for e, p in StartPeriods.items():
+            StartEvents[p].add(e)
+        for p, (feasible, objective, _, _) in subproblems.solve_all(
+            StartEvents
+        ).items():
+            if feasible:
+                S2[p].Start = objective
+
+    # Add the cuts of earlier runs, as constraints or as lazy constraints. A
+    # resumed solve adds them as lazy constraints unless told otherwise
+    if resume and load_cuts is None:
+        load_cuts = "lazy"
+    if load_cuts is not None:
+        for period, event_ids, kind, rhs in Pool:
+            cut = BMP.addConstr(
+                BendersCut(Periods[period], [Events[e] for e in event_ids], kind, rhs)
+            )
+            if load_cuts == "lazy":
+                cut.Lazy = 1
+        print("Loaded", len(Pool), "cuts from", Pool.path, "as", load_cuts)
 
-    # Solve master problem with Callback
+    # Solve master problem with Callback, in the time the warm-up left
+    BMP.setParam("TimeLimit", TimeLeft)
     BMP.optimize(Callback)
+    subproblems.close()
+
+    Saved.update_bound(BMP.ObjBound)
+    SaveCheckpoint(BMP.Runtime)
+    print("Checkpoint saved to", Saved.path)
+    print(
+        "Saved",
+        len(Pool),
+        "cuts",
+        f"({len(Pool) - Pool.num_loaded} new) to",
+        Pool.path,
+    )
+
+    print("Root bound:", Progress["root bound"])
+    print("First feasible schedule:", Progress["first feasible"], const.SECONDS)
+
+    print(
+        "BSP cache:",
+        BSPCacheCounts["hits"],
+        "hits,",
+        BSPCacheCounts["misses"],
+        "misses",
+    )
+
+    Result = {
+        "status": STATUS_NAMES.get(BMP.status, str(BMP.status)),
+        "objective": None,
+        "bound": None,
+        "gap": None,
+        "runtime": BMP.Runtime,
+    }
 
     # Check feasibility
     if BMP.status == GRB.INFEASIBLE:
         print("#### WARNING: Model is infeasible")
-        raise Exception("Infeasible Model" + instance_filename)
+        return Result
+
+    if BMP.SolCount == 0:
+        print("#### WARNING: No solution found")
+        return Result
+
+    Result["objective"] = BMP.ObjVal
+    Result["bound"] = BMP.ObjBound
+    Result["gap"] = BMP.MIPGap
 
     # Define Solution object to generate save file
+    # DZN runs are saved apart from JSON runs of the same instance
     instance_name: str = os.path.splitext(instance_filename)[0]
+    if use_dzn:
+        instance_name += DZN_SUFFIX
     solution: Solution = Solution(instance_name, BMP.objVal)
 
     # ------ Print output ------
@@ -1399,15 +948,126 @@ def solve(instance_filename: str) -> None:
     solution.export()
     print("Saved solution to file")
 
+    return Result
+
+
+def add_solve_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds the options of solve to parser
+    """
+
+    parser.add_argument(
+        "--dzn",
+        action="store_true",
+        help="read the instance from Project/Solutions/InstancesDZN instead, if "
+        "it matches the one in Project/data, and save its solution apart",
+    )
+    parser.add_argument(
+        "--matrix",
+        action="store_true",
+        help="build the master problem's assignment blocks as sparse matrices",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=const.BSP_WORKERS,
+        help="number of threads the BSPs of an incumbent are solved on",
+    )
+    parser.add_argument(
+        "--minimal-cuts",
+        action="store_true",
+        help="cut infeasible BSPs with a no good over a minimal conflicting set",
+    )
+    parser.add_argument(
+        "--warm-up",
+        action="store_true",
+        help="separate room capacity cuts on the LP relaxation before branching",
+    )
+    parser.add_argument(
+        "--greedy-start",
+        action=argparse.BooleanOptionalAction,
+        default=const.GREEDY_START,
+        help="start the master problem from the greedy construction heuristic",
+    )
+    parser.add_argument(
+        "--warm-start",
+        metavar="SOLUTION",
+        help="start the master problem from a solution file",
+    )
+    parser.add_argument(
+        "--load-cuts",
+        choices=["constraints", "lazy"],
+        help="add the cuts saved by earlier runs on the instance",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="start from the checkpoint and cut pool of an interrupted run",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=const.CHECKPOINT_INTERVAL,
+        help="seconds between checkpoints of the incumbent and the cut pool",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="threads of the master problem, 0 for every core",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=const.TIME_LIMIT,
+        help="time limit of the master problem in seconds",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        default=const.MEMORY_LIMIT,
+        help="soft memory limit of the master problem in GB",
+    )
+
+
+def solve_options(args: argparse.Namespace) -> Dict[str, object]:
+    """
+    Returns the keyword arguments of solve given by the parsed options
+    """
+
+    return {
+        "use_dzn": args.dzn,
+        "use_matrix_api": args.matrix,
+        "workers": args.workers,
+        "minimal_cuts": args.minimal_cuts,
+        "warm_up": args.warm_up,
+        "greedy_start": args.greedy_start,
+        "warm_start": args.warm_start,
+        "load_cuts": args.load_cuts,
+        "resume": args.resume,
+        "checkpoint_interval": args.checkpoint_interval,
+        "threads": args.threads,
+        "time_limit": args.time_limit,
+        "memory_limit": args.memory_limit,
+    }
+
 
 def main():
     problem_path = os.path.join(".", "Project", "data")
     skipped = []
 
-    if len(sys.argv) > 1:
+    parser = argparse.ArgumentParser(
+        description="Solve instances with the Benders decomposition"
+    )
+    parser.add_argument("instance", nargs="?")
+    add_solve_arguments(parser)
+    args = parser.parse_args()
+    options = solve_options(args)
+
+    if args.instance is not None:
         # A filename argument was provided, run only that problem set
-        filename = sys.argv[1]
-        solve(filename)
+        filename = args.instance
+        solve(filename, **options)
         print("\n\n")
     else:
         # No filename argument provided, run all problem sets
@@ -1419,14 +1079,17 @@ def main():
                         ".",
                         "Project",
                         "OurSolutions",
-                        filename.replace(".json", "_sol.json"),
+                        filename.replace(
+                            ".json", (DZN_SUFFIX if args.dzn else "") + "_sol.json"
+                        ),
                     )
                 ):
                     print("Skipping", filename)
                     continue
 
                 try:
-                    solve(filename)
+                    if solve(filename, **options)["status"] == "infeasible":
+                        skipped.append(filename)
                 except Exception as e:
                     print("Exception occurred:", e)
                     skipped.append(filename)
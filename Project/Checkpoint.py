@@ -0,0 +1,168 @@
+"""
+Checkpoints of a Benders solve, so an interrupted run can be resumed rather
+than started over.
+
+A checkpoint holds the best timetable found, with the room of each event from
+its BSP, its objective, the best bound and the total runtime so far. The
+timetable is written in the solution file format, so it is read back with
+WarmStart.read_solution and can also be given to --warm-start. The cut pool is
+saved with each checkpoint (see CutPool.py).
+
+Checkpoints are kept in Project/cache/checkpoints under the hash of the
+instance's contents, like the cut pools, so DZN and JSON runs of an instance
+have separate checkpoints.
+"""
+
+import json
+import os
+from typing import Dict, List
+
+from gurobipy import GRB
+
+import Constants as const
+from Event import Event
+from Instance import CACHE_PATH, InstanceModel
+from Period import Period
+from Room import Room
+from WarmStart import read_solution
+
+# Bump when the layout of a checkpoint changes
+CHECKPOINT_VERSION = 1
+
+CHECKPOINT_PATH = os.path.join(CACHE_PATH, "checkpoints")
+
+
+def checkpoint_path(instance: InstanceModel) -> str:
+    """
+    Returns the file the checkpoint of the instance is kept in
+    """
+
+    ci = instance.compiled
+    return os.path.join(
+        CHECKPOINT_PATH,
+        f"{ci.name}-{ci.content_hash[:16]}-v{CHECKPOINT_VERSION}.json",
+    )
+
+
+class Checkpoint:
+    """
+    Best timetable of a solve, written to its file at most every interval
+    seconds
+    """
+
+    def __init__(self, path: str, interval: float = const.CHECKPOINT_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self.periods: Dict[Event, Period] = None
+        self.rooms: Dict[Event, Room] = None
+        self.objective = float("inf")
+        self.bound = -float("inf")
+        # Runtime of earlier runs, and of this run when last written
+        self.previous_runtime = 0.0
+        self.written_at = 0.0
+        self.changed = False
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        instance: InstanceModel,
+        interval: float = const.CHECKPOINT_INTERVAL,
+    ) -> "Checkpoint":
+        """
+        Returns the checkpoint saved in path, or an empty checkpoint if there
+        isn't one
+        """
+
+        checkpoint = cls(path, interval)
+        if os.path.isfile(path):
+            with open(path, "r") as file:
+                data = json.load(file)
+            checkpoint.periods, checkpoint.rooms, _ = read_solution(path, instance)
+            checkpoint.objective = data["Objective"]
+            checkpoint.bound = data["Bound"]
+            checkpoint.previous_runtime = data["Runtime"]
+
+        return checkpoint
+
+    def update(
+        self, periods: Dict[Event, Period], rooms: Dict[Event, Room], objective: float
+    ) -> bool:
+        """
+        Keeps the timetable if it is better than the best so far. Returns False
+        if it isn't
+        """
+
+        if objective >= self.objective - const.EPS:
+            return False
+
+        self.periods = dict(periods)
+        self.rooms = dict(rooms)
+        self.objective = objective
+        self.changed = True
+        return True
+
+    def update_bound(self, bound: float) -> None:
+        """
+        Keeps the bound if it is better than the best so far. Gurobi gives
+        -GRB.INFINITY before it has a bound
+        """
+
+        if bound > max(self.bound, -GRB.INFINITY):
+            self.bound = bound
+            self.changed = True
+
+    def get_runtime(self, runtime: float) -> float:
+        """
+        Returns the total runtime when this run has run for runtime seconds
+        """
+
+        return self.previous_runtime + runtime
+
+    def due(self, runtime: float) -> bool:
+        """
+        Returns True if the checkpoint should be written, when this run has run
+        for runtime seconds
+        """
+
+        return self.changed and runtime - self.written_at >= self.interval
+
+    def save(self, runtime: float) -> None:
+        """
+        Writes the checkpoint to its file, when this run has run for runtime
+        seconds. Nothing is written before there is a timetable
+        """
+
+        self.written_at = runtime
+        self.changed = False
+        if self.periods is None:
+            return
+
+        assignments: Dict[str, List[dict]] = {}
+        for e, p in sorted(self.periods.items(), key=lambda item: item[0].get_id()):
+            event_data = {
+                const.EXAM: e.get_examination().get_index(),
+                const.PART: e.get_event_type(),
+                const.PERIOD: p.get_ordinal_value(),
+            }
+            room = self.rooms.get(e)
+            if room is not None and room.get_room_name() != const.DUMMY:
+                event_data[const.ROOM] = room.get_room_name()
+            assignments.setdefault(e.get_course_name(), []).append(event_data)
+
+        data = {
+            "Objective": self.objective,
+            "Bound": self.bound,
+            "Runtime": self.get_runtime(runtime),
+            "Assignments": [
+                {const.COURSE: course_name, "Events": events}
+                for course_name, events in assignments.items()
+            ],
+        }
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write to a temporary file first so a run killed while writing keeps
+        # its last checkpoint
+        with open(self.path + ".tmp", "w") as file:
+            json.dump(data, file, indent=2)
+        os.replace(self.path + ".tmp", self.path)
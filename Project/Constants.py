@@ -94,6 +94,22 @@ UD_PRIMARY_SECONDARY = 2
 # Benders
 EPS = 0.0001
 
+# Maximum number of BSP results kept, keyed by period and set of events
+BSP_CACHE_SIZE = 10000
+
+# Number of threads the BSPs of an incumbent are solved on
+BSP_WORKERS = 1
+
+# Start the master problem from the greedy construction heuristic
+GREEDY_START = True
+
+# Seconds between checkpoints of the incumbent and the cut pool
+CHECKPOINT_INTERVAL = 60
+
 
 # Gurobi
 BINARY_ONE_BOUND = 0.9
+
+# Time limit in seconds and soft memory limit in GB of a solve
+TIME_LIMIT = 60 * 30
+MEMORY_LIMIT = 60
@@ -3,7 +3,7 @@ Class for handing constraints (hard and soft) in the problem
 """
 
 from abc import ABC
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from Period import Period
 import Constants as const
 
@@ -221,7 +221,28 @@ class ConstraintManager:
         self.constraints: List[Constraint] = []
         self.slots_per_day = slots_per_day
 
+        # Flag for if the constraint indexes have been constructed. No more
+        # constraints can be added after this
+        self.indexed = False
+
+        # Constraints bucketed by (level, type)
+        self.level_type_index: Dict[Tuple[str, str], Set[Constraint]] = {}
+
+        # Room period constraints by (room_name, period_ordinal)
+        self.room_period_index: Dict[Tuple[str, int], Set[RoomPeriodConstraint]] = {}
+
+        # Event period and event room constraints by (course, exam, part).
+        # Part is None if the constraint did not specify one
+        self.event_index: Dict[Tuple[str, int, Optional[str]], Set[Constraint]] = {}
+
+        # Event period and event room constraints by course name
+        self.course_index: Dict[str, Set[Constraint]] = {}
+
+        # Set of (room_name, period_ordinal) pairs which are forbidden
+        self.forbidden_room_periods: Set[Tuple[str, int]] = set()
+
     def add_constraint(self, constraint_data) -> Constraint:
+        assert not self.indexed
         constraint_type = constraint_data.get(const.TYPE)
         if constraint_type is None:
             raise ValueError("Constraint type is missing in constraint_data")
@@ -240,8 +261,45 @@ class ConstraintManager:
         new_constraint = constraint_class(constraint_data, self.slots_per_day)
 
         self.constraints.append(new_constraint)
+        self.index_constraint(new_constraint)
         return new_constraint
 
+    def index_constraint(self, constr: Constraint) -> None:
+        """
+        Buckets a constraint by (level, type), (room_name, period_ordinal),
+        (course, exam, part) and course so that queries don't have to scan the
+        whole list of constraints. Done as each constraint is added, so indexing
+        overlaps with reading the instance.
+        """
+
+        self.level_type_index.setdefault(
+            (constr.get_level(), constr.get_constr_type()), set()
+        ).add(constr)
+
+        if constr.is_room_constraint():
+            key = (constr.get_room_name(), constr.get_period().get_ordinal_value())
+            self.room_period_index.setdefault(key, set()).add(constr)
+
+            if constr.is_forbidden():
+                self.forbidden_room_periods.add(key)
+
+        elif constr.is_event_period_constraint() or constr.is_event_room_constraint():
+            key = (
+                constr.get_course_name(),
+                constr.get_exam_ordinal(),
+                constr.get_part(),
+            )
+            self.event_index.setdefault(key, set()).add(constr)
+            self.course_index.setdefault(constr.get_course_name(), set()).add(constr)
+
+    def construct_indexes(self) -> None:
+        """
+        Sets the indexed flag, after which no more constraints may be added.
+        The indexes themselves are built as constraints are added.
+        """
+
+        self.indexed = True
+
     def get_constraints(self) -> List[Constraint]:
         """
         Returns list of all constraints handled by the Constraint Manager
@@ -264,97 +322,107 @@ class ConstraintManager:
         else:
             raise StopIteration
 
+    def _get_bucket(self, level: str, constr_type: str) -> Set[Constraint]:
+        """
+        Returns the set of constraints with the given level and type.
+        The returned set is shared, so callers must not modify it.
+        """
+
+        self.construct_indexes()  # does nothing if already constructed
+        return self.level_type_index.get((level, constr_type), set())
+
+    def _get_type(self, constr_type: str) -> Set[Constraint]:
+        """
+        Returns the set of constraints of the given type at any level
+        """
+
+        return (
+            self._get_bucket(const.FORBIDDEN, constr_type)
+            | self._get_bucket(const.UNDESIRED, constr_type)
+            | self._get_bucket(const.PREFERRED, constr_type)
+        )
+
+    # Indexed lookups
+    def get_room_period_constraints_at(
+        self, room_name: str, period: Period
+    ) -> Set[RoomPeriodConstraint]:
+        """
+        Returns the set of room period constraints on the given room in the given period
+        """
+
+        self.construct_indexes()
+        return self.room_period_index.get(
+            (room_name, period.get_ordinal_value()), set()
+        )
+
+    def get_event_constraints(
+        self, course_name: str, exam_ordinal: int, part: Optional[str]
+    ) -> Set[Constraint]:
+        """
+        Returns the set of event period and event room constraints on the given
+        course, exam and part. Constraints which don't specify a part are stored
+        under part None.
+        """
+
+        self.construct_indexes()
+        return self.event_index.get((course_name, exam_ordinal, part), set())
+
+    def get_course_constraints(self, course_name: str) -> Set[Constraint]:
+        """
+        Returns the set of event period and event room constraints on any event
+        of the given course
+        """
+
+        self.construct_indexes()
+        return self.course_index.get(course_name, set())
+
     # Room period constraints
     def get_room_period_constraints(self) -> Set[RoomPeriodConstraint]:
-        return set(constr for constr in self.constraints if constr.is_room_constraint())
+        return self._get_type(const.ROOM_PERIOD_CONSTRAINT)
 
     def get_forbidden_room_period_constraints(self) -> Set[RoomPeriodConstraint]:
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_room_constraint() and constr.is_forbidden()
-        )
+        return self._get_bucket(const.FORBIDDEN, const.ROOM_PERIOD_CONSTRAINT)
 
     def is_forbidden(self, room_name: str, period: Period):
-        for constr in self.get_forbidden_room_period_constraints():
-            if constr.get_room_name() == room_name and constr.get_period() == period:
-                return True
-        return False
+        self.construct_indexes()
+        return (room_name, period.get_ordinal_value()) in self.forbidden_room_periods
 
     def get_undesired_room_period_constraints(self) -> Set[RoomPeriodConstraint]:
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_room_constraint() and constr.is_undesired()
-        )
+        return self._get_bucket(const.UNDESIRED, const.ROOM_PERIOD_CONSTRAINT)
 
     def get_preferred_event_period_constraints(self) -> Set[EventPeriodConstraint]:
         """
         Returns a set of preferred event period constraints
         """
 
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_event_period_constraint() and constr.is_preferred()
-        )
+        return self._get_bucket(const.PREFERRED, const.EVENT_PERIOD_CONSTRAINT)
 
     # Event room Constraiats
     def get_event_room_constraints(self) -> Set[EventRoomConstraint]:
-        return set(
-            constr for constr in self.constraints if constr.is_event_room_constraint()
-        )
+        return self._get_type(const.EVENT_ROOM_CONSTRAINT)
 
     def get_forbidden_event_room_constraints(self) -> Set[EventRoomConstraint]:
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_event_room_constraint() and constr.is_forbidden()
-        )
+        return self._get_bucket(const.FORBIDDEN, const.EVENT_ROOM_CONSTRAINT)
 
     def get_undesired_event_room_constraints(self) -> Set[EventRoomConstraint]:
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_event_room_constraint() and constr.is_undesired()
-        )
+        return self._get_bucket(const.UNDESIRED, const.EVENT_ROOM_CONSTRAINT)
 
     # Event period Constraiats
     def get_event_period_constraints(self) -> Set[EventPeriodConstraint]:
-        return set(
-            constr for constr in self.constraints if constr.is_event_period_constraint()
-        )
+        return self._get_type(const.EVENT_PERIOD_CONSTRAINT)
 
     def get_forbidden_event_period_constraints(self) -> Set[EventPeriodConstraint]:
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_event_period_constraint() and constr.is_forbidden()
-        )
+        return self._get_bucket(const.FORBIDDEN, const.EVENT_PERIOD_CONSTRAINT)
 
     def get_undesired_event_period_constraints(self) -> Set[EventPeriodConstraint]:
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_event_period_constraint() and constr.is_undesired()
-        )
+        return self._get_bucket(const.UNDESIRED, const.EVENT_PERIOD_CONSTRAINT)
 
     # Period Constraints
     def get_period_constraints(self) -> Set[PeriodConstraint]:
-        return set(
-            constr for constr in self.constraints if constr.is_period_constraint()
-        )
+        return self._get_type(const.PERIOD_CONSTRAINT)
 
     def get_forbidden_period_constraints(self) -> Set[PeriodConstraint]:
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_period_constraint() and constr.is_forbidden()
-        )
+        return self._get_bucket(const.FORBIDDEN, const.PERIOD_CONSTRAINT)
 
     def get_undesired_period_constraints(self) -> Set[PeriodConstraint]:
-        return set(
-            constr
-            for constr in self.constraints
-            if constr.is_period_constraint() and constr.is_undesired()
-        )
+        return self._get_bucket(const.UNDESIRED, const.PERIOD_CONSTRAINT)
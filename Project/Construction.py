@@ -0,0 +1,181 @@
+"""
+Greedy construction heuristic for the exam timetabling problem, used as a MIP
+start for the Benders master problem.
+
+Events are given periods one at a time in DSATUR order: the event with the
+fewest periods left goes next, ties broken by the most hard conflicts. Events
+can't share a period with an event of the same primary curriculum or teacher,
+must be in one of their available periods and must keep the order of the
+precedences. Each period is checked with its room subproblem before an event
+is put in it, so every period of the timetable can be given rooms.
+
+Events which run out of periods are left out, and the timetable is then a
+partial MIP start.
+
+Run this file to time the heuristic on instances:
+    python3 Project/Construction.py toy.json D1-1-16.json
+"""
+
+import argparse
+import time
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+import Constants as const
+from Event import Event
+from Instance import InstanceModel, load_instance
+from Period import Period
+from Room import Room
+from RoomSubproblem import PeriodSubproblems
+
+Timetable = Tuple[Dict[Event, Period], Dict[Event, Room]]
+
+
+def _conflicts(instance: InstanceModel) -> List[Set[int]]:
+    """
+    Returns the ids of the events each event can't share a period with
+    """
+
+    ci = instance.compiled
+    neighbours: List[Set[int]] = [set() for _ in instance.events]
+    for group in list(ci.primary_events) + list(ci.teacher_events.values()):
+        for e in group:
+            neighbours[e].update(group)
+    for e, es in enumerate(ci.HC):
+        neighbours[e].update(es)
+
+    for e, es in enumerate(neighbours):
+        es.discard(e)
+
+    return neighbours
+
+
+def _chain_lengths(
+    num_events: int, precedences: List[Tuple[int, int]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the number of events which must come before and after each event
+    in the longest chain of precedences through it
+    """
+
+    before = np.zeros(num_events, dtype=np.int64)
+    after = np.zeros(num_events, dtype=np.int64)
+
+    # The precedences form a DAG, so relaxing every pair once per event reaches
+    # the longest chains
+    for _ in range(num_events):
+        changed = False
+        for e1, e2 in precedences:
+            if before[e2] < before[e1] + 1:
+                before[e2] = before[e1] + 1
+                changed = True
+            if after[e1] < after[e2] + 1:
+                after[e1] = after[e2] + 1
+                changed = True
+        if not changed:
+            break
+
+    return before, after
+
+
+def construct_timetable(
+    instance: InstanceModel, subproblems: PeriodSubproblems = None
+) -> Timetable:
+    """
+    Returns a period and a room for every event the heuristic could place.
+    subproblems are used to check the rooms of each period, and are created
+    if not given
+    """
+
+    if subproblems is None:
+        subproblems = PeriodSubproblems(instance)
+
+    Events: List[Event] = instance.events
+    Periods: List[Period] = instance.periods
+    num_events, num_periods = len(Events), len(Periods)
+
+    neighbours = _conflicts(instance)
+    degree = np.array([len(es) for es in neighbours])
+    precedences = [tuple(pair) for pair in instance.compiled.F]
+    successors: List[List[int]] = [[] for _ in Events]
+    predecessors: List[List[int]] = [[] for _ in Events]
+    for e1, e2 in precedences:
+        successors[e1].append(e2)
+        predecessors[e2].append(e1)
+
+    # Periods each event can still be put in. Events in a chain of precedences
+    # leave room for the events before and after them
+    ordinals = np.array([p.get_ordinal_value() for p in Periods])
+    before, after = _chain_lengths(num_events, precedences)
+    available = instance.PAMatrix.copy()
+    available &= np.arange(num_periods)[None, :] >= before[:, None]
+    available &= np.arange(num_periods)[None, :] < (num_periods - after)[:, None]
+
+    cost = instance.UndesiredPeriodCost
+    load = np.zeros(num_periods, dtype=np.int64)
+    events_in: Dict[Period, Set[Event]] = {p: set() for p in Periods}
+    periods: Dict[Event, Period] = {}
+
+    unplaced = np.ones(num_events, dtype=bool)
+    while unplaced.any():
+        # Fewest periods left first, then most conflicts, then lowest id
+        candidates = np.flatnonzero(unplaced)
+        options = available[candidates].sum(axis=1)
+        e = candidates[np.lexsort((candidates, -degree[candidates], options))[0]]
+        unplaced[e] = False
+        event = Events[e]
+
+        # Cheapest period first, spreading events over the periods
+        choices = np.flatnonzero(available[e])
+        for p in choices[np.lexsort((choices, load[choices], cost[e, choices]))]:
+            period = Periods[p]
+            # Only whether the event fits is needed, so the subproblems never
+            # explain a rejected period even if the solver's do
+            feasible, _, _, _ = subproblems.solve(
+                period, events_in[period] | {event}, explain=False
+            )
+            if feasible:
+                break
+        else:
+            continue
+
+        periods[event] = period
+        events_in[period].add(event)
+        load[p] += 1
+
+        available[list(neighbours[e]), p] = False
+        for e2 in successors[e]:
+            available[e2, ordinals <= ordinals[p]] = False
+        for e1 in predecessors[e]:
+            available[e1, ordinals >= ordinals[p]] = False
+
+    rooms: Dict[Event, Room] = {}
+    for p, events in events_in.items():
+        if events:
+            _, _, assignment, _ = subproblems.solve(p, events, explain=False)
+            rooms.update(assignment)
+
+    return periods, rooms
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the greedy construction heuristic"
+    )
+    parser.add_argument("instances", nargs="+")
+    args = parser.parse_args()
+
+    for instance_filename in args.instances:
+        instance = load_instance(instance_filename)
+
+        start = time.time()
+        periods, _ = construct_timetable(instance)
+        print(
+            f"{instance_filename}: placed {len(periods)} of {len(instance.events)}",
+            f"events in {time.time() - start:.3f} {const.SECONDS}",
+        )
+
+
+if __name__ == "__main__":
+    main()
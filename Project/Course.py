@@ -257,6 +257,9 @@ class CourseManager:
         self.course_name_map = {}
         self.no_edit = False
 
+        # Number of events across all courses. Used to give each event a dense id
+        self.num_events = 0
+
     def add_course(self, course_data) -> Course:
         """
         Adds a course to the course manager and returns the course
@@ -265,6 +268,12 @@ class CourseManager:
         new_course = Course(course_data)
         self.courses.append(new_course)
 
+        # Number events in course, examination then event order
+        for examination in new_course.get_examinations():
+            for event in examination.get_events():
+                event.set_id(self.num_events)
+                self.num_events += 1
+
         return new_course
 
     def get_courses(self) -> List[Course]:
@@ -273,6 +282,12 @@ class CourseManager:
         """
         return self.courses
 
+    def get_num_events(self) -> int:
+        """
+        Returns the number of events across all courses
+        """
+        return self.num_events
+
     def construct_course_name_map(self):
         """
         Construct the map sending course names to courses and set the no_edit
@@ -0,0 +1,126 @@
+"""
+Pool of the Benders cuts found for an instance, kept on disk between runs.
+
+Each cut is stored by its period id, the ids of its events, its kind and its
+right hand side. The kinds are:
+    NO_GOOD: the events can't all be held in the period
+    OPTIMALITY: S2 of the period is at least the right hand side when all the
+        events are held in it
+    CAPACITY: the aggregate room capacity cut of a room type and size, whose
+        kind is written capacity:<room type>:<room size>
+The master problem turns these back into constraints.
+
+Pools are saved in Project/cache/cuts under the hash of the instance's
+contents, which covers its DZN file when it was read with --dzn and the
+penalties compiled into its costs, so a pool is never loaded for a different
+version or reading of an instance.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, Iterator, Tuple
+
+from Instance import CACHE_PATH, InstanceModel
+
+# Bump when the meaning of a stored cut changes
+CUT_POOL_VERSION = 1
+
+CUT_POOL_PATH = os.path.join(CACHE_PATH, "cuts")
+
+NO_GOOD = "no-good"
+OPTIMALITY = "optimality"
+CAPACITY = "capacity"
+
+Cut = Tuple[int, Tuple[int, ...], str, float]
+
+
+def capacity_kind(room_type: str, room_size: int) -> str:
+    """
+    Returns the kind of the capacity cut of a room type and size
+    """
+
+    return f"{CAPACITY}:{room_type}:{room_size}"
+
+
+def parse_capacity_kind(kind: str) -> Tuple[str, int]:
+    """
+    Returns the room type and size of a capacity cut kind
+    """
+
+    _, room_type, room_size = kind.split(":")
+    return room_type, int(room_size)
+
+
+def cut_pool_path(instance: InstanceModel) -> str:
+    """
+    Returns the file the cut pool of the instance is kept in
+    """
+
+    ci = instance.compiled
+    return os.path.join(
+        CUT_POOL_PATH,
+        f"{ci.name}-{ci.content_hash[:16]}-v{CUT_POOL_VERSION}.json",
+    )
+
+
+class CutPool:
+    """
+    Benders cuts of one instance, in the order they were found
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.cuts: Dict[Cut, None] = {}
+        self.num_loaded = 0
+
+    @classmethod
+    def load(cls, path: str) -> "CutPool":
+        """
+        Returns the pool saved in path, or an empty pool if there isn't one
+        """
+
+        pool = cls(path)
+        if os.path.isfile(path):
+            with open(path, "r") as file:
+                for period, events, kind, rhs in json.load(file)["cuts"]:
+                    pool.add(period, events, kind, rhs)
+        pool.num_loaded = len(pool)
+
+        return pool
+
+    def add(self, period: int, events: Iterable[int], kind: str, rhs: float) -> bool:
+        """
+        Adds a cut to the pool. Returns False if it was already there
+        """
+
+        cut = (period, tuple(sorted(events)), kind, rhs)
+        if cut in self.cuts:
+            return False
+
+        self.cuts[cut] = None
+        return True
+
+    def save(self) -> None:
+        """
+        Writes the pool to its file
+        """
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write to a temporary file first so an interrupted run can't leave a
+        # truncated pool behind
+        with open(self.path + ".tmp", "w") as file:
+            file.write('{"cuts": [\n')
+            file.write(
+                ",\n".join(
+                    json.dumps([period, list(events), kind, rhs])
+                    for period, events, kind, rhs in self.cuts
+                )
+            )
+            file.write("\n]}\n")
+        os.replace(self.path + ".tmp", self.path)
+
+    def __iter__(self) -> Iterator[Cut]:
+        return iter(self.cuts)
+
+    def __len__(self) -> int:
+        return len(self.cuts)
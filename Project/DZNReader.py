@@ -0,0 +1,54 @@
+"""
+Reader for the MiniZinc data (.dzn) versions of the instances in
+Project/Solutions/InstancesDZN.
+
+Each file is a list of integer scalars (Events, Periods, Rooms) and flat
+integer arrays and matrices (RoomedEvent, EventPeriodConstraints, ...). Events
+are numbered in the same course, examination, event order as the JSON
+instances. Rooms are numbered in the order of the JSON file with the dummy room
+last.
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+DZN_PATH = os.path.join(".", "Project", "Solutions", "InstancesDZN")
+
+# Matches "Name = value;"
+ASSIGNMENT = re.compile(r"(\w+)\s*=\s*([^;]*);")
+
+# Array delimiters, replaced by whitespace before the numbers are parsed
+SEPARATORS = str.maketrans("[]|,", "    ")
+
+
+def read_dzn(file_path: str, names: Iterable[str] = None) -> Dict[str, Any]:
+    """
+    Reads a .dzn file. Scalars are returned as ints, arrays as 1d NumPy arrays
+    and matrices ([| ... |]) as 2d NumPy arrays. If names is given only those
+    assignments are parsed
+    """
+
+    with open(file_path, "r") as file:
+        text = file.read()
+
+    wanted = None if names is None else set(names)
+
+    data: Dict[str, Any] = {}
+    for name, value in ASSIGNMENT.findall(text):
+        if wanted is not None and name not in wanted:
+            continue
+
+        if "[" not in value:
+            data[name] = int(value)
+            continue
+
+        array = np.fromstring(value.translate(SEPARATORS), dtype=np.int64, sep=" ")
+        if "|" in value:
+            # One "|" before each row and one closing the matrix
+            array = array.reshape(value.count("|") - 1, -1)
+        data[name] = array
+
+    return data
@@ -7,34 +7,90 @@ class Event:
     """
     A single Course can have multiple exams. An Exam can have one or more events
     that comprise it. This is what this class defines.
+
+    Events are given a dense integer id by the CourseManager so that sets and
+    variables can be indexed by array position. The scalar attributes needed by
+    the models are cached on construction.
     """
 
-    def __init__(self, examination: "Examination", event_type: str) -> None:
-        from Examination import Examination
+    __slots__ = (
+        "id",
+        "examination",
+        "event_type",
+        "course",
+        "course_name",
+        "exam_index",
+        "num_rooms",
+        "room_type",
+        "_key",
+        "_hash",
+    )
 
+    def __init__(self, examination: "Examination", event_type: str) -> None:
         self.examination: Examination = examination
         self.event_type: str = event_type
 
         self.course: Course = examination.get_course()
 
+        # Dense id. Set by the CourseManager when the course is added
+        self.id: int = -1
+
+        # Cached scalar attributes
+        self.course_name: str = self.course.get_course_name()
+        self.exam_index: int = examination.get_index()
+
+        # The oral part of a written and oral examination only needs a room if
+        # the course asks for one
+        rooms_requested = self.course.get_rooms_requested()
+        oral_without_room = (
+            event_type == const.ORAL
+            and self.course.is_written_and_oral()
+            and not self.course.get_written_oral_specs().get_room_for_oral()
+        )
+        if rooms_requested.get_number() > 0 and not oral_without_room:
+            self.num_rooms: int = rooms_requested.get_number()
+            self.room_type: str = rooms_requested.get_type()
+        else:
+            # If no room is required, dummy room
+            self.num_rooms: int = 0
+            self.room_type: str = const.DUMMY
+
+        self._key = (self.course_name, self.exam_index, self.event_type)
+        self._hash = hash(self._key)
+
     def __eq__(self, other: object) -> bool:
         """
         Returns true if event is equal to other event
         """
 
+        if self is other:
+            return True
+
         if not isinstance(other, Event):
             return False
 
-        return self.examination.__eq__(other.examination) and self.event_type.__eq__(
-            other.event_type
-        )
+        return self._key == other._key
 
     def __hash__(self) -> int:
         """
         Returns hash of event
         """
 
-        return hash((self.examination, self.event_type))
+        return self._hash
+
+    def get_id(self) -> int:
+        """
+        Returns the dense integer id of the event
+        """
+
+        return self.id
+
+    def set_id(self, event_id: int) -> None:
+        """
+        Sets the dense integer id of the event
+        """
+
+        self.id = event_id
 
     def get_examination(self) -> "Examination":
         """
@@ -47,18 +103,15 @@ class Event:
         """
         Returns the course the event belongs to
         """
-        from Examination import Examination
-
-        examination: Examination = self.get_examination()
 
-        return examination.get_course()
+        return self.course
 
     def get_course_name(self) -> str:
         """
         Returns the name of the course the examination belongs to
         """
 
-        return self.get_course().get_course_name()
+        return self.course_name
 
     def get_event_type(self) -> str:
         """
@@ -73,45 +126,24 @@ class Event:
         If the event is oral, no room is required
         If the event is written and a room is
         """
-        from Examination import Examination
-        from Course import Course, WrittenOralSpecs
-
-        examination: Examination = self.get_examination()
-        course: Course = self.get_course()
 
-        return course.get_rooms_requested().get_number() > 0
+        return self.num_rooms > 0
 
     def get_num_rooms(self) -> int:
         """
         Returns the number of rooms requested by the event
         """
 
-        from Course import Course, RoomsRequested
-
-        course: Course = self.get_course()
-        rooms_requested: RoomsRequested = course.get_rooms_requested()
-
-        if self.room_required():
-            return rooms_requested.get_number()
-
-        # If no room is required, return 0 (dummy room)
-        return 0
+        # If no room is required, 0 (dummy room)
+        return self.num_rooms
 
     def get_room_type(self) -> str:
         """
         Returns the room type requested by the event
         """
 
-        from Course import Course, RoomsRequested
-
-        course: Course = self.get_course()
-
-        if self.room_required():
-            rooms_requested: RoomsRequested = course.get_rooms_requested()
-            return rooms_requested.get_type()
-
-        # If no room is required, return dummy
-        return const.DUMMY
+        # If no room is required, dummy
+        return self.room_type
 
     def __repr__(self) -> str:
         """
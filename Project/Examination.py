@@ -15,6 +15,16 @@ class Examination:
     A course can have a number of examinations
     """
 
+    __slots__ = (
+        "course",
+        "index",
+        "exam_type",
+        "events",
+        "written_event",
+        "oral_event",
+        "_hash",
+    )
+
     def __init__(self, course: "Course", index: int) -> None:
         """
         Args:
@@ -25,6 +35,7 @@ class Examination:
 
         self.course = course
         self.index = index
+        self._hash = hash((course.get_course_name(), index))
 
         if self.course.is_oral():
             self.exam_type = const.ORAL
@@ -214,17 +225,20 @@ class Examination:
         False otherwise
         """
 
-        if isinstance(other, Examination):
-            from Course import Course
+        if self is other:
+            return True
 
-            self.course: Course
-            return self.course.__eq__(other.course) and self.index == other.index
+        if isinstance(other, Examination):
+            return (
+                self.course.get_course_name() == other.course.get_course_name()
+                and self.index == other.index
+            )
 
         return False
 
     def __hash__(self):
-        # Hash based on the hash of the course and index attributes
-        return hash((self.course, self.index))
+        # Hash based on the course name and index attributes
+        return self._hash
 
     def __repr__(self) -> str:
         """
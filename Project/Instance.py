@@ -0,0 +1,1218 @@
+"""
+Compiles exam timetabling instances into a compact integer indexed form and
+caches the result on disk, keyed by a hash of the instance file's contents.
+
+Events, periods and rooms are referred to by their index:
+    - events are numbered in course order, then examination order, then event order
+    - periods are numbered by their ordinal value
+    - rooms are numbered in the order the RoomManager stores them (dummy room first)
+
+The derived sets (PA, RA, HC, F, DP*, SCPS, SCSS, ...) are computed once when the
+instance is compiled. Availabilities, preferences and costs over events x periods,
+events x rooms and periods x rooms are held as NumPy matrices built with
+vectorised operations. InstanceModel maps them back onto Event, Period and Room
+objects for the solvers as each one is first needed.
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import time
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import numpy as np
+
+import Constants as const
+from Constraint import Constraint, ConstraintManager
+from Course import Course, CourseManager
+from Curriculum import CurriculaManager, Curriculum
+from DZNReader import DZN_PATH, read_dzn
+from Event import Event
+from Examination import Examination
+from Period import Period
+from InstanceStream import CHUNK_SIZE, read_instance
+from Room import Room, RoomManager
+
+# Bump whenever the layout of CompiledInstance changes so stale caches are ignored
+CACHE_VERSION = 4
+
+# Penalties compiled into the cost matrices. They are hashed along with the
+# instance, so changing one doesn't load the costs of the old values
+COMPILED_PENALTIES = (
+    const.SC_PRIMARY_SECONDARY,
+    const.SC_SECONDARY_SECONDARY,
+    const.P_UNDESIRED_PERIOD,
+    const.P_NOT_PREFERED_PERIOD,
+    const.P_UNDESIRED_ROOM,
+)
+
+CACHE_PATH = os.path.join(".", "Project", "cache")
+DATA_PATH = os.path.join(".", "Project", "data")
+
+# The DZN instances were generated from these JSON files, some of which differ
+# from the ones in Project/data
+DZN_JSON_PATH = os.path.join(".", "Project", "Solutions", "InstancesJSON")
+
+# Names of the DZN assignments read by compile_instance_dzn
+DZN_EVENTS = "Events"
+DZN_PERIODS = "Periods"
+DZN_ROOMS = "Rooms"
+DZN_EVENT_PERIOD_CONSTRAINTS = "EventPeriodConstraints"
+DZN_EVENT_ROOM_CONSTRAINTS = "EventRoomConstraints"
+DZN_ROOM_PERIOD_CONSTRAINTS = "RoomPeriodConstraints"
+DZN_ROOMED_EVENT = "RoomedEvent"
+
+# Room types an event requesting a given room type can be held in
+AVAILABLE_TYPES: Dict[str, List[str]] = {
+    const.DUMMY: [const.DUMMY],
+    const.SMALL: [const.SMALL, const.MEDIUM, const.LARGE],
+    const.MEDIUM: [const.MEDIUM, const.LARGE],
+    const.LARGE: [const.LARGE],
+    const.COMPOSITE: [const.COMPOSITE],
+}
+
+# Room type codes used in the vectorised room availability matrix
+ROOM_TYPE_CODES: Dict[str, int] = {
+    t: i
+    for i, t in enumerate(
+        [const.DUMMY, const.SMALL, const.MEDIUM, const.LARGE, const.COMPOSITE]
+    )
+}
+
+# Top level arrays of the instance files which are streamed element by element
+STREAMED_ARRAYS = [const.CONSTRAINTS, const.COURSES, const.CURRICULA, const.ROOMS]
+
+EventPair = Tuple[int, int]
+
+
+class CompiledInstance:
+    """
+    Integer indexed instance. Holds the raw course, curriculum and room data
+    (which are small) so the managers can be rebuilt without the constraints,
+    along with every derived set in terms of event, period and room indices.
+    """
+
+    def __init__(self, name: str, content_hash: str) -> None:
+        self.name = name
+        self.content_hash = content_hash
+
+        # Scalars
+        self.slots_per_day: int = 0
+        self.num_periods: int = 0
+        self.primary_primary_distance: int = 0
+        self.teachers: List[str] = []
+
+        # Raw data used to rebuild the managers
+        self.course_data: List[dict] = []
+        self.curriculum_data: List[dict] = []
+        self.room_data: List[dict] = []
+
+        # Periods in which no event may be held
+        self.forbidden_periods: List[int] = []
+
+        # Boolean events x periods matrices
+        self.PA: np.ndarray = None
+        self.preferred_periods: np.ndarray = None
+        self.undesired_event_periods: np.ndarray = None
+
+        # Boolean events x rooms matrices
+        self.RA: np.ndarray = None
+        self.undesired_event_rooms: np.ndarray = None
+
+        # Cost of holding an event in a period (events x periods) or room
+        # (events x rooms). Zero wherever the period or room is unavailable
+        self.undesired_period_cost: np.ndarray = None
+        self.undesired_room_cost: np.ndarray = None
+
+        # Per event sets, indexed by event
+        self.HC: List[List[int]] = []
+        self.SCPS: List[List[int]] = []
+        self.SCSS: List[List[int]] = []
+
+        # Event pairs
+        self.F: List[EventPair] = []
+        self.DPDirected: List[EventPair] = []
+        self.DPSameCourse: List[EventPair] = []
+        self.DPWrittenOral: List[EventPair] = []
+
+        # Event pairs joined through curriculum membership, as sorted n x 2
+        # arrays of event ids
+        self.DPUndirected: np.ndarray = None
+        self.DPPrimaryPrimary: np.ndarray = None
+        self.DPPrimarySecondary: np.ndarray = None
+
+        # (e1, e2) with e1 <= e2 for every pair in S1 soft conflict, and the
+        # cost of each pair
+        self.soft_conflict_pairs: np.ndarray = None
+        self.soft_conflict_cost: np.ndarray = None
+
+        self.global_undesired_periods: List[int] = []
+
+        # Teacher -> events and curriculum index -> primary events
+        self.teacher_events: Dict[str, List[int]] = {}
+        self.primary_events: List[List[int]] = []
+
+        # Boolean periods x rooms matrix of rooms which are not forbidden
+        self.rooms_available: np.ndarray = None
+
+
+def _build_managers(
+    course_data: List[dict], curriculum_data: List[dict], room_data: List[dict]
+) -> Tuple[CourseManager, CurriculaManager, RoomManager]:
+    """
+    Builds the course, curricula and room managers from the raw data
+    """
+
+    courseManager = CourseManager()
+    for course in course_data:
+        courseManager.add_course(course)
+    courseManager.construct_course_name_map()
+
+    curriculaManager = CurriculaManager()
+    for curriculum in curriculum_data:
+        curriculaManager.add_curriculum(curriculum)
+
+    Rooms = RoomManager()
+    for room in room_data:
+        Rooms.add_room(room)
+
+    # Cannot add any more rooms after this
+    Rooms.construct_composite_map()
+
+    return courseManager, curriculaManager, Rooms
+
+
+def _mask(shape: Tuple[int, int], rows: List[int], cols: List[int]) -> np.ndarray:
+    """
+    Returns a boolean matrix of the given shape which is True at (rows, cols)
+    """
+
+    mask = np.zeros(shape, dtype=bool)
+    mask[np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)] = True
+    return mask
+
+
+def _ordered_events(courseManager: CourseManager) -> List[Event]:
+    """
+    Returns every event in index order
+    """
+
+    return [
+        event
+        for course in courseManager.get_courses()
+        for examination in course.get_examinations()
+        for event in examination.get_events()
+    ]
+
+
+def _csr(lists: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a list of lists of ints in compressed sparse row form (row pointers
+    and concatenated entries)
+    """
+
+    indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in lists])
+    indices = np.fromiter(
+        (i for row in lists for i in row), dtype=np.int64, count=indptr[-1]
+    )
+    return indptr, indices
+
+
+def _expand(
+    keys: np.ndarray, indptr: np.ndarray, indices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Joins each key with every entry of its row of a CSR list. Returns the
+    position in keys and the entry of each joined pair
+    """
+
+    counts = indptr[keys + 1] - indptr[keys]
+    positions = np.repeat(np.arange(len(keys)), counts)
+    offsets = np.arange(len(positions)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return positions, indices[indptr[keys][positions] + offsets]
+
+
+def _curriculum_course_pairs(
+    left: Tuple[np.ndarray, np.ndarray], right: Tuple[np.ndarray, np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Given curriculum -> course lists in CSR form, returns every pair of a course
+    in left and a course in right of the same curriculum, as two arrays
+    """
+
+    left_indptr, left_courses = left
+    curricula = np.repeat(np.arange(len(left_indptr) - 1), np.diff(left_indptr))
+    positions, right_courses = _expand(curricula, *right)
+    return left_courses[positions], right_courses
+
+
+def _event_pairs(
+    courses_a: np.ndarray,
+    courses_b: np.ndarray,
+    course_events: Tuple[np.ndarray, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expands pairs of courses into every pair of their events
+    """
+
+    positions, events_a = _expand(courses_a, *course_events)
+    positions, events_b = _expand(courses_b[positions], *course_events)
+    return events_a[positions], events_b
+
+
+def _unique_pairs(
+    events_a: np.ndarray, events_b: np.ndarray, num_events: int
+) -> np.ndarray:
+    """
+    Returns the distinct pairs as a sorted n x 2 array
+    """
+
+    keys = np.unique(events_a * num_events + events_b)
+    return np.stack((keys // num_events, keys % num_events), axis=1)
+
+
+def _neighbour_lists(pairs: np.ndarray, num_events: int) -> List[List[int]]:
+    """
+    Groups sorted event pairs by their first event
+    """
+
+    counts = np.bincount(pairs[:, 0], minlength=num_events)
+    return [row.tolist() for row in np.split(pairs[:, 1], np.cumsum(counts)[:-1])]
+
+
+def _compile_structure(
+    ci: CompiledInstance,
+    courseManager: CourseManager,
+    curriculaManager: CurriculaManager,
+    Rooms: RoomManager,
+) -> None:
+    """
+    Computes the sets which depend only on the courses, curricula and rooms
+    (not on the constraints) in integer form
+    """
+
+    events: List[Event] = _ordered_events(courseManager)
+    rooms: List[Room] = Rooms.get_rooms()
+
+    def course_event_ids(course_name: str) -> List[int]:
+        course: Course = courseManager.get_course_by_name(course_name)
+        return [
+            e.get_id() for exam in course.get_examinations() for e in exam.get_events()
+        ]
+
+    def first_event_ids(course_name: str) -> List[int]:
+        course: Course = courseManager.get_course_by_name(course_name)
+        return [exam.get_first_event().get_id() for exam in course.get_examinations()]
+
+    # ----- Room availabilities (R_e in paper) -----
+    # Rooms as arrays of type code, number of members and the type of a member
+    room_type = np.array([ROOM_TYPE_CODES[r.get_type()] for r in rooms])
+    room_size = np.array([len(r.members) for r in rooms])
+    room_member_type = room_type.copy()
+    for rc, members in Rooms.composite_map.items():
+        room_member_type[rc.get_id()] = ROOM_TYPE_CODES[members[0].get_type()]
+
+    event_type = np.array([ROOM_TYPE_CODES[e.get_room_type()] for e in events])
+    event_size = np.array([e.get_num_rooms() for e in events])
+
+    # compatible[t1, t2] is True if an event requesting t1 can be held in a t2 room
+    compatible = np.zeros((len(ROOM_TYPE_CODES), len(ROOM_TYPE_CODES)), dtype=bool)
+    for t, available_types in AVAILABLE_TYPES.items():
+        for t2 in available_types:
+            compatible[ROOM_TYPE_CODES[t], ROOM_TYPE_CODES[t2]] = True
+
+    is_dummy = room_type == ROOM_TYPE_CODES[const.DUMMY]
+    is_composite = room_type == ROOM_TYPE_CODES[const.COMPOSITE]
+    is_single = ~is_dummy & ~is_composite
+
+    ci.RA = (
+        # No room required. Dummy room only
+        ((event_size == 0)[:, None] & is_dummy[None, :])
+        # Single rooms of a compatible type
+        | (
+            (event_size == 1)[:, None]
+            & is_single[None, :]
+            & compatible[event_type[:, None], room_type[None, :]]
+        )
+        # Composite rooms with the right number of members of the right type
+        | (
+            (event_size > 1)[:, None]
+            & is_composite[None, :]
+            & (room_size[None, :] == event_size[:, None])
+            & (room_member_type[None, :] == event_type[:, None])
+        )
+    )
+
+    # ----- H3 hard conflicts (HC_e in paper) -----
+    # Primary events of the same curriculum taught by the same teacher
+    ci.HC = [[] for _ in events]
+    for curriculum in curriculaManager.get_curricula():
+        curriculum: Curriculum
+        curriculum_events_by_teacher: Dict[str, List[int]] = {}
+        for course_name in curriculum.get_primary_course_names():
+            teacher = courseManager.get_course_by_name(course_name).get_teacher()
+            curriculum_events_by_teacher.setdefault(teacher, []).extend(
+                course_event_ids(course_name)
+            )
+
+        for course_name in curriculum.get_primary_course_names():
+            teacher = courseManager.get_course_by_name(course_name).get_teacher()
+            for e in course_event_ids(course_name):
+                ci.HC[e].extend(
+                    e2 for e2 in curriculum_events_by_teacher[teacher] if e2 != e
+                )
+
+    # ----- Precedences and directed distances -----
+    for course in courseManager.get_courses():
+        course: Course
+        examinations: List[Examination] = course.get_examinations()
+
+        # Written and oral events of the same examination
+        if course.is_written_and_oral():
+            for examination in examinations:
+                pair = (
+                    examination.get_written_event().get_id(),
+                    examination.get_oral_event().get_id(),
+                )
+                ci.F.append(pair)
+                ci.DPWrittenOral.append(pair)
+
+        # First events of consecutive examinations of the same course
+        for examination_a in examinations:
+            for examination_b in examinations:
+                if examination_a.get_index() >= examination_b.get_index():
+                    continue
+
+                pair = (
+                    examination_a.get_first_event().get_id(),
+                    examination_b.get_first_event().get_id(),
+                )
+                ci.F.append(pair)
+                ci.DPSameCourse.append(pair)
+
+    ci.DPDirected = list(ci.F)
+
+    # ----- Curriculum joins -----
+    # The pair sets below relate the events of courses in the same curriculum.
+    # Rather than looping over curricula, courses and events in Python they are
+    # built by joining curriculum -> course and course -> event lists
+    num_events = len(events)
+    course_index: Dict[str, int] = {
+        course.get_course_name(): i
+        for i, course in enumerate(courseManager.get_courses())
+    }
+    course_events = _csr(
+        [
+            course_event_ids(course.get_course_name())
+            for course in courseManager.get_courses()
+        ]
+    )
+    course_first_events = _csr(
+        [
+            first_event_ids(course.get_course_name())
+            for course in courseManager.get_courses()
+        ]
+    )
+
+    curricula: List[Curriculum] = curriculaManager.get_curricula()
+    primary_courses = _csr(
+        [
+            [course_index[name] for name in c.get_primary_course_names()]
+            for c in curricula
+        ]
+    )
+    secondary_courses = _csr(
+        [
+            [course_index[name] for name in c.get_secondary_course_names()]
+            for c in curricula
+        ]
+    )
+    all_courses = _csr(
+        [[course_index[name] for name in c.get_course_names()] for c in curricula]
+    )
+
+    primary_secondary = _curriculum_course_pairs(primary_courses, secondary_courses)
+    secondary_secondary = _curriculum_course_pairs(secondary_courses, secondary_courses)
+
+    # ----- Undirected distances -----
+    # First events of every pair of distinct courses in the same curriculum
+    courses_a, courses_b = _curriculum_course_pairs(all_courses, all_courses)
+    distinct = courses_a != courses_b
+    ci.DPUndirected = _unique_pairs(
+        *_event_pairs(courses_a[distinct], courses_b[distinct], course_first_events),
+        num_events,
+    )
+
+    # ----- Soft conflicts (SCPS and SCSS) -----
+    # SCPS: primary event -> events of secondary courses in the same curriculum
+    # SCSS: secondary event -> events of other secondary courses in the same curriculum
+    ps_events = _event_pairs(*primary_secondary, course_events)
+    ci.SCPS = _neighbour_lists(_unique_pairs(*ps_events, num_events), num_events)
+
+    courses_a, courses_b = secondary_secondary
+    distinct = courses_a != courses_b
+    ci.SCSS = _neighbour_lists(
+        _unique_pairs(
+            *_event_pairs(courses_a[distinct], courses_b[distinct], course_events),
+            num_events,
+        ),
+        num_events,
+    )
+
+    # ----- Primary-primary and primary-secondary distances -----
+    courses_a, courses_b = _curriculum_course_pairs(primary_courses, primary_courses)
+    distinct = courses_a != courses_b
+    ci.DPPrimaryPrimary = _unique_pairs(
+        *_event_pairs(courses_a[distinct], courses_b[distinct], course_first_events),
+        num_events,
+    )
+    ci.DPPrimarySecondary = _unique_pairs(
+        *_event_pairs(*primary_secondary, course_first_events), num_events
+    )
+
+    # ----- Teachers and curricula -----
+    for course in courseManager.get_courses():
+        ci.teacher_events.setdefault(course.get_teacher(), []).extend(
+            course_event_ids(course.get_course_name())
+        )
+
+    ci.primary_events = [
+        sorted(
+            {
+                e
+                for name in curriculum.get_primary_course_names()
+                for e in course_event_ids(name)
+            }
+        )
+        for curriculum in curriculaManager.get_curricula()
+    ]
+
+    # ----- S1 soft conflict pairs -----
+    # Unordered pairs of events of a primary and a secondary course, then of
+    # two secondary courses, of the same curriculum. A pair in both costs the
+    # primary-secondary amount
+    ss_events = _event_pairs(*secondary_secondary, course_events)
+    events_a = np.concatenate((ps_events[0], ss_events[0]))
+    events_b = np.concatenate((ps_events[1], ss_events[1]))
+    costs = np.concatenate(
+        (
+            np.full(len(ps_events[0]), const.SC_PRIMARY_SECONDARY),
+            np.full(len(ss_events[0]), const.SC_SECONDARY_SECONDARY),
+        )
+    )
+    keys = np.minimum(events_a, events_b) * num_events + np.maximum(events_a, events_b)
+    # np.unique gives the first occurrence of each key, so primary-secondary wins
+    keys, first = np.unique(keys, return_index=True)
+    ci.soft_conflict_pairs = np.stack((keys // num_events, keys % num_events), axis=1)
+    ci.soft_conflict_cost = costs[first]
+
+
+def _compile_constraints(
+    ci: CompiledInstance,
+    constrManager: ConstraintManager,
+    courseManager: CourseManager,
+    Rooms: RoomManager,
+) -> None:
+    """
+    Computes the availabilities, preferences and costs given by the constraints
+    in integer form. Needs RA from _compile_structure
+    """
+
+    events: List[Event] = _ordered_events(courseManager)
+    rooms: List[Room] = Rooms.get_rooms()
+    num_events, num_periods, num_rooms = len(events), ci.num_periods, len(rooms)
+
+    # ----- Constraints on each event -----
+    # Looked up by (course, exam, part). Constraints without a part apply to the
+    # first event of the examination
+    event_constraints: List[Set[Constraint]] = []
+    for event in events:
+        examination: Examination = event.get_examination()
+        course_name = event.get_course_name()
+        exam_index = examination.get_index()
+
+        constraints = constrManager.get_event_constraints(
+            course_name, exam_index, event.get_event_type()
+        )
+        if event == examination.get_first_event():
+            constraints = constraints | constrManager.get_event_constraints(
+                course_name, exam_index, None
+            )
+        event_constraints.append(constraints)
+
+    ci.forbidden_periods = sorted(
+        c.get_period().get_ordinal_value()
+        for c in constrManager.get_forbidden_period_constraints()
+    )
+
+    # ----- Period availabilities (P_e in paper) -----
+    rows, cols = [], []
+    for e in range(num_events):
+        for c in event_constraints[e]:
+            if c.is_event_period_constraint() and c.is_forbidden():
+                rows.append(e)
+                cols.append(c.get_period().get_ordinal_value())
+    ci.PA = ~_mask((num_events, num_periods), rows, cols)
+    ci.PA[:, ci.forbidden_periods] = False
+
+    # ----- Period preferences -----
+    ci.global_undesired_periods = sorted(
+        c.get_period().get_ordinal_value()
+        for c in constrManager.get_undesired_period_constraints()
+    )
+
+    preferred_rows, preferred_cols, undesired_rows, undesired_cols = [], [], [], []
+    for e, event in enumerate(events):
+        for c in event_constraints[e]:
+            if c.is_event_period_constraint() and c.is_preferred():
+                preferred_rows.append(e)
+                preferred_cols.append(c.get_period().get_ordinal_value())
+        for c in constrManager.get_course_constraints(event.get_course_name()):
+            if c.is_event_period_constraint() and c.is_undesired():
+                undesired_rows.append(e)
+                undesired_cols.append(c.get_period().get_ordinal_value())
+
+    shape = (num_events, num_periods)
+    ci.preferred_periods = _mask(shape, preferred_rows, preferred_cols)
+    ci.undesired_event_periods = _mask(shape, undesired_rows, undesired_cols)
+
+    undesired = ci.undesired_event_periods.copy()
+    undesired[:, ci.global_undesired_periods] = True
+    not_preferred = ci.preferred_periods.any(axis=1)[:, None] & ~ci.preferred_periods
+
+    ci.undesired_period_cost = (
+        np.where(
+            undesired,
+            const.P_UNDESIRED_PERIOD,
+            np.where(not_preferred, const.P_NOT_PREFERED_PERIOD, 0),
+        )
+        * ci.PA
+    )
+
+    # ----- Room preferences -----
+    rows, cols = [], []
+    for e, event in enumerate(events):
+        exam_index = event.get_examination().get_index()
+        for c in constrManager.get_course_constraints(event.get_course_name()):
+            if (
+                c.is_event_room_constraint()
+                and c.is_undesired()
+                and c.get_exam_ordinal() == exam_index
+            ):
+                rows.append(e)
+                cols.append(Rooms.get_room_by_name(c.get_room_name()).get_id())
+    ci.undesired_event_rooms = _mask((num_events, num_rooms), rows, cols)
+    ci.undesired_room_cost = const.P_UNDESIRED_ROOM * (ci.undesired_event_rooms & ci.RA)
+
+    # ----- Rooms available per period -----
+    room_ids: Dict[str, int] = {room.get_room_name(): room.get_id() for room in rooms}
+    rows, cols = [], []
+    for room_name, period in constrManager.forbidden_room_periods:
+        if room_name in room_ids:
+            rows.append(period)
+            cols.append(room_ids[room_name])
+    ci.rooms_available = ~_mask((num_periods, num_rooms), rows, cols)
+
+    # A composite room is unavailable whenever one of its members is
+    for rc, members in Rooms.composite_map.items():
+        ci.rooms_available[:, rc.get_id()] &= ci.rooms_available[
+            :, [member.get_id() for member in members]
+        ].all(axis=1)
+
+
+def hash_file(file_path: str, digest=None) -> str:
+    """
+    Returns the sha256 hex digest of a file, read in chunks. If digest is given
+    the file is added to what it has already hashed
+    """
+
+    if digest is None:
+        digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _content_digest():
+    """
+    Returns a sha256 digest which has already hashed the compiled penalties,
+    for the instance files to be added to
+    """
+
+    digest = hashlib.sha256()
+    digest.update(repr(COMPILED_PENALTIES).encode())
+    return digest
+
+
+def _read_instance_data(
+    ci: CompiledInstance,
+    data_file: str,
+    constraint_handler: Callable[[dict], Any],
+    digest=None,
+) -> Tuple[CourseManager, CurriculaManager, RoomManager]:
+    """
+    Streams the instance JSON at data_file, reading its scalars into ci and its
+    courses, curricula and rooms straight into new managers. Each constraint is
+    passed to constraint_handler
+    """
+
+    courseManager = CourseManager()
+    curriculaManager = CurriculaManager()
+    Rooms = RoomManager()
+
+    def add_course(course_data: dict) -> None:
+        ci.course_data.append(course_data)
+        courseManager.add_course(course_data)
+
+    def add_curriculum(curriculum_data: dict) -> None:
+        ci.curriculum_data.append(curriculum_data)
+        curriculaManager.add_curriculum(curriculum_data)
+
+    def add_room(room_data: dict) -> None:
+        ci.room_data.append(room_data)
+        Rooms.add_room(room_data)
+
+    members = read_instance(
+        data_file,
+        {
+            const.CONSTRAINTS: constraint_handler,
+            const.COURSES: add_course,
+            const.CURRICULA: add_curriculum,
+            const.ROOMS: add_room,
+        },
+        digest,
+    )
+
+    ci.slots_per_day = members[const.SLOTS_PER_DAY]
+    ci.num_periods = members[const.PERIODS]
+    ci.primary_primary_distance = members[const.PRIMARY_PRIMARY_DISTANCE]
+    ci.teachers = members.get(const.TEACHERS, [])
+
+    # Cannot add any more courses or rooms after this
+    courseManager.construct_course_name_map()
+    Rooms.construct_composite_map()
+
+    return courseManager, curriculaManager, Rooms
+
+
+def compile_instance(data_file: str, content_hash: str = None) -> CompiledInstance:
+    """
+    Streams the instance JSON at data_file and compiles it into a CompiledInstance
+    """
+
+    # The constraints need SlotsPerDay, which comes after the arrays in the
+    # instance files, so read the scalars first while skipping over the array
+    # elements
+    digest = _content_digest() if content_hash is None else None
+    header = read_instance(
+        data_file, {key: lambda _: None for key in STREAMED_ARRAYS}, digest
+    )
+
+    if content_hash is None:
+        content_hash = digest.hexdigest()
+
+    name = os.path.splitext(os.path.basename(data_file))[0]
+    ci = CompiledInstance(name, content_hash)
+
+    # Then stream the arrays straight into the managers. Constraints are
+    # indexed as they are added
+    constrManager = ConstraintManager(header[const.SLOTS_PER_DAY])
+    courseManager, curriculaManager, Rooms = _read_instance_data(
+        ci, data_file, constrManager.add_constraint
+    )
+
+    # Cannot add any more constraints after this
+    constrManager.construct_indexes()
+
+    _compile_structure(ci, courseManager, curriculaManager, Rooms)
+    _compile_constraints(ci, constrManager, courseManager, Rooms)
+
+    return ci
+
+
+def compile_instance_dzn(dzn_file: str, data_file: str) -> CompiledInstance:
+    """
+    Compiles an instance from its .dzn file. The availability, preference and
+    cost matrices are filled straight from the DZN arrays, so the constraints
+    are never parsed or turned into objects. The DZN doesn't say which course,
+    curriculum or teacher an event belongs to, so those (and the scalars) are
+    still read from the instance JSON at data_file, skipping its constraints.
+    Raises ValueError if the DZN doesn't match the JSON
+    """
+
+    digest = _content_digest()
+    name = os.path.splitext(os.path.basename(data_file))[0]
+    ci = CompiledInstance(name, "")
+
+    courseManager, curriculaManager, Rooms = _read_instance_data(
+        ci, data_file, lambda _: None, digest
+    )
+    # The DZN is part of the instance's contents, so the cut pools and
+    # checkpoints of DZN runs are kept apart from those of JSON runs
+    ci.content_hash = hash_file(dzn_file, digest)
+
+    _compile_structure(ci, courseManager, curriculaManager, Rooms)
+
+    dzn = read_dzn(
+        dzn_file,
+        [
+            DZN_EVENTS,
+            DZN_PERIODS,
+            DZN_ROOMS,
+            DZN_EVENT_PERIOD_CONSTRAINTS,
+            DZN_EVENT_ROOM_CONSTRAINTS,
+            DZN_ROOM_PERIOD_CONSTRAINTS,
+            DZN_ROOMED_EVENT,
+        ],
+    )
+
+    num_events = courseManager.get_num_events()
+    num_rooms = len(Rooms.get_rooms())
+
+    # The DZN only has a dummy room (as its last room) if some event doesn't
+    # need a room
+    has_dummy = dzn[DZN_ROOMS] == num_rooms
+    if (dzn[DZN_EVENTS], dzn[DZN_PERIODS]) != (num_events, ci.num_periods) or dzn[
+        DZN_ROOMS
+    ] not in (num_rooms - 1, num_rooms):
+        raise ValueError(f"{dzn_file} does not match {data_file}")
+
+    # -1 is forbidden, otherwise the cost of using the period or room
+    period_costs = dzn[DZN_EVENT_PERIOD_CONSTRAINTS]
+
+    # Reorder the DZN room columns so the dummy room comes first
+    room_costs = np.full((num_events, num_rooms), -1, dtype=np.int64)
+    room_periods = np.zeros((num_rooms, ci.num_periods), dtype=np.int64)
+    room_costs[:, 1:] = dzn[DZN_EVENT_ROOM_CONSTRAINTS][:, : num_rooms - 1]
+    room_periods[1:, :] = dzn[DZN_ROOM_PERIOD_CONSTRAINTS][: num_rooms - 1, :]
+    if has_dummy:
+        room_costs[:, 0] = dzn[DZN_EVENT_ROOM_CONSTRAINTS][:, -1]
+        room_periods[0, :] = dzn[DZN_ROOM_PERIOD_CONSTRAINTS][-1, :]
+
+    # The DZN's room compatibility rules are looser than the model's (e.g. any
+    # composite room with enough members), so it can only remove rooms through
+    # a forbidden constraint, and the JSON has none. A room the model allows
+    # but the DZN forbids, for an event both files say needs a room, means the
+    # DZN's room columns aren't the rooms of the JSON catalogue
+    roomed = ~ci.RA[:, 0] & (dzn[DZN_ROOMED_EVENT] == 1)
+    mismatched = ci.RA & (room_costs == -1) & roomed[:, None]
+    if mismatched.any():
+        raise ValueError(
+            f"The rooms of {dzn_file} don't match the rooms of {data_file}: "
+            f"{np.count_nonzero(mismatched.any(axis=1))} events lose "
+            f"{np.count_nonzero(mismatched)} of their rooms"
+        )
+
+    # ----- Periods -----
+    ci.PA = period_costs != -1
+    ci.forbidden_periods = np.flatnonzero(~ci.PA.any(axis=0)).tolist()
+    ci.undesired_period_cost = np.where(ci.PA, period_costs, 0)
+
+    # Periods undesired for every event which can be held in them are globally
+    # undesired. Events with a not preferred period prefer the free periods
+    undesired = ci.undesired_period_cost == const.P_UNDESIRED_PERIOD
+    global_undesired = (undesired | ~ci.PA).all(axis=0) & ci.PA.any(axis=0)
+    ci.global_undesired_periods = np.flatnonzero(global_undesired).tolist()
+    ci.undesired_event_periods = undesired & ~global_undesired[None, :]
+    ci.preferred_periods = (
+        (ci.undesired_period_cost == const.P_NOT_PREFERED_PERIOD).any(axis=1)[:, None]
+        & ci.PA
+        & (ci.undesired_period_cost == 0)
+    )
+
+    # ----- Rooms -----
+    # After the check above this only takes rooms away from events the DZN
+    # says need none
+    ci.RA &= room_costs != -1
+    ci.undesired_room_cost = np.where(ci.RA, room_costs, 0)
+    ci.undesired_event_rooms = ci.undesired_room_cost > 0
+    ci.rooms_available = (room_periods != -1).T.copy()
+
+    return ci
+
+
+def compare_dzn(from_json: CompiledInstance, from_dzn: CompiledInstance) -> Dict:
+    """
+    Returns the fields of an instance compiled from its JSON and from its DZN
+    file which differ, mapped to the number of differing entries
+    """
+
+    differences: Dict[str, int] = {}
+    for field, expected in vars(from_json).items():
+        # The DZN's hash covers the DZN file too
+        if field == "content_hash":
+            continue
+        actual = getattr(from_dzn, field)
+        # The DZN can only say which undesired rooms the event could be held in
+        if field == "undesired_event_rooms":
+            expected = expected & from_json.RA
+        if isinstance(expected, np.ndarray):
+            if expected.shape != actual.shape:
+                differences[field] = expected.size
+            elif not np.array_equal(expected, actual):
+                differences[field] = int(np.count_nonzero(expected != actual))
+        elif expected != actual:
+            differences[field] = len(set(map(str, expected)) ^ set(map(str, actual)))
+
+    return differences
+
+
+def cross_check_dzn(instance_filename: str, json_path: str = DATA_PATH) -> Dict:
+    """
+    Compiles an instance from both its JSON in json_path and its DZN file and
+    returns the fields of the compiled instances which differ, mapped to the
+    number of differing entries. Raises ValueError if the DZN's rooms don't
+    match the JSON's
+    """
+
+    name = os.path.splitext(instance_filename)[0]
+    data_file = os.path.join(json_path, instance_filename)
+
+    from_json = compile_instance(data_file)
+    from_dzn = compile_instance_dzn(os.path.join(DZN_PATH, name + ".dzn"), data_file)
+
+    return compare_dzn(from_json, from_dzn)
+
+
+def _load_cached(
+    cache_file: str, use_cache: bool, compile: Callable[[], CompiledInstance]
+) -> CompiledInstance:
+    """
+    Returns the compiled instance in cache_file, or compiles it and caches it
+    there
+    """
+
+    if use_cache and os.path.isfile(cache_file):
+        with open(cache_file, "rb") as file:
+            return pickle.load(file)
+
+    ci = compile()
+
+    if use_cache:
+        os.makedirs(CACHE_PATH, exist_ok=True)
+        # Write to a temporary file first so an interrupted run can't leave a
+        # truncated cache behind
+        with open(cache_file + ".tmp", "wb") as file:
+            pickle.dump(ci, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(cache_file + ".tmp", cache_file)
+
+    return ci
+
+
+def load_compiled_instance(
+    instance_filename: str, use_cache: bool = True, use_dzn: bool = False
+) -> CompiledInstance:
+    """
+    Returns the compiled form of the instance in Project/data. The compiled
+    instance is cached in Project/cache under a hash of the file's contents and
+    the compiled penalties so later runs skip parsing and set construction
+    entirely.
+
+    If use_dzn is set the instance is instead compiled from its file in
+    Project/Solutions/InstancesDZN, along with the JSON in Project/data. Raises
+    ValueError unless the result is the instance compiled from the JSON alone,
+    since some DZN files were generated from other versions of the instances.
+    Only checked DZN compilations are cached.
+    """
+
+    data_file = os.path.join(DATA_PATH, instance_filename)
+    name = os.path.splitext(instance_filename)[0]
+
+    digest = _content_digest()
+    content_hash = hash_file(data_file, digest)
+
+    if use_dzn:
+        dzn_file = os.path.join(DZN_PATH, name + ".dzn")
+        dzn_hash = hash_file(dzn_file, digest)
+
+        def compile_checked() -> CompiledInstance:
+            ci = compile_instance_dzn(dzn_file, data_file)
+            differences = compare_dzn(
+                load_compiled_instance(instance_filename, use_cache), ci
+            )
+            if differences:
+                raise ValueError(f"{dzn_file} doesn't match {data_file}: {differences}")
+            return ci
+
+        cache_file = os.path.join(
+            CACHE_PATH, f"{name}-dzn-{dzn_hash[:16]}-v{CACHE_VERSION}.pickle"
+        )
+        return _load_cached(cache_file, use_cache, compile_checked)
+
+    cache_file = os.path.join(
+        CACHE_PATH, f"{name}-{content_hash[:16]}-v{CACHE_VERSION}.pickle"
+    )
+    return _load_cached(
+        cache_file, use_cache, lambda: compile_instance(data_file, content_hash)
+    )
+
+
+class InstanceModel:
+    """
+    Object view of a CompiledInstance. Rebuilds the managers from the raw data
+    and maps the integer indexed sets back onto Event, Period and Room objects
+    so the solvers can use them directly.
+
+    Each derived set is only built the first time it is read and then kept, so
+    a solver only pays for the sets its formulation uses. Models are shared
+    between solvers run in the same process (see load_instance).
+    """
+
+    def __init__(self, ci: CompiledInstance) -> None:
+        self.compiled = ci
+        self.name = ci.name
+
+        self.slots_per_day = ci.slots_per_day
+        self.primary_primary_distance = ci.primary_primary_distance
+        self.teachers = ci.teachers
+
+        self.courseManager, self.curriculaManager, self.Rooms = _build_managers(
+            ci.course_data, ci.curriculum_data, ci.room_data
+        )
+
+        # Index -> object lookups
+        self.events: List[Event] = _ordered_events(self.courseManager)
+        self.periods: List[Period] = [
+            Period.from_period_number(p, ci.slots_per_day)
+            for p in range(ci.num_periods)
+        ]
+        self.rooms: List[Room] = self.Rooms.get_rooms()
+
+        # Matrices indexed by event, period and room id. Used directly by the
+        # model builders
+        self.PAMatrix: np.ndarray = ci.PA
+        self.RAMatrix: np.ndarray = ci.RA
+        self.UndesiredPeriodCost: np.ndarray = ci.undesired_period_cost
+        self.UndesiredRoomCost: np.ndarray = ci.undesired_room_cost
+        self.RoomsAvailableMatrix: np.ndarray = ci.rooms_available
+
+        # Curriculum pair sets as n x 2 arrays of event ids, and the cost of
+        # each soft conflict pair
+        self.DPUndirectedPairs: np.ndarray = ci.DPUndirected
+        self.DPPrimaryPrimaryPairs: np.ndarray = ci.DPPrimaryPrimary
+        self.DPPrimarySecondaryPairs: np.ndarray = ci.DPPrimarySecondary
+        self.SoftConflictPairs: np.ndarray = ci.soft_conflict_pairs
+        self.SoftConflictCost: np.ndarray = ci.soft_conflict_cost
+
+    def _pairs(self, index_pairs: List[EventPair]) -> Set[Tuple[Event, Event]]:
+        """
+        Maps pairs of event ids (a list or n x 2 array) onto pairs of events
+        """
+
+        if isinstance(index_pairs, np.ndarray):
+            index_pairs = index_pairs.tolist()
+
+        E = self.events
+        return {(E[e1], E[e2]) for e1, e2 in index_pairs}
+
+    def _rows(self, matrix: np.ndarray, objects: list) -> list:
+        """
+        Maps each row of a boolean matrix onto the set of objects whose column
+        is set
+        """
+
+        return [{objects[i] for i in np.flatnonzero(row).tolist()} for row in matrix]
+
+    def _neighbours(self, index_lists: List[List[int]]) -> Dict[Event, Set[Event]]:
+        """
+        Maps a list of event ids per event onto a set of events per event
+        """
+
+        E = self.events
+        return {E[e]: {E[e2] for e2 in es} for e, es in enumerate(index_lists)}
+
+    @cached_property
+    def forbidden_periods(self) -> Set[Period]:
+        return {self.periods[p] for p in self.compiled.forbidden_periods}
+
+    @cached_property
+    def PA(self) -> Dict[Event, Set[Period]]:
+        return dict(zip(self.events, self._rows(self.PAMatrix, self.periods)))
+
+    @cached_property
+    def RA(self) -> Dict[Event, Set[Room]]:
+        return dict(zip(self.events, self._rows(self.RAMatrix, self.rooms)))
+
+    @cached_property
+    def HC(self) -> Dict[Event, List[Event]]:
+        E = self.events
+        return {E[e]: [E[e2] for e2 in es] for e, es in enumerate(self.compiled.HC)}
+
+    @cached_property
+    def SCPS(self) -> Dict[Event, Set[Event]]:
+        return self._neighbours(self.compiled.SCPS)
+
+    @cached_property
+    def SCSS(self) -> Dict[Event, Set[Event]]:
+        return self._neighbours(self.compiled.SCSS)
+
+    @cached_property
+    def F(self) -> Set[Tuple[Event, Event]]:
+        return self._pairs(self.compiled.F)
+
+    @cached_property
+    def DPDirected(self) -> Set[Tuple[Event, Event]]:
+        return self._pairs(self.compiled.DPDirected)
+
+    @cached_property
+    def DPSameCourse(self) -> Set[Tuple[Event, Event]]:
+        return self._pairs(self.compiled.DPSameCourse)
+
+    @cached_property
+    def DPWrittenOral(self) -> Set[Tuple[Event, Event]]:
+        return self._pairs(self.compiled.DPWrittenOral)
+
+    @cached_property
+    def DPUndirected(self) -> Set[Tuple[Event, Event]]:
+        return self._pairs(self.compiled.DPUndirected)
+
+    @cached_property
+    def DPPrimaryPrimary(self) -> Set[Tuple[Event, Event]]:
+        return self._pairs(self.compiled.DPPrimaryPrimary)
+
+    @cached_property
+    def DPPrimarySecondary(self) -> Set[Tuple[Event, Event]]:
+        return self._pairs(self.compiled.DPPrimarySecondary)
+
+    @cached_property
+    def global_undesired_periods(self) -> Set[Period]:
+        return {self.periods[p] for p in self.compiled.global_undesired_periods}
+
+    @cached_property
+    def preferred_periods(self) -> Dict[Event, Set[Period]]:
+        return dict(
+            zip(self.events, self._rows(self.compiled.preferred_periods, self.periods))
+        )
+
+    @cached_property
+    def undesired_event_periods(self) -> Dict[Event, Set[Period]]:
+        return dict(
+            zip(
+                self.events,
+                self._rows(self.compiled.undesired_event_periods, self.periods),
+            )
+        )
+
+    @cached_property
+    def undesired_event_rooms(self) -> Dict[Event, Set[Room]]:
+        return dict(
+            zip(
+                self.events, self._rows(self.compiled.undesired_event_rooms, self.rooms)
+            )
+        )
+
+    @cached_property
+    def teacherEvents(self) -> Dict[str, Set[Event]]:
+        E = self.events
+        return {t: {E[e] for e in es} for t, es in self.compiled.teacher_events.items()}
+
+    @cached_property
+    def primary_events(self) -> Dict[Curriculum, Set[Event]]:
+        E = self.events
+        return {
+            curriculum: {E[e] for e in es}
+            for curriculum, es in zip(
+                self.curriculaManager.get_curricula(), self.compiled.primary_events
+            )
+        }
+
+    @cached_property
+    def SOFT_CONFLICT(self) -> Dict[frozenset, int]:
+        E = self.events
+        return {
+            frozenset((E[e1], E[e2])): cost
+            for (e1, e2), cost in zip(
+                self.SoftConflictPairs.tolist(), self.SoftConflictCost.tolist()
+            )
+        }
+
+    @cached_property
+    def P1(self) -> Set[frozenset]:
+        return set(self.SOFT_CONFLICT)
+
+    @cached_property
+    def RoomsAvailable(self) -> Dict[Period, Set[Room]]:
+        return dict(
+            zip(self.periods, self._rows(self.RoomsAvailableMatrix, self.rooms))
+        )
+
+
+# Models already built in this process, keyed by file name and source
+_models: Dict[Tuple[str, bool], InstanceModel] = {}
+
+
+def load_instance(
+    instance_filename: str, use_cache: bool = True, use_dzn: bool = False
+) -> InstanceModel:
+    """
+    Loads the instance in Project/data, compiling and caching it if required.
+    With use_cache the model is also kept in memory, so later solvers in the
+    same process reuse it along with every set already derived
+    """
+
+    key = (instance_filename, use_dzn)
+    if use_cache and key in _models:
+        return _models[key]
+
+    model = InstanceModel(load_compiled_instance(instance_filename, use_cache, use_dzn))
+    if use_cache:
+        _models[key] = model
+
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile instances, or compare the JSON and DZN readers"
+    )
+    parser.add_argument(
+        "instances", nargs="*", help="instance filenames (default: every DZN file)"
+    )
+    parser.add_argument(
+        "--cross-check",
+        action="store_true",
+        help="compile each instance from both its JSON and DZN files and compare",
+    )
+    parser.add_argument("--dzn", action="store_true", help="compile from the DZN files")
+    parser.add_argument(
+        "--json-path",
+        default=DATA_PATH,
+        help=f"folder of the JSON files to compare the DZN files with (e.g. "
+        f"{DZN_JSON_PATH}, which they were generated from)",
+    )
+    args = parser.parse_args()
+
+    instances = args.instances or sorted(
+        f.replace(".dzn", ".json") for f in os.listdir(DZN_PATH)
+    )
+
+    mismatched = []
+    for instance_filename in instances:
+        if not args.cross_check:
+            start = time.time()
+            load_compiled_instance(instance_filename, False, args.dzn)
+            print(instance_filename, f"compiled in {time.time() - start:.2f}s")
+            continue
+
+        try:
+            differences = cross_check_dzn(instance_filename, args.json_path)
+        except ValueError as error:
+            mismatched.append(instance_filename)
+            print(instance_filename, "can't be compiled from its DZN:", error)
+            continue
+        if differences:
+            mismatched.append(instance_filename)
+            print(instance_filename, "differs:", differences)
+        else:
+            print(instance_filename, "identical")
+
+    if args.cross_check:
+        print(len(mismatched), "of", len(instances), "instances differ:", mismatched)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Incremental reader for exam timetabling instance files.
+
+The large instances are mostly one long Constraints array. Rather than reading
+the whole document with json.loads, the file is read in chunks and each element
+of the top level arrays is decoded on its own and handed to a callback (usually
+a manager's add method), so only one element is alive at a time.
+"""
+
+import codecs
+import json
+from typing import Any, Callable, Dict
+
+# Number of bytes read from the file at a time
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """
+    Buffered reader over a JSON file which can decode one value at a time
+    """
+
+    def __init__(self, file, chunk_size: int = CHUNK_SIZE, digest=None) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self.digest = digest
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int = None) -> bool:
+        """
+        Reads the next chunk of the file into the buffer. Returns False at the
+        end of the file
+        """
+
+        if self.eof:
+            return False
+
+        # Drop what has already been consumed
+        self.buffer = self.buffer[self.pos :]
+        self.pos = 0
+
+        chunk = self.file.read(size or self.chunk_size)
+        if self.digest is not None:
+            self.digest.update(chunk)
+
+        self.eof = len(chunk) == 0
+        self.buffer += self.decoder.decode(chunk, final=self.eof)
+        return not self.eof
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it.
+        Returns an empty string at the end of the file
+        """
+
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        """
+        Consumes the next non whitespace character, which must be char
+        """
+
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in instance file, got '{found}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        Decodes and consumes the next JSON value
+        """
+
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer might continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            # The value is incomplete. Read more, doubling each time so large
+            # values aren't decoded over and over
+            self.fill(size)
+            size *= 2
+
+
+def read_instance(
+    file_path: str,
+    handlers: Dict[str, Callable[[Any], Any]],
+    digest=None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Streams the top level object of the instance file at file_path. Each element
+    of an array whose key is in handlers is passed to that handler as soon as it
+    is decoded. Every other member is decoded whole and returned in a dictionary.
+    If digest (e.g. hashlib.sha256()) is given it is updated with the file's bytes
+    """
+
+    members: Dict[str, Any] = {}
+
+    with open(file_path, "rb") as file:
+        reader = _Reader(file, chunk_size, digest)
+        reader.expect("{")
+
+        while reader.peek() != "}":
+            if members or reader.peek() == ",":
+                reader.expect(",")
+
+            key = reader.value()
+            reader.expect(":")
+
+            handler = handlers.get(key)
+            if handler is None:
+                members[key] = reader.value()
+                continue
+
+            # Stream the array element by element
+            members[key] = None
+            reader.expect("[")
+            first = True
+            while reader.peek() != "]":
+                if not first:
+                    reader.expect(",")
+                handler(reader.value())
+                first = False
+            reader.expect("]")
+
+        reader.expect("}")
+
+        # Read the rest of the file so the digest covers all of it
+        while reader.fill():
+            pass
+
+    return members
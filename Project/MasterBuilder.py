@@ -0,0 +1,395 @@
+"""
+Builders for the assignment part of the Benders master problem: the Y and H
+variables, the room pre-cuts, constraint 3 (each event scheduled once),
+constraint 4 (precedences), constraint 5 (H3 hard conflicts) and constraint 7
+(the definition of H).
+
+build_assignment adds them one variable and one constraint at a time.
+build_assignment_matrix adds the same blocks as sparse matrices through
+Gurobi's matrix API, straight from the integer indexed instance arrays.
+
+set_assignment_start loads a timetable into Y and H as a MIP start.
+
+capacity_levels and independence_levels give the data of the nested room
+capacity cuts and the per period independence number cuts separated by the LP
+warm-up of the master problem.
+
+Run this file to compare the build times of the two on an instance:
+    python3 Project/MasterBuilder.py D7-2-17.json
+"""
+
+import argparse
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from gurobipy import GRB, Model, Var, quicksum
+
+import Constants as const
+from Event import Event
+from Instance import InstanceModel, load_instance
+from Period import Period
+
+Assignment = Tuple[Dict[Tuple[Event, Period], Var], Dict[Event, Var]]
+
+
+def _room_groups(instance: InstanceModel) -> Dict[Tuple[str, int], List[int]]:
+    """
+    Returns the ids of the events which need a room, grouped by their requested
+    (room type, number of rooms)
+    """
+
+    groups: Dict[Tuple[str, int], List[int]] = {}
+    for e in instance.events:
+        if e.room_type != const.DUMMY:
+            groups.setdefault((e.room_type, e.num_rooms), []).append(e.get_id())
+
+    return groups
+
+
+def _room_capacity(instance: InstanceModel, room_type: str, room_size: int) -> int:
+    """
+    Returns the number of events requesting room_size rooms of room_type which
+    can be held in the same period
+    """
+
+    Rooms = instance.Rooms
+    num_rooms = Rooms.get_num_compatible_rooms(room_type, room_size)
+
+    # Events requesting composite rooms also can't use more overlapping
+    # composite rooms than the independence number allows
+    if room_size > 1:
+        num_rooms = min(num_rooms, Rooms.get_independence_number(room_type, room_size))
+
+    return num_rooms
+
+
+def capacity_levels(instance: InstanceModel) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns, for each room type, the number of single rooms of that type or
+    larger each event takes up (0 for events which can't use them) and the
+    number of those rooms available in each period. Events requesting one room
+    can use any larger type, while composite requests take up that many single
+    rooms of their own type
+    """
+
+    Rooms = instance.Rooms
+    order = {room_type: i for i, room_type in enumerate(const.ROOM_TYPES)}
+
+    levels = []
+    for level, room_type in enumerate(const.ROOM_TYPES):
+        weights = np.array(
+            [
+                e.num_rooms if order.get(e.room_type, -1) >= level else 0
+                for e in instance.events
+            ],
+            dtype=np.float64,
+        )
+
+        room_ids = [
+            r.get_id()
+            for t in const.ROOM_TYPES[level:]
+            for r in Rooms.get_single_rooms_by_type(t)
+        ]
+        capacities = instance.RoomsAvailableMatrix[:, room_ids].sum(axis=1)
+
+        levels.append((weights, capacities))
+
+    return levels
+
+
+def independence_levels(
+    instance: InstanceModel,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns, for the composite room requests of each room type and size, and
+    for those of each room type together, which events make them (1, else 0)
+    and the independence number of the composite rooms they can use among
+    those available in each period. Rooms used in the same period can't share
+    a member, so no more of the events can be held in it
+    """
+
+    Rooms = instance.Rooms
+    num_events = len(instance.events)
+    room_groups = [
+        (room_type, room_size, event_ids)
+        for (room_type, room_size), event_ids in _room_groups(instance).items()
+        if room_size > 1
+    ]
+
+    # Events and rooms of each request, and of each room type when it has
+    # requests of more than one size
+    requests: List[Tuple[List[int], List[int]]] = []
+    for room_type in const.ROOM_TYPES:
+        groups = [
+            (event_ids, Rooms.get_rooms_by_size_and_num_rooms(room_type, room_size))
+            for t, room_size, event_ids in room_groups
+            if t == room_type
+        ]
+        requests.extend(groups)
+        if len(groups) > 1:
+            requests.append(
+                (
+                    [e for event_ids, _ in groups for e in event_ids],
+                    [r for _, rooms in groups for r in rooms],
+                )
+            )
+
+    # Most periods have the same rooms available, so each set of rooms is
+    # only solved once
+    independence_numbers: Dict[frozenset, int] = {}
+
+    levels = []
+    for event_ids, rooms in requests:
+        weights = np.zeros(num_events, dtype=np.float64)
+        weights[event_ids] = 1
+
+        room_ids = np.array([r.get_id() for r in rooms], dtype=np.intp)
+        capacities = np.zeros(len(instance.periods), dtype=np.float64)
+        for p, available in enumerate(instance.RoomsAvailableMatrix[:, room_ids]):
+            key = frozenset(room_ids[available].tolist())
+            if key not in independence_numbers:
+                independence_numbers[key] = Rooms.get_independence_number_of(
+                    [instance.rooms[r] for r in key]
+                )
+            capacities[p] = independence_numbers[key]
+
+        levels.append((weights, capacities))
+
+    return levels
+
+
+def build_assignment(BMP: Model, instance: InstanceModel) -> Assignment:
+    """
+    Adds the assignment variables and constraints to BMP one at a time.
+    Returns Y and H keyed by event and period objects
+    """
+
+    Events: List[Event] = instance.events
+    Periods: List[Period] = instance.periods
+    PA = instance.PA
+    PAMatrix = instance.PAMatrix
+
+    # Y = 1 if event e is assigned to day d and timeslot t, 0 else (auxiliary variable)
+    Y = {(e, p): BMP.addVar(vtype=GRB.BINARY) for e in Events for p in PA[e]}
+
+    # The ordinal (order) value of the period assigned to event e
+    H = {e: BMP.addVar(vtype=GRB.INTEGER) for e in Events}
+
+    def available_in(event_ids: np.ndarray, p: Period) -> List[Event]:
+        """
+        Returns the events in event_ids which can be held in period p
+        """
+
+        return [Events[e] for e in event_ids[PAMatrix[event_ids, p.get_id()]]]
+
+    for (room_type, room_size), event_ids in _room_groups(instance).items():
+        event_ids = np.array(event_ids)
+        num_rooms = _room_capacity(instance, room_type, room_size)
+
+        for p in Periods:
+            # A pre-cut for the BSP
+            BMP.addConstr(
+                quicksum(Y[e, p] for e in available_in(event_ids, p)) <= num_rooms
+            )
+
+    # Each event is scheduled to exactly one time period
+    for e in Events:
+        BMP.addConstr(quicksum(Y[e, p] for p in PA[e]) == 1)
+
+    # Constraint 4: Some events must precede other events
+    for e1, e2 in instance.F:
+        BMP.addConstr(H[e1] - H[e2] <= -1)
+
+    # Constraint 5: H3 hard conflicts
+    primary_events = instance.primary_events
+    teacherEvents = instance.teacherEvents
+    for c in instance.curriculaManager.get_curricula():
+        event_ids = np.array([e.get_id() for e in primary_events[c]], dtype=np.intp)
+        for p in Periods:
+            BMP.addConstr(quicksum(Y[e, p] for e in available_in(event_ids, p)) <= 1)
+    for t in teacherEvents:
+        event_ids = np.array([e.get_id() for e in teacherEvents[t]], dtype=np.intp)
+        for p in Periods:
+            BMP.addConstr(quicksum(Y[e, p] for e in available_in(event_ids, p)) <= 1)
+
+    # Constraint 7: Set values of H_e
+    for e in Events:
+        BMP.addConstr(quicksum(p.get_ordinal_value() * Y[e, p] for p in PA[e]) == H[e])
+
+    return Y, H
+
+
+def _group_period_rows(
+    groups: List[List[int]],
+    y_events: np.ndarray,
+    y_periods: np.ndarray,
+    num_events: int,
+    num_periods: int,
+) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Returns a matrix with a row per (group, period) which sums the Y columns of
+    the group's events in that period, and the group * num_periods + period
+    index of each row. Rows with no columns are left out
+    """
+
+    # Y columns are in event order, so each event owns a contiguous range
+    starts = np.searchsorted(y_events, np.arange(num_events))
+    ends = np.searchsorted(y_events, np.arange(num_events), side="right")
+
+    member_groups = np.repeat(np.arange(len(groups)), [len(g) for g in groups])
+    member_events = np.fromiter(
+        (e for g in groups for e in g), dtype=np.int64, count=len(member_groups)
+    )
+
+    # Join each (group, event) with every Y column of the event
+    counts = ends[member_events] - starts[member_events]
+    members = np.repeat(np.arange(len(member_events)), counts)
+    offsets = np.arange(len(members)) - np.repeat(np.cumsum(counts) - counts, counts)
+    columns = starts[member_events][members] + offsets
+
+    row_keys = member_groups[members] * num_periods + y_periods[columns]
+    used, rows = np.unique(row_keys, return_inverse=True)
+
+    matrix = sp.csr_matrix(
+        (np.ones(len(columns)), (rows, columns)), shape=(len(used), len(y_events))
+    )
+    return matrix, used
+
+
+def build_assignment_matrix(BMP: Model, instance: InstanceModel) -> Assignment:
+    """
+    Adds the assignment variables and constraints to BMP as sparse matrices.
+    Returns Y and H keyed by event and period objects, like build_assignment.
+    Rows of constraint 5 and the pre-cuts with no variables (0 <= rhs) are
+    left out
+    """
+
+    ci = instance.compiled
+    Events: List[Event] = instance.events
+    Periods: List[Period] = instance.periods
+    num_events, num_periods = len(Events), len(Periods)
+
+    # One Y column per available (event, period), in event then period order
+    y_events, y_periods = np.nonzero(instance.PAMatrix)
+    num_y = len(y_events)
+    columns = np.arange(num_y)
+
+    Y_m = BMP.addMVar(num_y, vtype=GRB.BINARY)
+    H_m = BMP.addMVar(num_events, vtype=GRB.INTEGER)
+
+    # Pre-cuts for the BSP
+    room_groups = _room_groups(instance)
+    capacities = np.array(
+        [_room_capacity(instance, t, size) for t, size in room_groups],
+        dtype=np.float64,
+    )
+    matrix, used = _group_period_rows(
+        list(room_groups.values()), y_events, y_periods, num_events, num_periods
+    )
+    BMP.addMConstr(matrix, Y_m, GRB.LESS_EQUAL, capacities[used // num_periods])
+
+    # Each event is scheduled to exactly one time period
+    matrix = sp.csr_matrix(
+        (np.ones(num_y), (y_events, columns)), shape=(num_events, num_y)
+    )
+    BMP.addMConstr(matrix, Y_m, GRB.EQUAL, np.ones(num_events))
+
+    # Constraint 4: Some events must precede other events
+    precedences = np.array(ci.F, dtype=np.int64).reshape(-1, 2)
+    num_precedences = len(precedences)
+    matrix = sp.csr_matrix(
+        (
+            np.repeat([[1.0, -1.0]], num_precedences, axis=0).ravel(),
+            (np.repeat(np.arange(num_precedences), 2), precedences.ravel()),
+        ),
+        shape=(num_precedences, num_events),
+    )
+    BMP.addMConstr(matrix, H_m, GRB.LESS_EQUAL, -np.ones(num_precedences))
+
+    # Constraint 5: H3 hard conflicts
+    for groups in (ci.primary_events, list(ci.teacher_events.values())):
+        matrix, used = _group_period_rows(
+            groups, y_events, y_periods, num_events, num_periods
+        )
+        BMP.addMConstr(matrix, Y_m, GRB.LESS_EQUAL, np.ones(len(used)))
+
+    # Constraint 7: Set values of H_e
+    ordinals = np.array([p.get_ordinal_value() for p in Periods], dtype=np.float64)
+    matrix = sp.csr_matrix(
+        (ordinals[y_periods], (y_events, columns)), shape=(num_events, num_y)
+    )
+    BMP.addConstr(matrix @ Y_m - H_m == 0)
+
+    # Key the variables by object for the rest of the master problem
+    Y = dict(
+        zip(
+            zip(
+                [Events[e] for e in y_events.tolist()],
+                [Periods[p] for p in y_periods.tolist()],
+            ),
+            Y_m.tolist(),
+        )
+    )
+    H = dict(zip(Events, H_m.tolist()))
+
+    return Y, H
+
+
+def set_assignment_start(
+    Y: Dict[Tuple[Event, Period], Var],
+    H: Dict[Event, Var],
+    periods: Dict[Event, Period],
+) -> None:
+    """
+    Sets the MIP start of Y and H to the period of each event in periods.
+    Events without a period are left for Gurobi to complete
+    """
+
+    for (e, p), var in Y.items():
+        if e in periods:
+            var.Start = 1 if periods[e] == p else 0
+
+    for e, var in H.items():
+        if e in periods:
+            var.Start = periods[e].get_ordinal_value()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the master problem assignment builders"
+    )
+    parser.add_argument("instance", nargs="?", default="D7-2-17.json")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    instance = load_instance(args.instance)
+
+    # Derive the sets the loop builder reads first, so only building is timed
+    instance.PA, instance.F, instance.primary_events, instance.teacherEvents
+
+    print("---------------- Instance: ", args.instance, "----------------")
+    for name, build in (
+        ("addVar/addConstr", build_assignment),
+        ("Matrix API", build_assignment_matrix),
+    ):
+        times = []
+        for _ in range(args.repeat):
+            BMP = Model(const.UNIVERSITY_EXAMINATIONS)
+            BMP.Params.OutputFlag = 0
+            start = time.time()
+            build(BMP, instance)
+            BMP.update()
+            times.append(time.time() - start)
+
+        print(
+            f"{name}: {min(times):.3f} {const.SECONDS} (best of {args.repeat}),",
+            f"{BMP.NumVars} variables, {BMP.NumConstrs} constraints,",
+            f"{BMP.NumNZs} nonzeros",
+        )
+        BMP.dispose()
+
+
+if __name__ == "__main__":
+    main()
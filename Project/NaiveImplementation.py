@@ -5,608 +5,110 @@ Hugo Burton, Anna Henderson, Mitchell Holt
 27/08/2023
 """
 
+import argparse
 import time
+import numpy as np
 from gurobipy import Model, quicksum, GRB
-import json  # For importing the data as JSON format
-import os
 from typing import Dict, List, Set, Tuple
-from Examination import Examination
 from SolutionExport import Solution
 
 # Custom Imports
 from Room import RoomManager, Room
-from Constraint import ConstraintManager, EventPeriodConstraint
-from Course import CourseManager, Course
+from Course import Course
 from Event import Event
-from Curriculum import CurriculaManager, Curriculum
 from Period import Period
 import Constants as const
+from Instance import InstanceModel, load_instance
+from MasterBuilder import set_assignment_start
+from WarmStart import read_solution
 
 
 # ------ Import data ------
-def solve(instance_name: str):
+def solve(instance_name: str, warm_start: str = None):
     print("---------------- Instance: ", instance_name, "----------------")
     previous_time = time.time()
-    data_file = os.path.join(".", "Project", "data", instance_name)
 
-    with open(data_file, "r") as json_file:
-        json_data = json_file.read()
-
-    # ------ Parse data with JSON ------
-
-    parsed_data = json.loads(json_data)
-
-    # Timeslots per day
-    slots_per_day = parsed_data[const.SLOTS_PER_DAY]
+    # ------ Import data ------
+    # The compiled instance is cached on disk, so repeat runs skip parsing and
+    # set construction entirely
+    instance: InstanceModel = load_instance(instance_name)
 
     # Primary Primary Distance
-    primary_primary_distance = parsed_data[const.PRIMARY_PRIMARY_DISTANCE]
-
-    # Exam schedule constraints
-    constrManager = ConstraintManager(slots_per_day)
-    for constraint in parsed_data[const.CONSTRAINTS]:
-        constrManager.add_constraint(constraint)
-
-    # Courses
-    courseManager = CourseManager()
-    for course in parsed_data[const.COURSES]:
-        courseManager.add_course(course)
+    primary_primary_distance = instance.primary_primary_distance
 
-    # Curricula
-    curriculaManager = CurriculaManager()
-    for curriculum in parsed_data[const.CURRICULA]:
-        curriculaManager.add_curriculum(curriculum)
-
-    # Rooms
-    examRooms = parsed_data[const.ROOMS]
-    Rooms = RoomManager()
-    for examRoom in examRooms:
-        Rooms.add_room(examRoom)
-
-    # Cannot add any more rooms after this
-    Rooms.construct_composite_map()
-
-    dummy_room = Rooms.get_dummy_room()
-
-    # Forbidden period constraints (any event any room)
-    # Convert periods into day and timeslot tuples
-    forbidden_period_constraints: List[Period] = [
-        period_constraint.get_period()
-        for period_constraint in constrManager.get_forbidden_period_constraints()
-    ]
+    Rooms: RoomManager = instance.Rooms
 
     print("Data import:", time.time() - previous_time, const.SECONDS)
     previous_time = time.time()
 
     # ------ Sets ------
-    # Some sets are already defined above
-    # -- Events --
-    # (one course can have multiple examinations)
-    # an exmamination can have multiple events
-
-    # Get courses
-    Courses: List[Course] = courseManager.get_courses()
-
-    # Lookup dictionary of examinations for a given course
-    CourseExaminations: Dict[Course, List[Examination]] = {
-        course: [examination for examination in course.get_examinations()]
-        for course in Courses
-    }
-
-    # Extract examinations from CourseList and store in one frozenset
-    Examinations: Set[Examination] = set()
-    for course in Courses:
-        examinations = course.get_examinations()
-        for examination in examinations:
-            Examinations.add(examination)
-
-    # Extract Events from the set of Examinations
-    Events: Set[Event] = set(
-        [event for examination in Examinations for event in examination.get_events()]
-    )
-
-    # Lookup dictionary of events for a given course
-    CourseEvents: Dict[Course, List[Event]] = {
-        course: [
-            event
-            for examination in Examinations
-            if examination.get_course() == course
-            for event in examination.get_events()
-        ]
-        for course in Courses
-    }
-
-    # ------- Constraints -------
-
-    # Forbidden event period constraints. Dictionary of [CourseEvent: Period]
-    forbidden_event_period_constraints: Dict[Event, List[Period]] = {}
+    # See Instance.py for how each set is constructed
 
-    # Initialise dictionary with an empty list for each event
-    for event in Events:
-        forbidden_event_period_constraints[event] = []
-
-    # Iterate through forbidden_event_period_constraints and add to the right list as required
-    for (
-        event_period_constraint
-    ) in constrManager.get_forbidden_event_period_constraints():
-        # Period that the EventPeriodConstraint correspondds to
-        period = event_period_constraint.get_period()
-
-        # Corresponding Course
-        course_name = event_period_constraint.get_course_name()
-        course = courseManager.get_course_by_name(course_name)
-        course_exams = course.get_examinations()
-
-        # Loop over the exams in the course
-        for exam in course_exams:
-            # Check the exam number matches the constraint
-            if exam.get_index() != event_period_constraint.get_exam_ordinal():
-                continue
-
-            if event_period_constraint.get_part() == const.WRITTEN:
-                event = exam.get_written_event()
-            elif event_period_constraint.get_part() == const.ORAL:
-                event = exam.get_oral_event()
-
-            forbidden_event_period_constraints[event].append(period)
+    # -- Events --
+    Events: List[Event] = instance.events
 
     # ----- Periods -----
-    # Redefine set of periods into days and timeslots
     # Calculate number of days in exam period
-    NumDays = parsed_data[const.PERIODS] // slots_per_day
+    NumDays = len(instance.periods) // instance.slots_per_day
 
     # Set of days
     Days = list(range(NumDays))
 
-    # Set of Timeslots in each day
-    Timeslots = list(range(slots_per_day))
-
     # Set of periods each day
-    Periods = [
-        Period(day, timeslot, slots_per_day) for day in Days for timeslot in Timeslots
-    ]
+    Periods: List[Period] = instance.periods
+
+    # List of rooms indexed by room id
+    RoomList: List[Room] = instance.rooms
 
     # Set of composite rooms (R^C) in paper)
     CompositeRooms = Rooms.get_composite_rooms()
 
-    # -- Room Equivalence Class --
-    # TODO Yet to determine what this is
-    K = {}
-
     # The set of overlapping rooms of composite room
     # Indexed by rc
     R0 = Rooms.get_overlapping_rooms_dict()
 
     # -- Period Availabilities (P_e in paper) --
-    # Set of periods available for event e
-    PA: Dict[Event, List[Period]] = {}
-    for event in Events:
-        PA[event] = []
+    PA: Dict[Event, Set[Period]] = instance.PA
 
-        for period in Periods:
-            if period in forbidden_period_constraints:
-                continue
-
-            if period in forbidden_event_period_constraints[event]:
-                continue
+    # -- Room availabilities (R_e in paper) --
+    RA: Dict[Event, Set[Room]] = instance.RA
 
-            PA[event].append(period)
-
-    # -- Room availabilities --
-    # Dictionary mapping events to a set of rooms in which it can be held
-    # R_e in paper
-    RA: Dict[Event, List[Room]] = {}
-
-    available_types: Dict[str, List[str]] = {}
-    available_types[const.DUMMY] = [const.DUMMY]
-    available_types[const.SMALL] = [const.SMALL, const.MEDIUM, const.LARGE]
-    available_types[const.MEDIUM] = [const.MEDIUM, const.LARGE]
-    available_types[const.LARGE] = [const.LARGE]
-    available_types[const.COMPOSITE] = [const.COMPOSITE]
-
-    for event in Events:
-        if event.get_num_rooms() == 0:
-            # No room required. Set of dummy room
-            RA[event] = {dummy_room}
-        elif event.get_num_rooms() == 1:
-            # Only a single room required
-            # Get the set of rooms which are single and are of the right type
-
-            room_set = set()
-            for r in Rooms.get_single_rooms():
-                if r.get_type() in available_types.get(event.get_room_type()):
-                    room_set.add(r)
-
-            RA[event] = room_set
-        else:
-            # Composite Room required for this event
-            # Get the set of rooms which are single and are of the right type
-
-            room_set = set()
-            for r in Rooms.get_composite_rooms():
-                adjacent_rooms: List[Room] = Rooms.composite_map[r]
-
-                if (
-                    len(r.get_members()) == event.get_num_rooms()
-                    and adjacent_rooms[0].get_type() == event.get_room_type()
-                ):
-                    room_set.add(r)
-
-            RA[event] = room_set
-
-    # The set of available room equivalence classes for event e
-    # K_e in paper
-    # TODO Yet to determine what this is
-    KE = {}
+    # The same availabilities as boolean matrices (events x periods and
+    # events x rooms) indexed by event, period and room id
+    PAMatrix: np.ndarray = instance.PAMatrix
+    RAMatrix: np.ndarray = instance.RAMatrix
 
     # dictionary mapping events e to the set of events in H3 hard conflict with e
     # HC_e in paper
-    HC: Dict[Event, List[Event]] = {}
-
-    # Initialise empty list for every event
-    for e in Events:
-        HC[e] = []
-
-    for curriculum in curriculaManager.get_curricula():
-        curriculum: Curriculum
-
-        curriculum_events_by_teacher: Dict[str, List[Event]] = {}
-
-        # Get all the primary events that are part of this curriculum and taught by the same teacher
-        for course_name in curriculum.get_primary_course_names():
-            course: Course = courseManager.get_course_by_name(course_name)
-
-            course_teacher = course.get_teacher()
-
-            # Get the set of events for this course
-            course_events: List[Event] = CourseEvents.get(course)
-
-            if course_teacher not in curriculum_events_by_teacher.keys():
-                curriculum_events_by_teacher[course_teacher] = []
-
-            curriculum_events_by_teacher[course_teacher].extend(course_events)
-
-        for course_name in curriculum.get_primary_course_names():
-            course: Course = courseManager.get_course_by_name(course_name)
-
-            course_teacher = course.get_teacher()
-
-            # Get the set of events for this course
-            course_events: List[Event] = CourseEvents.get(course)
-
-            for event in course_events:
-                for curriculum_event in curriculum_events_by_teacher[course_teacher]:
-                    if event == curriculum_event:
-                        continue
-                    HC[event].append(curriculum_event)
-
-    # F = the set of examination pairs with precendence constraints.
-    # But actually we use the event instead
-    # This occurs if they are written and oral parts of the same examination
-    # and they are part of two consecutive examinations of the same course
-    F: Set[Tuple[Event, Event]] = set()
-
-    # The set of event pairs with a directed soft distance constraint. Occurs when
-    # 1. Written and Oral events of the same examination
-    #   minimum and maximum distance
-    # 2. Same course with multiple examinations. One exam is consecutive which removes symmetry
-    # in the problem. Placed between the first event of each examination if it is a multi-part exam
-    DPDirected: Set[Tuple[Event, Event]] = set()
-
-    # DP^{E} in paper
-    # Examination Event Pairs of the same course.
-    # This only applies to the first examination event if there are multiple
-    # Setting this here as the loop is present and is convenient.
-    DPSameCourse: Set[Tuple[Event, Event]] = set()
-
-    # DP^{WO}
-    # WO Event Parts of the same examination
-    # Setting this here as the loop is present and is convenient.
-    # Should contain events only from WRITTEN_AND_ORAL courses
-    DPWrittenOral: Set[Tuple[Event, Event]] = set()
-
-    # Written and Oral Events of the same examination
-    for examination in Examinations:
-        examination: Examination
-        corresponding_course: Course = examination.get_course()
-
-        if corresponding_course.is_written_and_oral():
-            # Safety check with written oral exam specs
-            assert corresponding_course.get_written_oral_specs is not None
-
-            # Find the actual written and oral events
-            writtenEvent = examination.get_written_event()
-            oralEvent = examination.get_oral_event()
-
-            F.add((writtenEvent, oralEvent))
-            DPDirected.add((writtenEvent, oralEvent))
-
-            # Adding to DP^{WO} here as it is convenient
-            DPWrittenOral.add((writtenEvent, oralEvent))
-
-    # Events belong to the same course
-    for course in Courses:
-        course_examinations = CourseExaminations.get(course)
-
-        # Consider first (written) event in each exam if it's a multi-parter
-        for examination_a in course_examinations:
-            for examination_b in course_examinations:
-                examination_a: Examination
-                examination_b: Examination
-                if examination_a.__eq__(examination_b):
-                    continue
-
-                # Don't add directed distance constraints if examination_a is to come after
-                # examination_b
-                if examination_a.get_index() > examination_b.get_index():
-                    continue
-
-                event_a = examination_a.get_first_event()
-                event_b = examination_b.get_first_event()
-
-                F.add((event_a, event_b))
-                DPDirected.add((event_a, event_b))
-
-                #  DP^{E}
-                DPSameCourse.add((event_a, event_b))
-
-    # DPUndirected - The set of event pairs with an undirected soft distance
-    # constraint. If (e1, e2) in DPUndirected, then (e2, e1) is also. Occurs when:
-    # 1. Same curriculum: if two courses belong to the same curriculum, there should be a
-    # minimum separation between the examinations. For two-event examinations, consider the
-    # first event only
-    DPUndirected: Set[Tuple[Event, Event]] = set()
-
-    # Loop over curriculums
-    for curricula in curriculaManager.get_curricula():
-        curriucla_course_names = curricula.get_course_names()
-        curricula_courses: List[Course] = []
-        for course_name in curriucla_course_names:
-            curricula_courses.append(courseManager.get_course_by_name(course_name))
-
-        for course_a in curricula_courses:
-            for course_b in curricula_courses:
-                course_a: Course
-                course_b: Course
-
-                if course_a.__eq__(course_b):
-                    continue
-
-                course_a_examinations = CourseExaminations.get(course_a)
-                course_b_examinations = CourseExaminations.get(course_b)
-
-                # Consider first (written) event in each exam if it's a multi-parter
-                # Add every combination of events for the two courses into the set.
-                # No need to check if the examinations are equal as they won't be!
-                # They will be from different courses
-                for examination_a in course_a_examinations:
-                    for examination_b in course_b_examinations:
-                        examination_a: Examination
-                        examination_b: Examination
-
-                        # Don't add directed distance constraints if examination_a is to come after
-                        # examination_b
-
-                        # Course a
-
-                        if course_a.is_written() or course_a.is_written_and_oral():
-                            event_a = examination_a.get_written_event()
-                        elif course_a.is_oral():
-                            event_a = examination_a.get_oral_event()
-
-                        # Course b
-
-                        if course_b.is_written() or course_b.is_written_and_oral():
-                            event_b = examination_b.get_written_event()
-                        elif course_b.is_oral():
-                            event_b = examination_b.get_oral_event()
-
-                        DPUndirected.add((event_a, event_b))
-
-    # SCPS
-    # Dictionary mapping each primary event to the set of secondary
-    # courses in the same curriculum
-    SCPS = {}  # type is dict[Event, set(Event)]
-    for event in Events:
-        event_course_name = event.get_course_name()
-
-        overlapping_secondary_curriculum_courses = []
-
-        for curriculum in curriculaManager.get_curricula():
-            primary_course_names = curriculum.get_primary_course_names()
-            secondary_course_names = curriculum.get_secondary_course_names()
-
-            # If the course isn't primary, we shouldn't add any of the secondary courses
-            if event_course_name not in primary_course_names:
-                continue
-
-            # This curricula containing the course in the primary section
-            # Add all the courses from the secondary part of the course into the overlapping_secondary_curriculum
-            for secondary_course_name in secondary_course_names:
-                secondary_course = courseManager.get_course_by_name(
-                    secondary_course_name
-                )
-                if secondary_course not in overlapping_secondary_curriculum_courses:
-                    overlapping_secondary_curriculum_courses.append(secondary_course)
-
-        # Now convert all these courses into events using the CourseEvent dictionary
-        secondary_curricula_events = []
-        for course in overlapping_secondary_curriculum_courses:
-            secondary_curricula_events.extend(CourseEvents.get(course))
-
-        SCPS[event] = set(secondary_curricula_events)
-
-    # SCSS
-    # Dictionary mapping each secondary event to the set of other
-    # secondary courses in the same curriculum
-    SCSS = {}  # tySe is dict[Event, set(Event)]
-    for event in Events:
-        event_course: Course = event.get_course()
-        event_course_name: str = event_course.get_course_name()
-
-        overlapping_secondary_curriculum_courses = []
-
-        for curriculum in curriculaManager.get_curricula():
-            secondary_course_names = curriculum.get_secondary_course_names()
-
-            # If the course isn't secondary, we shouldn't add any of the secondary courses
-            if event_course_name not in secondary_course_names:
-                continue
-
-            # This curricula containing the course in the secondary section
-            # Add all the courses from the secondary part of the course into the overlapping_secondary_curriculum
-            # Exclude the event_course_name
-            for secondary_course_name in secondary_course_names:
-                secondary_course = courseManager.get_course_by_name(
-                    secondary_course_name
-                )
-                if (
-                    secondary_course not in overlapping_secondary_curriculum_courses
-                    and secondary_course != event_course
-                ):
-                    overlapping_secondary_curriculum_courses.append(secondary_course)
-
-        # Now convert all these courses into events using the CourseEvent dictionary
-        secondary_curricula_events = []
-        for course in overlapping_secondary_curriculum_courses:
-            secondary_curricula_events.extend(CourseEvents.get(course))
-
-        SCSS[event] = set(secondary_curricula_events)
-
-    # The sets containing pairs to be considered for the S3 soft constraint
-    # constraints and objective contribution
-
-    # DPPrimaryPrimary is the set of event tuples from examinations of which their courses
-    # are found in the same primary curriculum
-    # This only applies to the first examination event if there are multiple
-    DPPrimaryPrimary: Set[Tuple[Event, Event]] = set()
-
-    # DPPrimaryPrimary is the set of event tuples from examinations of which
-    # the first corresponding course is primary and the second corresponding
-    # course is seconday
-    DPPrimarySecondary: Set[Tuple[Event, Event]] = set()
-
-    # Construct DPPrimaryPrimary and DPPrimarySecondary
-    for c in curriculaManager.get_curricula():
-        primary_courses = [
-            courseManager.get_course_by_name(name)
-            for name in c.get_primary_course_names()
-        ]
-
-        secondary_courses = [
-            courseManager.get_course_by_name(name)
-            for name in c.get_secondary_course_names()
-        ]
-
-        for p1 in primary_courses:
-            p1_examinations = p1.get_examinations()
-
-            for p2 in primary_courses:
-                if p1.__eq__(p2):
-                    continue
-
-                p2_examinations = p2.get_examinations()
-
-                for p1_exam in p1_examinations:
-                    for p2_exam in p2_examinations:
-                        e1 = p1_exam.get_first_event()
-                        e2 = p2_exam.get_first_event()
-
-                        if (e1, e2) not in DPPrimaryPrimary:
-                            DPPrimaryPrimary.add((e1, e2))
-
-            for s in secondary_courses:
-                s_examinations = s.get_examinations()
-
-                for p1_exam in p1_examinations:
-                    for s_exam in s_examinations:
-                        e1 = p1_exam.get_first_event()
-                        e2 = s_exam.get_first_event()
-
-                        if (e1, e2) not in DPPrimarySecondary:
-                            DPPrimarySecondary.add((e1, e2))
+    HC: Dict[Event, List[Event]] = instance.HC
+
+    # Precedences and directed / undirected distance pairs
+    F: Set[Tuple[Event, Event]] = instance.F
+    DPDirected: Set[Tuple[Event, Event]] = instance.DPDirected
+    DPSameCourse: Set[Tuple[Event, Event]] = instance.DPSameCourse
+    DPWrittenOral: Set[Tuple[Event, Event]] = instance.DPWrittenOral
+    DPUndirected: Set[Tuple[Event, Event]] = instance.DPUndirected
+    # First events of courses in the same primary curriculum, and of a primary
+    # and a secondary course in the same curriculum, as n x 2 arrays of event ids
+    DPPrimaryPrimaryPairs: np.ndarray = instance.DPPrimaryPrimaryPairs
+    DPPrimarySecondaryPairs: np.ndarray = instance.DPPrimarySecondaryPairs
+
+    # S1 soft conflicts
+    SCPS: Dict[Event, Set[Event]] = instance.SCPS
+    SCSS: Dict[Event, Set[Event]] = instance.SCSS
 
     # Soft constraint undesired period violation cost for event e to be assigned to
-    # period p
-    UndesiredPeriodCost = {}
-    undesired_event_periods: Dict[Event, Set[Period]] = {}
-    preferred_periods: Dict[Event, Set[Period]] = {}
-
-    for e in Events:
-        if event not in preferred_periods.keys():
-            preferred_periods[e] = set()
-
-    for (
-        preferred_event_period_constraint
-    ) in constrManager.get_preferred_event_period_constraints():
-        preferred_event_period_constraint: EventPeriodConstraint
-
-        exam_number: int = preferred_event_period_constraint.get_exam_ordinal()
-
-        course_name: str = preferred_event_period_constraint.get_course_name()
-        course: Course = courseManager.get_course_by_name(course_name)
-
-        period: Period = preferred_event_period_constraint.get_period()
-
-        examination: Examination = course.get_examination_by_index(exam_number)
-        exam_part: str = preferred_event_period_constraint.get_part()
-
-        if exam_part is None:
-            # exam only has one part
-            event: event = examination.get_first_event()
-        else:
-            event: Event = examination.get_event_by_part(exam_part)
-
-        preferred_periods[event].add(period)
-
-    global_undesired_periods = set(
-        p.get_period() for p in constrManager.get_undesired_period_constraints()
-    )
-    for e in Events:
-        undesired_event_periods[e] = set()
-        for c in constrManager.get_undesired_event_period_constraints():
-            if c.get_course_name() == e.get_course_name():
-                undesired_event_periods[e].add(c.get_period())
-
-    for e in Events:
-        for p in PA[e]:
-            if p in global_undesired_periods or p in undesired_event_periods[e]:
-                UndesiredPeriodCost[e, p] = const.P_UNDESIRED_PERIOD
-            elif len(preferred_periods[e]) > 0 and p not in preferred_periods[e]:
-                UndesiredPeriodCost[e, p] = const.P_NOT_PREFERED_PERIOD
-            else:
-                UndesiredPeriodCost[e, p] = 0
+    # period p. Events x periods matrix
+    UndesiredPeriodCost: np.ndarray = instance.UndesiredPeriodCost
 
     # Soft constraint undesired room violation cost for event e to be assigned to
-    # period p. \alpha in the paper
-    UndesiredRoomCost = {}
-    undesired_event_rooms: Dict[Event, Set[Room]] = {}
-    for e in Events:
-        undesired_event_rooms[e] = set()
-
-        for (
-            event_room_constraint
-        ) in constrManager.get_undesired_event_room_constraints():
-            room_name: str = event_room_constraint.get_room_name()
-            room: Room = Rooms.get_room_by_name(room_name)
-
-            if event_room_constraint.get_course_name() == e.get_course_name():
-                undesired_event_rooms[e].add(room)
-
-    for e in Events:
-        for r in RA[e]:
-            if r in undesired_event_rooms[e]:
-                UndesiredRoomCost[e, r] = const.P_UNDESIRED_ROOM
-            else:
-                UndesiredRoomCost[e, r] = 0
+    # room r. \alpha in the paper. Events x rooms matrix
+    UndesiredRoomCost: np.ndarray = instance.UndesiredRoomCost
 
     print("Calculating Sets:", time.time() - previous_time, const.SECONDS)
     previous_time = time.time()
 
     # ------ Data ------
-    # -- Teachers --
-    teachers = parsed_data[const.TEACHERS]
-
     # -- Exam Distance --
     print(f"------\n{const.GUROBI}\n------")
 
@@ -631,17 +133,32 @@ def solve(instance_name: str):
 
     # Soft constraint counting variables. The paper claims that all of these may be
     # relaxed to be continuous.
-    # S1
-    SPS = {(e, p): m.addVar(vtype=GRB.CONTINUOUS) for e in Events for p in Periods}
-    SSS = {(e, p): m.addVar(vtype=GRB.CONTINUOUS) for e in Events for p in Periods}
+    # S1. Only over the periods each event can be held in, and only for events
+    # which have a soft conflict with another event
+    SPS = {
+        (e, p): m.addVar(vtype=GRB.CONTINUOUS)
+        for e in Events
+        if len(SCPS[e]) > 0
+        for p in PA[e]
+    }
+    SSS = {
+        (e, p): m.addVar(vtype=GRB.CONTINUOUS)
+        for e in Events
+        if len(SCSS[e]) > 0
+        for p in PA[e]
+    }
 
     # S3
     PMinE = {(e1, e2): m.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPSameCourse}
     PMinWO = {(e1, e2): m.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPWrittenOral}
     PMaxWO = {(e1, e2): m.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPWrittenOral}
-    PMinPP = {(e1, e2): m.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPPrimaryPrimary}
+    PMinPP = {
+        (Events[e1], Events[e2]): m.addVar(vtype=GRB.CONTINUOUS)
+        for e1, e2 in DPPrimaryPrimaryPairs.tolist()
+    }
     PMinPS = {
-        (e1, e2): m.addVar(vtype=GRB.CONTINUOUS) for (e1, e2) in DPPrimarySecondary
+        (Events[e1], Events[e2]): m.addVar(vtype=GRB.CONTINUOUS)
+        for e1, e2 in DPPrimarySecondaryPairs.tolist()
     }
 
     # Variables for S3 soft constraints
@@ -685,17 +202,12 @@ def solve(instance_name: str):
 
     # Prevent Y from being assigned invalid period
     PreventY = {
-        (e, p): m.addConstr(Y[e, p] == 0)
-        for e in Events
-        for p in Periods
-        if p not in PA[e]
+        (e, p): m.addConstr(Y[Events[e], Periods[p]] == 0)
+        for e, p in zip(*np.nonzero(~PAMatrix))
     }
     PreventX = {
-        (e, p, r): m.addConstr(X[e, p, r] == 0)
-        for e in Events
-        for p in Periods
-        for r in Rooms
-        if p not in PA[e] or r not in RA[e]
+        (e, p, r): m.addConstr(X[Events[e], Periods[p], RoomList[r]] == 0)
+        for e, p, r in zip(*np.nonzero(~(PAMatrix[:, :, None] & RAMatrix[:, None, :])))
     }
 
     # Constraint 3: Two events must have different periods if they are in hard conflict
@@ -751,8 +263,7 @@ def solve(instance_name: str):
             <= SPS[e, p]
             + len([e2 for e2 in SCPS[e] if (e, e2) in DPDirected and p in PA[e2]])
         )
-        for e in Events
-        for p in PA[e]
+        for (e, p) in SPS
     }
 
     # Constraint 9 (S2): Preferences
@@ -764,8 +275,7 @@ def solve(instance_name: str):
             <= SSS[e, p]
             + len({e2 for e2 in SCSS[e] if (e, e2) in DPDirected and p in PA[e2]})
         )
-        for e in Events
-        for p in PA[e]
+        for (e, p) in SSS
     }
 
     # Constraint 10 (S3): DirectedDistances
@@ -865,7 +375,7 @@ def solve(instance_name: str):
         )
 
     Constraint23 = {}
-    for e1, e2 in DPPrimaryPrimary:
+    for e1, e2 in PMinPP:
         e1_course: Course = e1.get_course()
         e2_course: Course = e2.get_course()
 
@@ -874,7 +384,7 @@ def solve(instance_name: str):
         )
 
     # Constraint24 = {}
-    # for e1, e2 in DPPrimarySecondary:
+    # for e1, e2 in PMinPS:
     #     e1_course: Course = e1.get_course()
     #     e2_course: Course = e2.get_course()
 
@@ -883,28 +393,50 @@ def solve(instance_name: str):
     # ------ Objective Function ------
     m.setObjective(
         # Cost S1
-        const.SC_PRIMARY_SECONDARY * quicksum(SPS[e, p] for e in Events for p in PA[e])
-        + const.SC_SECONDARY_SECONDARY
-        * quicksum(SSS[e, p] for e in Events for p in PA[e])
+        const.SC_PRIMARY_SECONDARY * quicksum(SPS.values())
+        + const.SC_SECONDARY_SECONDARY * quicksum(SSS.values())
         # Cost S2
-        + quicksum((UndesiredPeriodCost[e, p]) * Y[e, p] for e in Events for p in PA[e])
         + quicksum(
-            UndesiredRoomCost[e, r] * X[e, p, r]
-            for e in Events
-            for p in PA[e]
-            for r in RA[e]
+            int(UndesiredPeriodCost[e, p]) * Y[Events[e], Periods[p]]
+            for e, p in zip(*np.nonzero(UndesiredPeriodCost))
+        )
+        + quicksum(
+            int(UndesiredRoomCost[e, r]) * X[Events[e], p, RoomList[r]]
+            for e, r in zip(*np.nonzero(UndesiredRoomCost))
+            for p in PA[Events[e]]
         )
         # Cost S3
         + const.DD_SAME_COURSE * quicksum(PMinE[e1, e2] for (e1, e2) in DPSameCourse)
         + const.DD_SAME_EXAMINATION
         * quicksum(PMinWO[e1, e2] + PMaxWO[e1, e2] for (e1, e2) in DPWrittenOral)
-        + const.UD_PRIMARY_PRIMARY
-        * quicksum(PMinPP[e1, e2] for (e1, e2) in DPPrimaryPrimary)
-        + const.UD_PRIMARY_SECONDARY
-        * quicksum(PMinPS[e1, e2] for (e1, e2) in DPPrimarySecondary),
+        + const.UD_PRIMARY_PRIMARY * quicksum(PMinPP.values())
+        + const.UD_PRIMARY_SECONDARY * quicksum(PMinPS.values()),
         GRB.MINIMIZE,
     )
 
+    # Start from the timetable and rooms of a solution file. See WarmStart.py
+    if warm_start is not None:
+        StartPeriods, StartRooms, Unmapped = read_solution(warm_start, instance)
+        print(
+            "Warm start: mapped",
+            len(StartPeriods),
+            "of",
+            len(Events),
+            "events from",
+            warm_start,
+        )
+        for message in Unmapped:
+            print("    Not mapped:", message)
+
+        set_assignment_start(Y, H, StartPeriods)
+        for (e, p, r), var in X.items():
+            if e not in StartPeriods:
+                continue
+            if StartPeriods[e] != p:
+                var.Start = 0
+            elif e in StartRooms:
+                var.Start = 1 if StartRooms[e] == r else 0
+
     print("Define Gurobi Model:", time.time() - previous_time, const.SECONDS)
     previous_time = time.time()
     # ------ Optimise -------
@@ -946,8 +478,16 @@ def solve(instance_name: str):
 
 
 def main():
-    instance_name = "toy.json"
-    solve(instance_name)
+    parser = argparse.ArgumentParser(description="Solve an instance with the MIP")
+    parser.add_argument("instance", nargs="?", default="toy.json")
+    parser.add_argument(
+        "--warm-start",
+        metavar="SOLUTION",
+        help="start from a solution file",
+    )
+    args = parser.parse_args()
+
+    solve(args.instance, args.warm_start)
 
 
 if __name__ == "__main__":
@@ -7,12 +7,51 @@ Hugo Burton
 3/9/2023
 """
 
+from typing import Dict, Tuple
+
 
 class Period:
+    """
+    Periods are flyweights: constructing the same (day, timeslot, slots_per_day)
+    twice returns the same object, so comparisons are usually identity checks.
+    The ordinal value doubles as the period's dense integer id.
+    """
+
+    __slots__ = ("day", "timeslot", "slots_per_day", "ordinal", "_hash")
+
+    # Interned periods by (day, timeslot, slots_per_day)
+    _interned: Dict[Tuple[int, int, int], "Period"] = {}
+
+    def __new__(cls, day: int, timeslot: int, slots_per_day: int) -> "Period":
+        key = (day, timeslot, slots_per_day)
+        period = cls._interned.get(key)
+        if period is None:
+            period = super().__new__(cls)
+            period.day = day
+            period.timeslot = timeslot
+            period.slots_per_day = slots_per_day
+            period.ordinal = day * slots_per_day + timeslot
+            period._hash = hash((day, timeslot))
+            cls._interned[key] = period
+        return period
+
     def __init__(self, day: int, timeslot: int, slots_per_day: int) -> None:
-        self.day: int = day
-        self.timeslot: int = timeslot
-        self.slots_per_day = slots_per_day
+        # All attributes are set once in __new__
+        pass
+
+    def __reduce__(self):
+        """
+        Unpickle through the constructor so periods stay interned
+        """
+
+        return (Period, (self.day, self.timeslot, self.slots_per_day))
+
+    def get_id(self) -> int:
+        """
+        Returns the dense integer id of the period (its ordinal value)
+        """
+
+        return self.ordinal
 
     def get_day(self) -> int:
         """
@@ -33,6 +72,8 @@ class Period:
         Determines if this period is equal to another period.
         Returns True if the periods are equal, False otherwise.
         """
+        if self is other_period:
+            return True
         if isinstance(other_period, Period):
             return (
                 self.day == other_period.day and self.timeslot == other_period.timeslot
@@ -73,14 +114,14 @@ class Period:
         Hash function for Period objects.
         """
 
-        return hash((self.day, self.timeslot))
+        return self._hash
 
     def get_ordinal_value(self) -> int:
         """
         Returns period number as in the data. Day * Slots per day + timeslot
         """
 
-        return self.day * self.slots_per_day + self.timeslot
+        return self.ordinal
 
     @staticmethod
     def from_period_number(period_number: int, slots_per_day: int) -> "Period":
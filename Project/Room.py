@@ -8,7 +8,14 @@ import Utils as utils
 
 
 class Room:
-    def __init__(self, room_data=None) -> None:
+    """
+    Rooms are given a dense integer id by the RoomManager (the dummy room is 0)
+    """
+
+    __slots__ = ("id", "room", "room_type", "members", "_hash")
+
+    def __init__(self, room_data=None, room_id: int = 0) -> None:
+        self.id: int = room_id
         if room_data is None:
             self.room = const.DUMMY
             self.room_type = const.DUMMY
@@ -18,6 +25,8 @@ class Room:
             self.room_type = room_data.get(const.TYPE)
             self.members = room_data.get(const.MEMBERS, [])
 
+        self._hash = hash(self.room)
+
     def __repr__(self) -> str:
         """
         Repr method for Room
@@ -33,6 +42,9 @@ class Room:
         Returns true if room is equal to other room
         """
 
+        if self is __value:
+            return True
+
         if not isinstance(__value, Room):
             return False
 
@@ -43,7 +55,14 @@ class Room:
         Returns hash of room
         """
 
-        return hash(self.room)
+        return self._hash
+
+    def get_id(self) -> int:
+        """
+        Returns the dense integer id of the room
+        """
+
+        return self.id
 
     def get_room_name(self) -> str:
         """
@@ -118,6 +137,10 @@ class RoomManager:
     RoomManager handles all the rooms for the exam scheduling problem.
     This includes small, large and composite rooms. As well as the dummy
     room for exams not assigned a room
+
+    Once construct_composite_map() has been called no more rooms can be added,
+    and the room catalogue (rooms by type and size, compatible room counts,
+    overlapping rooms, etc.) is frozen into lookup tables so every query is O(1).
     """
 
     def __init__(self):
@@ -129,14 +152,32 @@ class RoomManager:
         # Add the dummy room
         self.rooms: list[Room] = [Room()]
 
+        # Map from room name to room
+        self.room_name_map: Dict[str, Room] = {r.get_room_name(): r for r in self.rooms}
+
         # Graph in the form of an ajacency list for storing joining rooms
         self.composite_map: Dict[Room, List[Room]] = {}
 
         # Flag for if Composite room graph has been constructed
         self.constructed = False
 
+        # Room catalogue. Filled in by construct_composite_map
         self.room_joining_map: Dict[Room, List[Room]] = {}
-        self.construct_joining_map()
+        self.composite_rooms: Set[Room] = frozenset()
+        self.single_rooms: List[Room] = []
+        self.rooms_by_type: Dict[str, List[Room]] = {}
+        self.rooms_by_type_and_size: Dict[Tuple[str, int], List[Room]] = {}
+        self.max_members_by_room_type: Dict[str, int] = {}
+        self.num_compatible_rooms: Dict[Tuple[str, bool], int] = {}
+        self.overlapping_rooms: Dict[Room, Set[Room]] = {}
+        self.overlapping_rooms_dict: Dict[Room, List[Room]] = {}
+
+        # Room conflict graph. Maps a room id to a bitset of the ids of rooms
+        # which cannot be used at the same time (they share a member)
+        self.conflict_graph: Dict[int, int] = {}
+
+        # Exact independence numbers by (room type, room size)
+        self.independence_numbers: Dict[Tuple[str, int], int] = {}
 
     def add_room(self, room_data: any) -> Room:
         """
@@ -149,8 +190,9 @@ class RoomManager:
         if existing_room is not None:
             raise ValueError("Room already exists")
 
-        new_room = Room(room_data)
+        new_room = Room(room_data, len(self.rooms))
         self.rooms.append(new_room)
+        self.room_name_map[new_room.get_room_name()] = new_room
 
         return new_room
 
@@ -166,17 +208,15 @@ class RoomManager:
         Gets room by it's name
         """
 
-        for room in self.rooms:
-            if room.get_room_name() == room_name:
-                return room
-        return None
+        return self.room_name_map.get(room_name)
 
     def get_composite_rooms(self) -> Set[Room]:
         """
         Gets list of composite rooms stored by the RoomManager
         """
 
-        return {r for r in self.rooms if r.get_type() == const.COMPOSITE}
+        self.construct_composite_map()
+        return self.composite_rooms
 
     def get_rooms_by_size(self) -> Dict[str, List[Room]]:
         """
@@ -184,34 +224,8 @@ class RoomManager:
         number of members in a dictionary.
         """
 
-        rooms_by_type_and_size: Dict[Tuple[str, int], List[Room]] = {}
-
-        for room_type in const.ROOM_TYPES:
-            rooms = self.get_rooms()
-            for room in rooms:
-                if room.is_composite():
-                    room_members = room.get_members()
-
-                    # Can just use the first room to get size given all rooms in composite room
-                    # are the same size (homogeneous)
-                    room_member_type = self.get_room_by_name(room_members[0]).get_type()
-
-                    num_room_members = len(room_members)
-                else:
-                    num_room_members = 1
-                    room_member_type = room.get_type()
-
-                if (room_type, num_room_members) not in rooms_by_type_and_size.keys():
-                    rooms_by_type_and_size[(room_type, num_room_members)] = []
-
-                if room_member_type != room_type:
-                    continue
-
-                rooms_by_type_and_size[(room_member_type, num_room_members)].append(
-                    room
-                )
-
-        return rooms_by_type_and_size
+        self.construct_composite_map()
+        return self.rooms_by_type_and_size
 
     def get_rooms_by_size_and_num_rooms(
         self, room_type: str, num_rooms: int
@@ -222,9 +236,7 @@ class RoomManager:
         number of room members > 1 => composite room
         """
 
-        get_rooms_by_type_and_size = self.get_rooms_by_size()
-
-        return get_rooms_by_type_and_size.get((room_type, num_rooms), [])
+        return self.get_rooms_by_size().get((room_type, num_rooms), [])
 
     def get_max_members_dict(self) -> Dict[str, int]:
         """
@@ -233,36 +245,8 @@ class RoomManager:
         0 if no rooms of that room_type exist.
         """
 
-        max_members_by_room_type: Dict[str, int] = {}
-
-        for size in const.ROOM_TYPES:
-            # Initialise max members for each room type to 0
-            if size not in max_members_by_room_type.keys():
-                max_members_by_room_type[size] = 0
-
-            rooms = self.get_rooms()
-            for room in rooms:
-                room: Room
-                if room.is_composite():
-                    room_members = room.get_members()
-
-                    # Can just use the first room to get size given all rooms in composite room
-                    # are the same size (homogeneous)
-                    room_member_type = self.get_room_by_name(room_members[0]).get_type()
-
-                    num_room_members = len(room_members)
-                else:
-                    num_room_members = 1
-                    room_member_type = room.get_type()
-
-                if room_member_type != size:
-                    continue
-
-                max_members_by_room_type[size] = max(
-                    max_members_by_room_type[size], num_room_members
-                )
-
-        return max_members_by_room_type
+        self.construct_composite_map()
+        return self.max_members_by_room_type
 
     def get_max_members_by_room_type(self, room_type: str) -> int:
         """
@@ -276,82 +260,99 @@ class RoomManager:
         Gets list of non-composite (small, medium and large) rooms stored by the RoomManager
         """
 
-        return [
-            r
-            for r in self.rooms
-            if r.get_type() != const.COMPOSITE and r.get_type() != const.DUMMY
-        ]
+        self.construct_composite_map()
+        return self.single_rooms
 
     def get_small_rooms(self) -> list[Room]:
         """
         Gets list of small rooms stored by the RoomManager
         """
 
-        return [r for r in self.rooms if r.get_type() == const.SMALL]
+        return self.get_single_rooms_by_type(const.SMALL)
 
     def get_medium_rooms(self) -> list[Room]:
         """
         Gets list of medium rooms stored by the RoomManager
         """
 
-        return [r for r in self.rooms if r.get_type() == const.MEDIUM]
+        return self.get_single_rooms_by_type(const.MEDIUM)
 
     def get_large_rooms(self) -> list[Room]:
         """
         Gets list of large rooms stored by the RoomManager
         """
 
-        return [r for r in self.rooms if r.get_type() == const.LARGE]
+        return self.get_single_rooms_by_type(const.LARGE)
 
     def get_single_rooms_by_type(self, room_type: str) -> list[Room]:
         """
         Gets list of single rooms of a given type stored by the RoomManager
         """
 
-        return [r for r in self.rooms if r.get_type() == room_type]
+        self.construct_composite_map()
+        return self.rooms_by_type.get(room_type, [])
 
     def get_independence_number(self, room_type: str, room_size: int) -> int:
         """
         Gets the independence number for the given room type and room size
         """
 
-        # base case
-        if room_size == 1:
-            return self.get_num_rooms_by_type_and_size(room_type, room_size)
+        self.construct_composite_map()
 
-        # find joining rooms
-        rooms: List[Room] = self.get_rooms_by_size_and_num_rooms(room_type, room_size)
+        key = (room_type, room_size)
+        if key not in self.independence_numbers:
+            # Maximum number of rooms of this type and size which can be used at
+            # once. Single rooms never conflict with each other
+            self.independence_numbers[key] = utils.max_independent_set_size(
+                self.get_bitset(self.get_rooms_by_size_and_num_rooms(*key)),
+                self.conflict_graph,
+            )
 
-        visited_members = []
-        ind_num = 0
+        return self.independence_numbers[key]
+
+    def get_independence_number_of(self, rooms: List[Room]) -> int:
+        """
+        Gets the most of the given rooms which can be used at once
+        """
+
+        self.construct_composite_map()
+        return utils.max_independent_set_size(
+            self.get_bitset(rooms), self.conflict_graph
+        )
+
+    def get_bitset(self, rooms: List[Room]) -> int:
+        """
+        Returns the rooms as a bitset over room ids
+        """
+
+        bitset = 0
         for room in rooms:
-            room: Room
-            room_members: List[str] = room.get_members()
+            bitset |= 1 << room.get_id()
+        return bitset
 
-            add = True
-            for member in room_members:
-                if member in visited_members:
-                    # We have seen a room that joins to this room before. Don't add to independence number
-                    add = False
-                    break
+    def get_rooms_in_bitset(self, bitset: int) -> List[Room]:
+        """
+        Returns the rooms in a bitset over room ids
+        """
 
-            if add:
-                ind_num += 1
+        return [self.rooms[i] for i in utils.bits(bitset)]
 
-                # Only add the members of rooms that count towards the independence number
-                visited_members.extend(room_members)
+    def get_conflicting_rooms(self, room: Room) -> Set[Room]:
+        """
+        Returns the rooms which share a member with the given room, and so can't
+        be used at the same time as it
+        """
 
-        return ind_num
+        self.construct_composite_map()
+        return set(self.get_rooms_in_bitset(self.conflict_graph[room.get_id()]))
 
     def get_dummy_room(self) -> Room:
         """
         Returns dummy room
         """
 
-        for r in self.rooms:
-            if r.get_type() == const.DUMMY:
-                return r
-        raise Exception("No dummy room big sad")
+        # The dummy room is always added first
+        return self.rooms[0]
 
     def get_room_joining_map(self) -> Dict[Room, List[Room]]:
         """
@@ -360,6 +361,7 @@ class RoomManager:
         Only maps to size of room 1 larger than current size
         """
 
+        self.construct_composite_map()
         return self.room_joining_map
 
     def get_num_compatible_rooms(self, room_type: str, room_size: int) -> int:
@@ -369,19 +371,21 @@ class RoomManager:
         Return: int
         """
 
-        if room_size > 1:
-            return self.get_num_rooms_by_type(room_type)
-        else:
-            if room_type == const.SMALL:
-                return (
-                    len(self.get_small_rooms())
-                    + len(self.get_medium_rooms())
-                    + len(self.get_large_rooms())
+        self.construct_composite_map()
+
+        key = (room_type, room_size > 1)
+        if key not in self.num_compatible_rooms:
+            # Composite room requests count the single rooms of that type
+            self.num_compatible_rooms[key] = (
+                self.get_num_rooms_by_type(room_type)
+                if room_size > 1
+                else sum(
+                    len(self.get_single_rooms_by_type(t))
+                    for t in self.get_compatible_room_types(room_type, 1)
                 )
-            elif room_type == const.MEDIUM:
-                return len(self.get_medium_rooms()) + len(self.get_large_rooms())
-            elif room_type == const.LARGE:
-                return len(self.get_large_rooms())
+            )
+
+        return self.num_compatible_rooms[key]
 
     def get_compatible_room_types(self, room_type: str, room_size: int) -> List[str]:
         """
@@ -408,15 +412,11 @@ class RoomManager:
         Given a room type, return the number of rooms of that type
         """
 
-        if room_type == const.SMALL:
-            return len(self.get_small_rooms())
-        elif room_type == const.MEDIUM:
-            return len(self.get_medium_rooms())
-        elif room_type == const.LARGE:
-            return len(self.get_large_rooms())
-        else:
+        if room_type not in const.ROOM_TYPES:
             raise Exception("Room Type not found")
 
+        return len(self.get_single_rooms_by_type(room_type))
+
     def get_num_rooms_by_type_and_size(self, room_type: str, room_size: int) -> int:
         """
         Given a room type and room size, return the number of rooms of that type and size
@@ -429,7 +429,7 @@ class RoomManager:
         Given a room, returns the list of Rooms that are the immediate parent rooms of the given room
         """
 
-        return self.room_joining_map.get(room, [])
+        return self.get_room_joining_map().get(room, [])
 
     def construct_joining_map(self) -> Dict[Room, List[Room]]:
         """
@@ -477,14 +477,21 @@ class RoomManager:
     def construct_composite_map(self):
         """
         Constructs graph in the form of an ajacency list to store
-        which rooms are composite and joining
+        which rooms are composite and joining, then freezes the room catalogue
         """
 
         if self.constructed:
             return
 
+        # Set the constructed flag to true. No more rooms can be added
+        self.constructed = True
+
+        self.composite_rooms = frozenset(
+            r for r in self.rooms if r.get_type() == const.COMPOSITE
+        )
+
         # Iterate over all composite rooms stored by the RoomManager
-        for comp_room in self.get_composite_rooms():
+        for comp_room in self.composite_rooms:
             # Get the members of compRoom (as string)
             members = comp_room.get_members()
 
@@ -493,8 +500,93 @@ class RoomManager:
                 self.get_room_by_name(r) for r in members
             ]
 
-        # Set the constructed flag to true
-        self.constructed = True
+        self.construct_catalogue()
+
+    def construct_catalogue(self) -> None:
+        """
+        Precomputes the room lookup tables. Called once the composite map is built
+        """
+
+        self.single_rooms = [
+            r
+            for r in self.rooms
+            if r.get_type() != const.COMPOSITE and r.get_type() != const.DUMMY
+        ]
+
+        self.rooms_by_type = {}
+        for room in self.rooms:
+            self.rooms_by_type.setdefault(room.get_type(), []).append(room)
+
+        # Group by the type of the members and the number of members. Composite
+        # rooms are homogeneous so the first member gives the type
+        self.rooms_by_type_and_size = {}
+        self.max_members_by_room_type = {room_type: 0 for room_type in const.ROOM_TYPES}
+        for room in self.rooms:
+            if room.is_composite():
+                room_member_type = self.composite_map[room][0].get_type()
+                num_room_members = len(room.get_members())
+            else:
+                room_member_type = room.get_type()
+                num_room_members = 1
+
+            for room_type in const.ROOM_TYPES:
+                self.rooms_by_type_and_size.setdefault(
+                    (room_type, num_room_members), []
+                )
+
+            if room_member_type not in self.max_members_by_room_type:
+                continue
+
+            self.rooms_by_type_and_size[(room_member_type, num_room_members)].append(
+                room
+            )
+            self.max_members_by_room_type[room_member_type] = max(
+                self.max_members_by_room_type[room_member_type], num_room_members
+            )
+
+        self.construct_joining_map()
+        self.construct_conflict_graph()
+
+        # A composite room overlaps its members and every composite room
+        # sharing a member with it (including itself)
+        self.overlapping_rooms = {
+            rc: set(
+                self.get_rooms_in_bitset(
+                    self.conflict_graph[rc.get_id()] | 1 << rc.get_id()
+                )
+            )
+            for rc in self.composite_rooms
+        }
+
+        self.overlapping_rooms_dict = self.construct_overlapping_rooms_dict()
+
+        # Independence numbers are computed once per instance
+        for room_type, room_size in self.rooms_by_type_and_size:
+            self.get_independence_number(room_type, room_size)
+
+    def construct_conflict_graph(self) -> None:
+        """
+        Builds the room conflict graph. A composite room conflicts with each of
+        its members and with every other composite room it shares a member with
+        """
+
+        self.conflict_graph = {room.get_id(): 0 for room in self.rooms}
+
+        # Bitset of each single room and the composite rooms it is a member of
+        member_bitsets: Dict[Room, int] = {}
+        for rc, members in self.composite_map.items():
+            for member in members:
+                member_bitsets[member] = member_bitsets.get(member, 0) | (
+                    1 << rc.get_id()
+                )
+
+        for rc, members in self.composite_map.items():
+            neighbours = 0
+            for member in members:
+                neighbours |= 1 << member.get_id() | member_bitsets[member]
+                self.conflict_graph[member.get_id()] |= 1 << rc.get_id()
+
+            self.conflict_graph[rc.get_id()] = neighbours & ~(1 << rc.get_id())
 
     def get_overlapping_rooms(self, rc: Room) -> Set[Room]:
         """
@@ -504,14 +596,10 @@ class RoomManager:
         """
 
         self.construct_composite_map()
-        if rc not in self.composite_map:
+        if rc not in self.overlapping_rooms:
             raise Exception(f"Expected a composite room, got {rc}")
 
-        return {r for r in self.get_rooms() if r in self.composite_map[rc]} | {
-            r
-            for r in self.get_composite_rooms()
-            if not utils.disjoint(r.get_members(), rc.get_members())
-        }
+        return self.overlapping_rooms[rc]
 
     def get_overlapping_rooms_dict(self) -> Dict[Room, List[Room]]:
         """
@@ -519,45 +607,31 @@ class RoomManager:
         a list of overlapping rooms as values.
         """
 
-        if not self.constructed:
-            self.construct_composite_map()
+        self.construct_composite_map()
+        return self.overlapping_rooms_dict
+
+    def construct_overlapping_rooms_dict(self) -> Dict[Room, List[Room]]:
+        """
+        Builds the dictionary returned by get_overlapping_rooms_dict
+        """
 
         overlapping_rooms: Dict[Room, List[Room]] = {}
+        composite_bitset = self.get_bitset(self.composite_rooms)
 
-        visited_regions = []
+        visited_regions = set()
         for comp_room, members in self.composite_map.items():
-            rooms_in_connected_region = [comp_room]
             if comp_room in visited_regions:
                 continue
-            visited_regions.append(comp_room)
-
-            connected_region: Dict[Room, List[Room]] = {}
-            connected_region[comp_room] = members
-
-            for other_comp_room, other_members in self.composite_map.items():
-                if comp_room == other_comp_room:
-                    continue
-
-                connected = False
-                for other_member in other_members:
-                    if other_member in members:
-                        connected = True
-                        break
 
-                if not connected:
-                    continue
-
-                rooms_in_connected_region.append(other_comp_room)
-                visited_regions.append(other_comp_room)
-                connected_region[other_comp_room] = other_members
-
-            connected_region_set_of_members = [
-                set(members) for members in connected_region.values()
-            ]
+            # The composite room and the composite rooms it shares a member with
+            rooms_in_connected_region = [comp_room] + self.get_rooms_in_bitset(
+                self.conflict_graph[comp_room.get_id()] & composite_bitset
+            )
+            visited_regions.update(rooms_in_connected_region)
 
-            intersection = connected_region_set_of_members[0]
-            for cr in connected_region_set_of_members[1:]:
-                intersection = intersection.intersection(cr)
+            intersection = set(members)
+            for room in rooms_in_connected_region[1:]:
+                intersection &= set(self.composite_map[room])
 
             for room in rooms_in_connected_region:
                 overlapping_rooms[room] = list(intersection)
@@ -0,0 +1,471 @@
+"""
+Room assignment subproblem (BSP) of the Benders decomposition for a single
+period.
+
+When none of the events in the period needs more than one room, composite rooms
+play no part and the subproblem is a min-cost bipartite matching of events to
+rooms (undesired rooms cost 1), solved with scipy's linear_sum_assignment.
+
+Otherwise a MIP is used. It is built the first time it is needed with a
+variable for every event and room which could ever be used together in that
+period. Which events the master problem has put in the period only changes the
+right hand side of their AssignedRooms constraint (1 if scheduled, 0 if not), so
+moving from one incumbent to the next only touches the events that moved.
+
+When the events can't all be given rooms, explain() finds a minimal subset of
+them which already can't: a Hall violator in the bipartite graph of events and
+rooms for the matching, or Gurobi's IIS for the MIP. A no-good over that subset
+cuts off every assignment which puts all of it in the period.
+
+PeriodSubproblems holds the BSP of every period and can solve the BSPs of an
+incumbent on a pool of worker threads. Each worker has its own Gurobi
+environment and always solves the same periods, so no model is ever used by
+two threads.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from gurobipy import GRB, Env, Model, Var, quicksum
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse.csgraph import maximum_bipartite_matching
+
+import Constants as const
+from Event import Event
+from Instance import InstanceModel
+from Period import Period
+from Room import Room
+
+
+class PeriodSubproblem:
+    """
+    Persistent BSP for one period
+    """
+
+    def __init__(self, instance: InstanceModel, p: Period, env: Env = None) -> None:
+        self.period = p
+        self.env = env
+
+        RoomList: List[Room] = instance.rooms
+        available = instance.RoomsAvailableMatrix[p.get_id()]
+
+        # Events which can be held in period p
+        self.events: List[Event] = [
+            instance.events[e]
+            for e in np.flatnonzero(instance.PAMatrix[:, p.get_id()]).tolist()
+        ]
+
+        # Rooms each event can be held in during period p, and whether each of
+        # them is undesired for the event
+        self.rooms: Dict[Event, List[Room]] = {}
+        self.undesired: Dict[Event, np.ndarray] = {}
+        for e in self.events:
+            room_ids = np.flatnonzero(instance.RAMatrix[e.get_id()] & available)
+            self.rooms[e] = [RoomList[r] for r in room_ids.tolist()]
+            self.undesired[e] = instance.UndesiredRoomCost[e.get_id(), room_ids] > 0
+
+        self.instance = instance
+        self.model: Model = None
+
+        # Events currently assigned to the period in the MIP
+        self.assigned: Set[Event] = set()
+
+        # Result of the last solve
+        self.objective: float = None
+        self.assignment: Dict[Event, Room] = {}
+
+    def _build_model(self) -> None:
+        """
+        Builds the MIP over every event which can be held in the period, with
+        no events assigned
+        """
+
+        p = self.period
+        Rooms = self.instance.Rooms
+        RoomsAvailableP: Set[Room] = self.instance.RoomsAvailable[p]
+
+        # Set of single member rooms and other composite rooms with members in common as rc
+        overlapping: Dict[Room, Set[Room]] = {
+            rc: Rooms.get_overlapping_rooms(rc) & (RoomsAvailableP - {rc})
+            for rc in Rooms.get_composite_rooms()
+        }
+
+        # Events which could use each room
+        room_events: Dict[Room, List[Event]] = {}
+        for e in self.events:
+            for r in self.rooms[e]:
+                room_events.setdefault(r, []).append(e)
+
+        self.model = Model("BSP for Period " + str(p), env=self.env)
+
+        # Set output flag off/on
+        self.model.setParam("OutputFlag", 0)
+
+        # X = 1 if event e is assigned to period p and room r, 0 else
+        self.X: Dict[Tuple[Event, Room], Var] = {
+            (e, r): self.model.addVar(vtype=GRB.BINARY)
+            for e in self.events
+            for r in self.rooms[e]
+        }
+        X = self.X
+
+        self.model.setObjective(
+            quicksum(
+                X[e, r]
+                for e in self.events
+                for r, undesired in zip(self.rooms[e], self.undesired[e])
+                if undesired
+            ),
+            GRB.MINIMIZE,
+        )
+
+        # Each event assigned to the period is given exactly 1 room. Events
+        # not in the period have a right hand side of 0
+        self.AssignedRooms = {
+            e: self.model.addConstr(quicksum(X[e, r] for r in self.rooms[e]) == 0)
+            for e in self.events
+        }
+
+        # At most one event can use a room at once.
+        dummy_room = Rooms.get_dummy_room()
+        self.RoomClashes = {
+            r: self.model.addConstr(
+                quicksum(X[e, r] for e in room_events.get(r, [])) <= 1
+            )
+            for r in RoomsAvailableP
+            if r is not dummy_room
+        }
+
+        # Composite room overlap
+        self.CompositeOverlap = {
+            rc: self.model.addConstr(
+                len(overlapping[rc])
+                * quicksum(X[e, rc] for e in room_events.get(rc, []))
+                + quicksum(
+                    X[e, r0] for r0 in overlapping[rc] for e in room_events.get(r0, [])
+                )
+                <= len(overlapping[rc])
+            )
+            for rc in Rooms.get_composite_rooms() & RoomsAvailableP
+        }
+
+    def set_events(self, events: Set[Event]) -> int:
+        """
+        Makes events the set of events assigned to the period. Returns the
+        number of events whose assignment changed
+        """
+
+        added = events - self.assigned
+        removed = self.assigned - events
+        for e in added:
+            self.AssignedRooms[e].RHS = 1
+        for e in removed:
+            self.AssignedRooms[e].RHS = 0
+
+        self.assigned = set(events)
+        return len(added) + len(removed)
+
+    def _solve_model(self, events: Set[Event]) -> bool:
+        """
+        Solves the MIP with the given events assigned to the period
+        """
+
+        if self.model is None:
+            self._build_model()
+
+        self.set_events(events)
+        self.model.optimize()
+
+        if self.model.status in (GRB.INFEASIBLE, GRB.INF_OR_UNBD):
+            return False
+
+        self.objective = self.model.objVal
+        self.assignment = {
+            e: r
+            for e in self.assigned
+            for r in self.rooms[e]
+            if self.X[e, r].x > const.BINARY_ONE_BOUND
+        }
+        return True
+
+    def _solve_matching(self, events: Set[Event]) -> bool:
+        """
+        Assigns rooms to events which need at most one room each. Events with
+        no room requirement take their only room (the dummy room), the others
+        are matched to distinct rooms at minimum undesired room cost
+        """
+
+        assignment: Dict[Event, Room] = {}
+        objective = 0
+        roomed: List[Event] = []
+        for e in events:
+            if len(self.rooms[e]) == 0:
+                return False
+            if e.room_required():
+                roomed.append(e)
+            else:
+                assignment[e] = self.rooms[e][0]
+                objective += int(self.undesired[e][0])
+
+        if roomed:
+            # Columns are the rooms any of the events could use
+            columns: Dict[Room, int] = {}
+            for e in roomed:
+                for r in self.rooms[e]:
+                    columns.setdefault(r, len(columns))
+            if len(roomed) > len(columns):
+                return False
+
+            # Pairs which can't be used cost more than any feasible matching
+            forbidden = len(roomed) + 1
+            cost = np.full((len(roomed), len(columns)), forbidden, dtype=np.float64)
+            for i, e in enumerate(roomed):
+                cost[i, [columns[r] for r in self.rooms[e]]] = self.undesired[e]
+
+            rows, cols = linear_sum_assignment(cost)
+            if cost[rows, cols].max() >= forbidden:
+                return False
+
+            room_list = list(columns)
+            for i, j in zip(rows.tolist(), cols.tolist()):
+                assignment[roomed[i]] = room_list[j]
+            objective += int(cost[rows, cols].sum())
+
+        self.objective = objective
+        self.assignment = assignment
+        return True
+
+    def solve(self, events: Set[Event]) -> bool:
+        """
+        Solves the subproblem with the given events assigned to the period.
+        Returns True if every event could be given rooms
+        """
+
+        if all(e.get_num_rooms() <= 1 for e in events):
+            return self._solve_matching(events)
+
+        return self._solve_model(events)
+
+    def _match(self, events: List[Event]) -> Tuple[np.ndarray, List[Room]]:
+        """
+        Returns the column matched to each of the events needing a single room
+        in a maximum matching (-1 if unmatched), and the room of each column
+        """
+
+        columns: Dict[Room, int] = {}
+        indices = []
+        for e in events:
+            indices.extend(columns.setdefault(r, len(columns)) for r in self.rooms[e])
+        indptr = np.cumsum([0] + [len(self.rooms[e]) for e in events])
+        graph = sp.csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(len(events), len(columns)),
+        )
+
+        return maximum_bipartite_matching(graph, perm_type="column"), list(columns)
+
+    def _hall_violator(self, events: List[Event]) -> List[Event]:
+        """
+        Returns a set of events needing single rooms with fewer rooms between
+        them than events, or an empty list if they can all be matched
+        """
+
+        match, room_list = self._match(events)
+        unmatched = np.flatnonzero(match == -1)
+        if len(unmatched) == 0:
+            return []
+
+        # Event matched to each room
+        room_event = {room_list[j]: i for i, j in enumerate(match.tolist()) if j >= 0}
+
+        # Events reachable from an unmatched event by alternating paths. Every
+        # room they can use is matched to one of them, as otherwise the
+        # matching could be augmented
+        reached = {int(unmatched[0])}
+        stack = [int(unmatched[0])]
+        while stack:
+            for r in self.rooms[events[stack.pop()]]:
+                i = room_event[r]
+                if i not in reached:
+                    reached.add(i)
+                    stack.append(i)
+
+        return [events[i] for i in sorted(reached)]
+
+    def _explain_model(self, events: Set[Event]) -> Set[Event]:
+        """
+        Returns the events whose AssignedRooms constraints are in an IIS of the
+        MIP with the given events assigned to the period
+        """
+
+        if self.model is None:
+            self._build_model()
+
+        self.set_events(events)
+        self.model.computeIIS()
+
+        return {e for e in self.assigned if self.AssignedRooms[e].IISConstr}
+
+    def explain(self, events: Set[Event]) -> Set[Event]:
+        """
+        Returns a minimal subset of events which can't all be given rooms in
+        the period, for events which can't. Overwrites the last solution
+        """
+
+        # Work in id order so the same events always give the same conflict
+        ordered = sorted(events, key=Event.get_id)
+        for e in ordered:
+            if len(self.rooms[e]) == 0:
+                return {e}
+
+        if all(e.get_num_rooms() <= 1 for e in ordered):
+            conflict = self._hall_violator([e for e in ordered if e.room_required()])
+        else:
+            # The IIS of a MIP isn't always minimal
+            conflict = sorted(self._explain_model(events), key=Event.get_id)
+
+        # Drop events the rest of the conflict is infeasible without
+        for e in list(conflict):
+            rest = [f for f in conflict if f is not e]
+            if not self.solve(set(rest)):
+                conflict = rest
+
+        return set(conflict)
+
+    def get_objective(self) -> float:
+        """
+        Returns the number of events in undesired rooms in the last solution
+        """
+
+        return self.objective
+
+    def get_assignment(self) -> Dict[Event, Room]:
+        """
+        Returns the room each assigned event was given in the last solution
+        """
+
+        return self.assignment
+
+
+BSPResult = Tuple[bool, float, Dict[Event, Room], Set[Event]]
+
+
+class PeriodSubproblems:
+    """
+    The BSPs of every period, solved on a pool of worker threads
+    """
+
+    def __init__(
+        self, instance: InstanceModel, workers: int = 1, explain: bool = False
+    ) -> None:
+        self.instance = instance
+        self.workers = max(1, workers)
+        self.explain = explain
+        self.subproblems: Dict[Period, PeriodSubproblem] = {}
+
+        # Derive the sets the BSPs read here, so the worker threads only read
+        instance.RoomsAvailable
+
+        self.envs: List[Env] = []
+        self.pool: ThreadPoolExecutor = None
+        if self.workers > 1:
+            for _ in range(self.workers):
+                env = Env(empty=True)
+                env.setParam("OutputFlag", 0)
+                env.setParam("Threads", 1)
+                env.start()
+                self.envs.append(env)
+            self.pool = ThreadPoolExecutor(self.workers)
+
+    def get_worker(self, p: Period) -> int:
+        """
+        Returns the worker which solves the BSP of period p
+        """
+
+        return p.get_id() % self.workers
+
+    def get_subproblem(self, p: Period) -> PeriodSubproblem:
+        """
+        Returns the BSP of period p, creating it the first time
+        """
+
+        if p not in self.subproblems:
+            env = self.envs[self.get_worker(p)] if self.envs else None
+            self.subproblems[p] = PeriodSubproblem(self.instance, p, env)
+        return self.subproblems[p]
+
+    def solve(self, p: Period, events: Set[Event], explain: bool = None) -> BSPResult:
+        """
+        Solves the BSP of period p with the given events assigned to it.
+        Returns whether it was feasible, its objective, the room of each event
+        and, if infeasible and explaining, a minimal set of conflicting events.
+        explain overrides whether these subproblems explain, e.g. for callers
+        which only need to know if the events fit
+        """
+
+        if explain is None:
+            explain = self.explain
+
+        BSP = self.get_subproblem(p)
+        if BSP.solve(events):
+            return True, BSP.get_objective(), BSP.get_assignment(), set()
+        if explain:
+            return False, None, {}, BSP.explain(events)
+        return False, None, {}, set()
+
+    def _solve_periods(
+        self, periods_events: List[Tuple[Period, Set[Event]]]
+    ) -> List[BSPResult]:
+        """
+        Solves the BSPs of the given periods one after another
+        """
+
+        return [self.solve(p, events) for p, events in periods_events]
+
+    def solve_all(
+        self, periods_events: Dict[Period, Set[Event]]
+    ) -> Dict[Period, BSPResult]:
+        """
+        Solves the BSP of each period with its events, on the worker pool if
+        there is one. Returns the results in the order of periods_events
+        """
+
+        # Subproblems are created here so the workers never modify the dict
+        for p in periods_events:
+            self.get_subproblem(p)
+
+        if self.pool is None:
+            return {p: self.solve(p, events) for p, events in periods_events.items()}
+
+        work: List[List[Tuple[Period, Set[Event]]]] = [[] for _ in self.envs]
+        for p, events in periods_events.items():
+            work[self.get_worker(p)].append((p, events))
+
+        work = [w for w in work if w]
+        futures = [self.pool.submit(self._solve_periods, w) for w in work]
+        results: Dict[Period, BSPResult] = {}
+        for w, future in zip(work, futures):
+            for (p, _), result in zip(w, future.result()):
+                results[p] = result
+
+        return {p: results[p] for p in periods_events}
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pool and frees the Gurobi models and environments
+        """
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+        for BSP in self.subproblems.values():
+            if BSP.model is not None:
+                BSP.model.dispose()
+        self.subproblems.clear()
+
+        for env in self.envs:
+            env.dispose()
+        self.envs.clear()
@@ -20,3 +20,46 @@ def disjoint(set1, set2):
         if s in set2:
             return False
     return True
+
+
+def bits(bitset):
+    """
+    Returns the indices of the set bits of an integer bitset in increasing order
+    """
+    indices = []
+    while bitset:
+        low = bitset & -bitset
+        indices.append(low.bit_length() - 1)
+        bitset ^= low
+    return indices
+
+
+def max_independent_set_size(vertices, adjacency):
+    """
+    Determine the size of a maximum independent set of the graph induced by
+    vertices. Sets of vertices are integer bitsets and adjacency maps each
+    vertex to the bitset of its neighbours. Exact branch and bound, intended for
+    the small room conflict graphs
+    """
+    best = 0
+
+    def search(candidates, size):
+        nonlocal best
+        if size + bin(candidates).count("1") <= best:
+            return
+        if candidates == 0:
+            best = size
+            return
+
+        v = (candidates & -candidates).bit_length() - 1
+        rest = candidates & ~(1 << v)
+
+        # Take v
+        search(rest & ~adjacency[v], size + 1)
+
+        # Leave v out. Only worth it if v conflicts with another candidate
+        if rest & adjacency[v]:
+            search(rest, size)
+
+    search(vertices, 0)
+    return best
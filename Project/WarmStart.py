@@ -0,0 +1,133 @@
+"""
+Reads a solution file back onto the events, periods and rooms of an instance,
+so a previous timetable can be used as a MIP start.
+
+Solution files have a list of Assignments, each with a Course and its Events.
+Events give their Exam, Part, Period and Room, as in
+Project/Solutions/BestSolutions. The keys written by older versions of
+SolutionExport (exam, part, period_ordinal and room_name) are read too. Events
+held in no room have no Room.
+
+Run this file to check how much of a solution maps onto an instance:
+    python3 Project/WarmStart.py D1-1-16.json Project/Solutions/BestSolutions/sol_D1-1-16.json
+"""
+
+import argparse
+import json
+from typing import Dict, List, Tuple
+
+import Constants as const
+from Event import Event
+from Instance import InstanceModel, load_instance
+from Period import Period
+from Room import Room
+
+# Keys of each solution event field, newest first
+EXAM_KEYS = ("Exam", "exam")
+PART_KEYS = ("Part", "part")
+PERIOD_KEYS = ("Period", "period_ordinal")
+ROOM_KEYS = ("Room", "room_name")
+
+
+def _field(event_data: dict, keys: Tuple[str, ...]):
+    """
+    Returns the value of the first of keys in event_data, or None
+    """
+
+    for key in keys:
+        if key in event_data:
+            return event_data[key]
+
+    return None
+
+
+def read_solution(
+    solution_path: str, instance: InstanceModel
+) -> Tuple[Dict[Event, Period], Dict[Event, Room], List[str]]:
+    """
+    Returns the period and room of each event of the instance given in the
+    solution, and a message for each solution event or room which couldn't be
+    mapped. Events held in a period they aren't available in are left out, as
+    are rooms the event can't use in its period
+    """
+
+    with open(solution_path, "r") as file:
+        solution = json.load(file)
+
+    events: Dict[Tuple[str, int, str], Event] = {
+        (e.get_course_name(), e.get_examination().get_index(), e.get_event_type()): e
+        for e in instance.events
+    }
+    Rooms = instance.Rooms
+
+    periods: Dict[Event, Period] = {}
+    rooms: Dict[Event, Room] = {}
+    unmapped: List[str] = []
+
+    for assignment in solution.get("Assignments", []):
+        course_name = assignment.get("Course")
+        for event_data in assignment.get("Events", []):
+            exam = _field(event_data, EXAM_KEYS)
+            part = _field(event_data, PART_KEYS)
+            period = _field(event_data, PERIOD_KEYS)
+            room_name = _field(event_data, ROOM_KEYS)
+            name = f"{course_name}-{exam} ({part})"
+
+            e = events.get((course_name, exam, part))
+            if e is None:
+                unmapped.append(f"{name}: no such event")
+                continue
+            if e in periods:
+                unmapped.append(f"{name}: assigned more than once")
+                continue
+            if not isinstance(period, int) or not 0 <= period < len(instance.periods):
+                unmapped.append(f"{name}: no period {period}")
+                continue
+            if not instance.PAMatrix[e.get_id(), period]:
+                unmapped.append(f"{name}: period {period} not available")
+                continue
+
+            periods[e] = instance.periods[period]
+
+            if room_name is None or room_name == const.DUMMY:
+                room = Rooms.get_dummy_room()
+            else:
+                room = Rooms.get_room_by_name(room_name)
+            if room is None:
+                unmapped.append(f"{name}: no room {room_name}")
+            elif not (
+                instance.RAMatrix[e.get_id(), room.get_id()]
+                and instance.RoomsAvailableMatrix[period, room.get_id()]
+            ):
+                unmapped.append(f"{name}: room {room_name} not available")
+            else:
+                rooms[e] = room
+
+    for e in instance.events:
+        if e not in periods:
+            unmapped.append(f"{e}: not in the solution")
+
+    return periods, rooms, unmapped
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check how a solution file maps onto an instance"
+    )
+    parser.add_argument("instance")
+    parser.add_argument("solution")
+    args = parser.parse_args()
+
+    instance = load_instance(args.instance)
+    periods, rooms, unmapped = read_solution(args.solution, instance)
+
+    print(
+        f"Mapped {len(periods)} of {len(instance.events)} events,",
+        f"{len(rooms)} with rooms",
+    )
+    for message in unmapped:
+        print("    Not mapped:", message)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Puts the solver's modules on the path and runs the tests from the top of the
+repository, where the solver looks for its data
+"""
+
+import os
+import sys
+
+import pytest
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_PATH)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def repository_root():
+    """
+    Runs every test from the top of the repository
+    """
+
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(PROJECT_PATH))
+    yield
+    os.chdir(cwd)
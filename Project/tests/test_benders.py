@@ -0,0 +1,503 @@
+"""
+Checks the compiled instances, the master problem builders, the room
+subproblems, the cut pool and the checkpoints against simpler versions of the
+same computations.
+
+The reference sets are built from the object model the way the solver built
+them before instances were compiled.
+
+Run from the top of the repository:
+    python3 -m pytest -q Project/tests
+"""
+
+import itertools
+import json
+import os
+import random
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+import pytest
+from gurobipy import Env, Model
+
+import Constants as const
+import Instance
+import Utils as utils
+from Checkpoint import Checkpoint
+from Constraint import ConstraintManager
+from Construction import construct_timetable
+from Course import Course
+from CutPool import CutPool, capacity_kind
+from Event import Event
+from Instance import DATA_PATH, InstanceModel, load_compiled_instance, load_instance
+from MasterBuilder import build_assignment, build_assignment_matrix
+from Period import Period
+from Room import Room
+from RoomSubproblem import PeriodSubproblem
+
+# Instances small enough for the size-limited Gurobi licence
+TOY = "toy.json"
+
+# Instances the compiled sets are checked on. D3-1-16 has composite rooms and
+# room period constraints, D7-2-17 undesired rooms
+SET_INSTANCES = [TOY, "D3-1-16.json", "D7-2-17.json"]
+
+# Random event sets tried on each room subproblem
+NUM_SAMPLES = 200
+
+
+@pytest.fixture(scope="module")
+def env():
+    env = Env(empty=True)
+    env.setParam("OutputFlag", 0)
+    env.start()
+    yield env
+    env.dispose()
+
+
+@pytest.fixture(scope="module")
+def toy() -> InstanceModel:
+    return load_instance(TOY)
+
+
+def _event(course: Course, exam_index: int, part: str) -> List[Event]:
+    """
+    Returns the events of a course's examination a constraint refers to. A
+    constraint with no part refers to every event of the examination
+    """
+
+    examination = course.get_examination_by_index(exam_index)
+    if part is None:
+        return examination.get_events()
+    return [examination.get_event_by_part(part)]
+
+
+def object_sets(instance: InstanceModel) -> Dict[str, object]:
+    """
+    Returns the sets of the instance built by looping over its objects
+    """
+
+    with open(os.path.join(DATA_PATH, instance.name + ".json"), "r") as file:
+        data = json.load(file)
+
+    constrManager = ConstraintManager(instance.slots_per_day)
+    for constraint in data[const.CONSTRAINTS]:
+        constrManager.add_constraint(constraint)
+
+    courseManager = instance.courseManager
+    curriculaManager = instance.curriculaManager
+    Rooms = instance.Rooms
+    Events = instance.events
+    Periods = instance.periods
+    Courses: List[Course] = courseManager.get_courses()
+    course_events = {
+        c: [e for exam in c.get_examinations() for e in exam.get_events()]
+        for c in Courses
+    }
+
+    def by_name(name: str) -> Course:
+        return courseManager.get_course_by_name(name)
+
+    sets: Dict[str, object] = {}
+
+    # ----- Periods -----
+    forbidden = {
+        c.get_period() for c in constrManager.get_forbidden_period_constraints()
+    }
+    forbidden_event: Dict[Event, Set[Period]] = {e: set() for e in Events}
+    for c in constrManager.get_forbidden_event_period_constraints():
+        for e in _event(
+            by_name(c.get_course_name()), c.get_exam_ordinal(), c.get_part()
+        ):
+            forbidden_event[e].add(c.get_period())
+    PA = {
+        e: {p for p in Periods if p not in forbidden | forbidden_event[e]}
+        for e in Events
+    }
+    sets["PA"] = PA
+
+    # ----- Rooms -----
+    available_types = {
+        const.SMALL: [const.SMALL, const.MEDIUM, const.LARGE],
+        const.MEDIUM: [const.MEDIUM, const.LARGE],
+        const.LARGE: [const.LARGE],
+    }
+    RA: Dict[Event, Set[Room]] = {}
+    for e in Events:
+        if e.get_num_rooms() == 0:
+            RA[e] = {Rooms.get_dummy_room()}
+        elif e.get_num_rooms() == 1:
+            RA[e] = {
+                r
+                for r in Rooms.get_single_rooms()
+                if r.get_type() in available_types[e.get_room_type()]
+            }
+        else:
+            RA[e] = {
+                r
+                for r in Rooms.get_composite_rooms()
+                if len(r.get_members()) == e.get_num_rooms()
+                and Rooms.composite_map[r][0].get_type() == e.get_room_type()
+            }
+    sets["RA"] = RA
+
+    # A composite room is unavailable whenever one of its members is
+    sets["RoomsAvailable"] = {
+        p: {
+            r
+            for r in Rooms.get_rooms()
+            if not constrManager.is_forbidden(r.get_room_name(), p)
+            and all(
+                not constrManager.is_forbidden(m.get_room_name(), p)
+                for m in Rooms.composite_map.get(r, [])
+            )
+        }
+        for p in Periods
+    }
+
+    # ----- H3 hard conflicts -----
+    HC: Dict[Event, Set[Event]] = {e: set() for e in Events}
+    for curriculum in curriculaManager.get_curricula():
+        by_teacher: Dict[str, List[Event]] = {}
+        for name in curriculum.get_primary_course_names():
+            course = by_name(name)
+            by_teacher.setdefault(course.get_teacher(), []).extend(
+                course_events[course]
+            )
+        for name in curriculum.get_primary_course_names():
+            course = by_name(name)
+            for e in course_events[course]:
+                HC[e] |= {e2 for e2 in by_teacher[course.get_teacher()] if e2 != e}
+    sets["HC"] = HC
+
+    # ----- Precedences and distances -----
+    F, DPSameCourse, DPWrittenOral = set(), set(), set()
+    for course in Courses:
+        exams = course.get_examinations()
+        if course.is_written_and_oral():
+            for exam in exams:
+                pair = (exam.get_written_event(), exam.get_oral_event())
+                F.add(pair)
+                DPWrittenOral.add(pair)
+        for a, b in itertools.permutations(exams, 2):
+            if a.get_index() < b.get_index():
+                pair = (a.get_first_event(), b.get_first_event())
+                F.add(pair)
+                DPSameCourse.add(pair)
+    sets["F"] = F
+    sets["DPDirected"] = set(F)
+    sets["DPSameCourse"] = DPSameCourse
+    sets["DPWrittenOral"] = DPWrittenOral
+
+    def first(course: Course, exam) -> Event:
+        if course.is_written() or course.is_written_and_oral():
+            return exam.get_written_event()
+        return exam.get_oral_event()
+
+    DPUndirected, DPPrimaryPrimary, DPPrimarySecondary = set(), set(), set()
+    for curriculum in curriculaManager.get_curricula():
+        courses = [by_name(n) for n in curriculum.get_course_names()]
+        for a, b in itertools.permutations(courses, 2):
+            for ea in a.get_examinations():
+                for eb in b.get_examinations():
+                    DPUndirected.add((first(a, ea), first(b, eb)))
+
+        primary = [by_name(n) for n in curriculum.get_primary_course_names()]
+        secondary = [by_name(n) for n in curriculum.get_secondary_course_names()]
+        for p1 in primary:
+            for other, pairs in [
+                (primary, DPPrimaryPrimary),
+                (secondary, DPPrimarySecondary),
+            ]:
+                for c2 in other:
+                    if c2 == p1:
+                        continue
+                    for ex1 in p1.get_examinations():
+                        for ex2 in c2.get_examinations():
+                            pairs.add((ex1.get_first_event(), ex2.get_first_event()))
+    sets["DPUndirected"] = DPUndirected
+    sets["DPPrimaryPrimary"] = DPPrimaryPrimary
+    sets["DPPrimarySecondary"] = DPPrimarySecondary
+
+    # ----- Soft conflicts -----
+    SCPS: Dict[Event, Set[Event]] = {e: set() for e in Events}
+    SCSS: Dict[Event, Set[Event]] = {e: set() for e in Events}
+    SOFT_CONFLICT: Dict[frozenset, int] = {}
+    for curriculum in curriculaManager.get_curricula():
+        primary = [by_name(n) for n in curriculum.get_primary_course_names()]
+        secondary = [by_name(n) for n in curriculum.get_secondary_course_names()]
+        secondary_events = {e for c in secondary for e in course_events[c]}
+        for c in primary:
+            for e in course_events[c]:
+                SCPS[e] |= secondary_events
+        for c in secondary:
+            for e in course_events[c]:
+                SCSS[e] |= secondary_events - set(course_events[c])
+        for c1, c2 in itertools.product(primary, secondary):
+            for e1, e2 in itertools.product(course_events[c1], course_events[c2]):
+                SOFT_CONFLICT[frozenset((e1, e2))] = const.SC_PRIMARY_SECONDARY
+    for curriculum in curriculaManager.get_curricula():
+        secondary = [by_name(n) for n in curriculum.get_secondary_course_names()]
+        for c1, c2 in itertools.product(secondary, secondary):
+            for e1, e2 in itertools.product(course_events[c1], course_events[c2]):
+                SOFT_CONFLICT.setdefault(
+                    frozenset((e1, e2)), const.SC_SECONDARY_SECONDARY
+                )
+    sets["SCPS"] = SCPS
+    sets["SCSS"] = SCSS
+    sets["SOFT_CONFLICT"] = SOFT_CONFLICT
+
+    sets["teacherEvents"] = {}
+    for c in Courses:
+        sets["teacherEvents"].setdefault(c.get_teacher(), set()).update(
+            course_events[c]
+        )
+
+    # ----- Costs -----
+    global_undesired = {
+        c.get_period() for c in constrManager.get_undesired_period_constraints()
+    }
+    # Undesired periods apply to every event of the course
+    undesired_periods: Dict[Event, Set[Period]] = {e: set() for e in Events}
+    for c in constrManager.get_undesired_event_period_constraints():
+        for e in course_events[by_name(c.get_course_name())]:
+            undesired_periods[e].add(c.get_period())
+    preferred: Dict[Event, Set[Period]] = {e: set() for e in Events}
+    for c in constrManager.get_preferred_event_period_constraints():
+        for e in _event(
+            by_name(c.get_course_name()), c.get_exam_ordinal(), c.get_part()
+        ):
+            preferred[e].add(c.get_period())
+
+    # Events with no preferred periods don't prefer any period over another
+    period_cost: Dict[Tuple[Event, Period], int] = {}
+    for e in Events:
+        for p in PA[e]:
+            if p in global_undesired or p in undesired_periods[e]:
+                period_cost[e, p] = const.P_UNDESIRED_PERIOD
+            elif preferred[e] and p not in preferred[e]:
+                period_cost[e, p] = const.P_NOT_PREFERED_PERIOD
+            else:
+                period_cost[e, p] = 0
+    sets["UndesiredPeriodCost"] = period_cost
+
+    # Undesired rooms apply to every event of the examination
+    undesired_rooms: Dict[Event, Set[Room]] = {e: set() for e in Events}
+    for c in constrManager.get_undesired_event_room_constraints():
+        for e in _event(by_name(c.get_course_name()), c.get_exam_ordinal(), None):
+            undesired_rooms[e].add(Rooms.get_room_by_name(c.get_room_name()))
+    sets["UndesiredRoomCost"] = {
+        (e, r): const.P_UNDESIRED_ROOM if r in undesired_rooms[e] else 0
+        for e in Events
+        for r in RA[e]
+    }
+
+    return sets
+
+
+def compiled_sets(instance: InstanceModel) -> Dict[str, object]:
+    """
+    Returns the sets of object_sets as read from the compiled instance
+    """
+
+    sets = {
+        name: getattr(instance, name)
+        for name in [
+            "PA",
+            "RA",
+            "RoomsAvailable",
+            "F",
+            "DPDirected",
+            "DPSameCourse",
+            "DPWrittenOral",
+            "DPUndirected",
+            "DPPrimaryPrimary",
+            "DPPrimarySecondary",
+            "SCPS",
+            "SCSS",
+            "SOFT_CONFLICT",
+        ]
+    }
+    sets["HC"] = {e: set(es) for e, es in instance.HC.items()}
+    sets["teacherEvents"] = {t: set(es) for t, es in instance.teacherEvents.items()}
+    sets["UndesiredPeriodCost"] = {
+        (e, p): int(instance.UndesiredPeriodCost[e.get_id(), p.get_id()])
+        for e in instance.events
+        for p in instance.PA[e]
+    }
+    sets["UndesiredRoomCost"] = {
+        (e, r): int(instance.UndesiredRoomCost[e.get_id(), r.get_id()])
+        for e in instance.events
+        for r in instance.RA[e]
+    }
+
+    return sets
+
+
+@pytest.mark.parametrize("instance_filename", SET_INSTANCES)
+def test_compiled_sets_match_object_model(instance_filename):
+    instance = InstanceModel(load_compiled_instance(instance_filename, use_cache=False))
+    expected = object_sets(instance)
+    actual = compiled_sets(instance)
+
+    for name in expected:
+        assert actual[name] == expected[name], name
+
+
+def test_cache_round_trip():
+    compiled = load_compiled_instance(TOY, use_cache=False)
+    load_compiled_instance(TOY)
+    cached = load_compiled_instance(TOY)
+
+    assert Instance.compare_dzn(compiled, cached) == {}
+    assert cached.content_hash == compiled.content_hash
+
+
+def test_cache_key_covers_penalties(monkeypatch):
+    content_hash = load_compiled_instance(TOY, use_cache=False).content_hash
+    monkeypatch.setattr(
+        Instance, "COMPILED_PENALTIES", Instance.COMPILED_PENALTIES + (1,)
+    )
+
+    assert load_compiled_instance(TOY, use_cache=False).content_hash != content_hash
+
+
+def _rows(model: Model, Y, H) -> Counter:
+    """
+    Returns the non-empty rows of the model, with their variables named by
+    their Y or H key
+    """
+
+    model.update()
+    names = {v.index: ("Y", e.get_id(), p.get_id()) for (e, p), v in Y.items()}
+    names.update({v.index: ("H", e.get_id()) for e, v in H.items()})
+
+    A = model.getA().tocsr()
+    rows = Counter()
+    for i, constr in enumerate(model.getConstrs()):
+        start, end = A.indptr[i], A.indptr[i + 1]
+        if start == end:
+            continue
+        terms = frozenset(
+            (names[j], float(a))
+            for j, a in zip(A.indices[start:end].tolist(), A.data[start:end].tolist())
+        )
+        rows[terms, constr.Sense, float(constr.RHS)] += 1
+
+    return rows
+
+
+def test_matrix_builder_matches_loop_builder(env, toy):
+    loop_model = Model(env=env)
+    matrix_model = Model(env=env)
+
+    loop_rows = _rows(loop_model, *build_assignment(loop_model, toy))
+    matrix_rows = _rows(matrix_model, *build_assignment_matrix(matrix_model, toy))
+
+    assert matrix_rows == loop_rows
+    loop_model.dispose()
+    matrix_model.dispose()
+
+
+def _samples(events: List[Event], seed: int) -> List[Set[Event]]:
+    """
+    Returns random sets of the events, of every size
+    """
+
+    rng = random.Random(seed)
+    return [
+        set(rng.sample(events, rng.randint(1, len(events)))) for _ in range(NUM_SAMPLES)
+    ]
+
+
+def test_matching_agrees_with_mip(env, toy):
+    for p in toy.periods[:4]:
+        BSP = PeriodSubproblem(toy, p, env)
+        single = [e for e in BSP.events if e.get_num_rooms() <= 1]
+
+        for events in _samples(single, p.get_id()):
+            feasible = BSP._solve_matching(events)
+            matched = BSP.get_objective()
+            assert BSP._solve_model(events) == feasible
+            if feasible:
+                assert BSP.get_objective() == pytest.approx(matched)
+
+
+@pytest.mark.parametrize("composite", [False, True])
+def test_explain_is_minimal(env, toy, composite):
+    infeasible = 0
+    for p in toy.periods[:4]:
+        BSP = PeriodSubproblem(toy, p, env)
+        events = [e for e in BSP.events if composite or e.get_num_rooms() <= 1]
+
+        for sample in _samples(events, p.get_id()):
+            if BSP.solve(sample):
+                continue
+            infeasible += 1
+
+            conflict = BSP.explain(sample)
+            assert conflict <= sample
+            assert not BSP.solve(conflict)
+            for e in conflict:
+                assert BSP.solve(conflict - {e})
+
+    assert infeasible > 0
+
+
+def test_independence_number_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(50):
+        n = rng.randint(1, 10)
+        adjacency = {v: 0 for v in range(n)}
+        for u, v in itertools.combinations(range(n), 2):
+            if rng.random() < 0.4:
+                adjacency[u] |= 1 << v
+                adjacency[v] |= 1 << u
+
+        expected = max(
+            len(subset)
+            for k in range(n + 1)
+            for subset in itertools.combinations(range(n), k)
+            if all(
+                not adjacency[u] >> v & 1 for u, v in itertools.combinations(subset, 2)
+            )
+        )
+        assert utils.max_independent_set_size((1 << n) - 1, adjacency) == expected
+
+
+def test_cut_pool_round_trip(tmp_path):
+    path = str(tmp_path / "cuts.json")
+    pool = CutPool(path)
+    cuts = [
+        (0, [3, 1, 2], "no-good", 2),
+        (5, [4], "optimality", 1.5),
+        (7, [], capacity_kind(const.SMALL, 2), 3),
+    ]
+    for cut in cuts:
+        assert pool.add(*cut)
+    assert not pool.add(0, [1, 2, 3], "no-good", 2)
+    pool.save()
+
+    loaded = CutPool.load(path)
+    assert list(loaded) == list(pool)
+    assert loaded.num_loaded == len(cuts)
+
+
+def test_checkpoint_round_trip(tmp_path, toy):
+    periods, rooms = construct_timetable(toy)
+    path = str(tmp_path / "checkpoint.json")
+
+    checkpoint = Checkpoint(path, interval=0)
+    assert checkpoint.update(periods, rooms, 12.0)
+    assert not checkpoint.update(periods, rooms, 13.0)
+    checkpoint.update_bound(4.0)
+    assert checkpoint.due(1.0)
+    checkpoint.save(30.0)
+
+    loaded = Checkpoint.load(path, toy)
+    assert loaded.periods == periods
+    assert loaded.rooms == {
+        e: rooms.get(e, toy.Rooms.get_dummy_room()) for e in periods
+    }
+    assert (loaded.objective, loaded.bound) == (12.0, 4.0)
+    assert loaded.get_runtime(5.0) == 35.0